@@ -32,4 +32,14 @@ az cosmosdb sql container create \
   --partition-key-path "/thread_id" \
   --only-show-errors
 
+echo "Creating container: cache (partition key: /namespace, per-item TTL)"
+az cosmosdb sql container create \
+  --account-name "$COSMOS_ACCOUNT_NAME" \
+  --resource-group "$RESOURCE_GROUP" \
+  --database-name agent-db \
+  --name cache \
+  --partition-key-path "/namespace" \
+  --ttl -1 \
+  --only-show-errors
+
 echo "=== Cosmos DB setup complete ==="
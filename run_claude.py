@@ -12,19 +12,11 @@ load_dotenv()
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "src"))
 
-# Patch ADLS client to use AzureCliCredential
-import clients.adls as adls_module
+# Use AzureCliCredential for ADLS access
 from azure.identity import AzureCliCredential
-from azure.storage.filedatalake import DataLakeServiceClient
+from clients.adls import AzureStorageBackend, set_storage_backend
 
-def get_adls_client_cli():
-    account_name = os.environ["ADLS_ACCOUNT_NAME"]
-    return DataLakeServiceClient(
-        account_url=f"https://{account_name}.dfs.core.windows.net",
-        credential=AzureCliCredential(process_timeout=60),
-    )
-
-adls_module.get_adls_client = get_adls_client_cli
+set_storage_backend(AzureStorageBackend(credential=AzureCliCredential(process_timeout=60)))
 
 from tools.adls import read_mapping_spreadsheet, sample_source_data, read_spark_output
 from tools.databricks import submit_spark_job, wait_for_spark_job
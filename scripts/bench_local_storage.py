@@ -0,0 +1,89 @@
+"""Benchmark the sampling, profiling and integrity paths against local files.
+
+Usage:
+    python scripts/bench_local_storage.py [--rows 2000000] [--cols 40] [--parts 50]
+
+Generates a synthetic transactions CSV plus a multi-part Parquet "Spark output"
+under a temporary directory, points clients.adls at the local-directory backend,
+and times each tool the activities use. No Azure access is needed.
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from clients.adls import set_storage_backend
+from clients.local_storage import LocalStorageBackend
+from activities.integrity_checks import run_integrity_checks
+from tools.adls import read_spark_output, sample_source_data
+from tools.profiling import profile_data
+
+
+def make_frame(rows: int, cols: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    data = {
+        "Trade Date": pd.date_range("2020-01-01", periods=rows, freq="min").strftime("%m/%d/%Y"),
+        "Fund": rng.choice([f"FUND{i:03d}" for i in range(40)], rows),
+        "Transaction Code": rng.choice(["BUY", "SELL", "DIV", "INT", "XBUY"], rows),
+    }
+    for i in range(cols - len(data)):
+        if i % 3 == 0:
+            data[f"amount_{i}"] = rng.normal(1_000, 250, rows).round(2)
+        elif i % 3 == 1:
+            data[f"code_{i}"] = rng.choice(["A", "B", "C", None], rows)
+        else:
+            data[f"qty_{i}"] = rng.integers(0, 10_000, rows)
+    return pd.DataFrame(data)
+
+
+def timed(label: str, fn):
+    start = time.perf_counter()
+    result = fn()
+    print(f"  {label:<40} {time.perf_counter() - start:8.3f}s")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--cols", type=int, default=40)
+    parser.add_argument("--parts", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        backend = LocalStorageBackend(root)
+        set_storage_backend(backend)
+
+        print(f"Generating {args.rows:,} rows x {args.cols} columns...")
+        df = make_frame(args.rows, args.cols)
+        csv_path = Path(root) / "data" / "BENCH" / "transactions.csv"
+        csv_path.parent.mkdir(parents=True)
+        df.to_csv(csv_path, index=False)
+        out_dir = Path(root) / "output" / "BENCH" / "run"
+        out_dir.mkdir(parents=True)
+        bounds = np.linspace(0, len(df), args.parts + 1, dtype=int)
+        for i in range(args.parts):
+            df.iloc[bounds[i]:bounds[i + 1]].to_parquet(out_dir / f"part-{i:05d}.snappy.parquet", index=False)
+        print(f"  CSV: {csv_path.stat().st_size / 1e6:,.1f} MB, output: {args.parts} part files\n")
+
+        sample = timed("sample_source_data (CSV, 100 rows)",
+                       lambda: sample_source_data("BENCH/transactions.csv"))
+        timed("sample_source_data (exact row count)",
+              lambda: sample_source_data("BENCH/transactions.csv", exact_row_count=True))
+        timed("profile_data (sample)", lambda: profile_data(sample))
+        timed("read_spark_output (all part footers)", lambda: read_spark_output("BENCH/run"))
+        report = timed("run_integrity_checks", lambda: run_integrity_checks("BENCH/run"))
+        print(f"\nIntegrity: {'PASS' if report.overall_pass else 'FAIL'}")
+
+        set_storage_backend(None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Benchmark first-call vs steady-state Azure OpenAI latency.
+
+Usage:
+    python scripts/bench_openai_client.py [--calls 10]
+
+"before" builds a new client (credential, token, connection pool) for every
+call, as the agent used to; "after" reuses the shared client from
+agent.client.get_openai_client(). Needs AZURE_OPENAI_ENDPOINT and
+AZURE_OPENAI_DEPLOYMENT plus an identity DefaultAzureCredential can use.
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from agent.client import build_openai_client, get_deployment, get_openai_client
+
+MESSAGES = [{"role": "user", "content": "Reply with the single word: ok"}]
+
+
+def call(client) -> float:
+    start = time.perf_counter()
+    client.chat.completions.create(model=get_deployment(), messages=MESSAGES, max_completion_tokens=5)
+    return time.perf_counter() - start
+
+
+def report(label: str, latencies: list[float]) -> None:
+    first, steady = latencies[0], latencies[1:]
+    line = f"{label:<8} first call {first:6.2f}s"
+    if steady:
+        line += (
+            f"   steady state mean {statistics.mean(steady):6.2f}s"
+            f"  median {statistics.median(steady):6.2f}s  max {max(steady):6.2f}s  ({len(steady)} calls)"
+        )
+    print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=10)
+    args = parser.parse_args()
+
+    before = []
+    for _ in range(args.calls):
+        start = time.perf_counter()
+        client = build_openai_client()
+        call(client)
+        before.append(time.perf_counter() - start)
+        client.close()
+
+    after = [call(get_openai_client()) for _ in range(args.calls)]
+
+    report("before", before)
+    report("after", after)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Benchmark profile_data against the previous column-by-column profiler.
+
+Usage:
+    python scripts/bench_profiling.py [--rows 100] [--cols 300] [--repeat 5]
+    python scripts/bench_profiling.py --parallel --rows 50000 [--max-workers 8]
+
+Builds a wide synthetic frame shaped like CLIENT_001's source (dates, fund and
+transaction codes, amounts, sparse codes, quantities), checks both profilers
+return the same result, and times each on the records dict and on the frame.
+With --parallel, times profile_data_parallel at 1, 2, 4, ... workers instead and
+reports the speedup over in-process profiling.
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_local_storage import make_frame
+from tools import parallel_profiling
+from tools.parallel_profiling import profile_data_parallel, shutdown_pools
+from tools.profiling import profile_data
+
+
+def profile_data_per_column(data: dict) -> dict:
+    """The original profiler: rebuilds the frame from records and loops per column."""
+    df = pd.DataFrame(data["sample_rows"])
+    if df.empty:
+        return {"columns": {}, "row_count": 0, "anomalies": []}
+
+    profile, anomalies = {}, []
+    for col in df.columns:
+        series = df[col]
+        col_profile = {
+            "dtype": str(series.dtype),
+            "null_count": int(series.isna().sum()),
+            "null_rate": round(float(series.isna().mean()), 3),
+            "unique_count": int(series.nunique()),
+        }
+        non_null = series.dropna()
+        if len(non_null) > 0:
+            if pd.api.types.is_numeric_dtype(series):
+                col_profile["min"] = float(non_null.min())
+                col_profile["max"] = float(non_null.max())
+                col_profile["mean"] = round(float(non_null.mean()), 2)
+            else:
+                top = non_null.value_counts().head(5)
+                col_profile["top_values"] = {str(k): int(v) for k, v in top.items()}
+        if col_profile["null_rate"] > 0.5:
+            anomalies.append(f"Column '{col}' has >50% nulls ({col_profile['null_rate']:.0%})")
+        if col_profile["unique_count"] == 1 and len(non_null) > 1:
+            anomalies.append(f"Column '{col}' has only 1 unique value (constant)")
+        profile[col] = col_profile
+
+    return {"columns": profile, "row_count": len(df), "total_columns": len(df.columns), "anomalies": anomalies}
+
+
+def best_of(repeat: int, fn) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def bench_parallel(df: pd.DataFrame, repeat: int, max_workers: int):
+    parallel_profiling.PARALLEL_MIN_CELLS = 0
+    baseline = best_of(repeat, lambda: profile_data(df))
+    print(f"  {'in-process':<26} {baseline * 1000:9.1f} ms  {1.0:5.1f}x")
+
+    expected = profile_data(df)
+    workers = 2
+    while workers <= max_workers:
+        # First call starts the pool; time the warm calls only
+        if profile_data_parallel(df, workers) != expected:
+            sys.exit(f"Parallel profile differs at {workers} workers")
+        elapsed = best_of(repeat, lambda: profile_data_parallel(df, workers))
+        print(f"  {f'{workers} workers':<26} {elapsed * 1000:9.1f} ms  {baseline / elapsed:5.1f}x")
+        workers *= 2
+    shutdown_pools()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--cols", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--parallel", action="store_true")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    df = make_frame(args.rows, args.cols)
+    if args.parallel:
+        print(f"{args.rows:,} rows x {args.cols} columns, {os.cpu_count()} cores (best of {args.repeat})")
+        bench_parallel(df, args.repeat, args.max_workers)
+        return
+
+    records = {"columns": list(df.columns), "sample_rows": df.to_dict(orient="records")}
+
+    if profile_data(records) != profile_data_per_column(records):
+        sys.exit("Profiles differ between implementations")
+
+    print(f"{args.rows:,} rows x {args.cols} columns (best of {args.repeat})")
+    baseline = best_of(args.repeat, lambda: profile_data_per_column(records))
+    for label, fn in [
+        ("per-column (records)", lambda: profile_data_per_column(records)),
+        ("vectorised (records)", lambda: profile_data(records)),
+        ("vectorised (DataFrame)", lambda: profile_data(df)),
+    ]:
+        elapsed = best_of(args.repeat, fn)
+        print(f"  {label:<26} {elapsed * 1000:9.1f} ms  {baseline / elapsed:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""Run change detection for every client with approved code and print a report.
+
+Usage:
+    python scripts/sweep_change_detection.py [--workers 8] [--client CLIENT_001 ...]
+                                             [--output report.json] [--upload]
+
+Each client is checked against the mapping and data paths recorded when its
+code was approved. Fingerprint matches are decided without the LLM, so only
+clients whose inputs changed cost an LLM call. --upload also writes the report
+to the audit-trail container.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from activities.fleet_sweep import save_sweep_report, sweep_change_detection
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--client", action="append", dest="clients", help="Only check this client (repeatable)")
+    parser.add_argument("--output", help="Also write the full report to this file")
+    parser.add_argument("--upload", action="store_true", help="Save the report to the audit-trail container")
+    args = parser.parse_args()
+
+    report = sweep_change_detection(args.clients, workers=args.workers)
+
+    for entry in report["clients"]:
+        print(f"  {entry['client_id']:<24} {entry['status']:<11} {entry['seconds']:7.2f}s  {entry.get('reason', '')}")
+    print(f"{len(report['clients'])} clients in {report['seconds']:.1f}s with {report['workers']} workers: {report['counts']}")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2, default=str))
+    if args.upload:
+        print(f"Report saved to audit-trail/{save_sweep_report(report)}")
+
+
+if __name__ == "__main__":
+    main()
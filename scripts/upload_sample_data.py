@@ -15,7 +15,7 @@ from pathlib import Path
 # Add src to path for imports
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
 
-from clients.adls import upload_file
+from clients.adls import upload_stream
 
 INPUT_DIR = Path(__file__).resolve().parent.parent / "input_data"
 
@@ -34,6 +34,11 @@ UPLOADS = [
 ]
 
 
+def _print_progress(uploaded: int, total: int | None) -> None:
+    pct = f" ({uploaded / total:.0%})" if total else ""
+    print(f"\r    {uploaded:,} bytes{pct}", end="", flush=True)
+
+
 def main():
     if not INPUT_DIR.exists():
         print(f"Error: input_data/ directory not found at {INPUT_DIR}")
@@ -46,9 +51,13 @@ def main():
             continue
 
         print(f"  Uploading {upload['local_file']} -> {upload['container']}/{upload['remote_path']}")
-        data = local_path.read_bytes()
-        upload_file(upload["container"], upload["remote_path"], data)
-        print(f"  OK ({len(data):,} bytes)")
+        total = local_path.stat().st_size
+        with open(local_path, "rb") as f:
+            uploaded = upload_stream(
+                upload["container"], upload["remote_path"], f,
+                total_size=total, progress=_print_progress,
+            )
+        print(f"\n  OK ({uploaded:,} bytes)")
 
     print("\nDone.")
 
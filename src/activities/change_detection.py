@@ -1,18 +1,143 @@
-"""Phase 1: LLM-based change detection.
+"""Phase 1: Change detection.
 
 Compares current mapping + data sample against stored pseudocode to decide
-whether regeneration is needed.
+whether regeneration is needed. The approved code is looked up first; if there
+is any, the mapping and data sample are read concurrently. Then the cheapest
+check that can decide wins:
+
+1. Fingerprints: approved code records fingerprints of the mapping workbook,
+   source schema and pseudocode. If all still match, the code is reused
+   without calling the LLM.
+2. Profile diff: a structural schema change (columns added, removed or
+   renamed, dtype changes) against the stored source profile means regenerate.
+3. Otherwise the LLM decides, with the profile diff as extra context. Its
+   verdict is cached under the fingerprints, the diff and the prompt template,
+   so reruns and retries with the same inputs do not ask again.
 """
 
 import json
 import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable
+
 from agent.runner import run_agent_json
 from agent.prompts import CHANGE_DETECTION
-from tools.adls import read_mapping_spreadsheet, sample_source_data
+from agent.token_budget import plan_prompt
+from activities.profiling import profile_source
+from clients.json_cache import get_json_cache
+from models.approved_code import ApprovedCodeMetadata
+from tools.adls import mapping_fingerprint, read_mapping_with_fingerprint, sample_source_data
+from tools.fingerprints import prompt_fingerprint, pseudocode_fingerprint, schema_fingerprint
 from tools.github_code import get_approved_code
+from tools.schema_diff import describe_diff, diff_profiles
 
 logger = logging.getLogger(__name__)
 
+# How long an LLM change-detection verdict is reused for the same inputs; 0 disables.
+VERDICT_CACHE_TTL = int(os.environ.get("VERDICT_CACHE_TTL", str(7 * 24 * 3600)))
+
+
+def approval_metadata(
+    client_id: str,
+    pseudocode: str,
+    mapping_path: str = "",
+    data_path: str = "",
+    approved_by: str = "auditor",
+) -> ApprovedCodeMetadata:
+    """Metadata for newly approved code, recording what its inputs looked like.
+
+    Best effort: if the mapping or source cannot be read, the error is logged and
+    the metadata is returned without those fingerprints (the next change
+    detection then falls through to the LLM), so approved code is always saved.
+    """
+    metadata = ApprovedCodeMetadata(
+        client_id=client_id,
+        approved_by=approved_by,
+        approved_at=datetime.utcnow(),
+        pseudocode_fingerprint=pseudocode_fingerprint(pseudocode),
+    )
+    if mapping_path:
+        metadata.mapping_path = mapping_path
+        try:
+            metadata.mapping_fingerprint = mapping_fingerprint(mapping_path)
+        except Exception:
+            logger.exception("Could not fingerprint mapping %s for %s; saving without it", mapping_path, client_id)
+    if data_path:
+        metadata.data_path = data_path
+        try:
+            sample = sample_source_data(data_path, include_frame=True)
+            schema_fp = schema_fingerprint(sample["columns"], sample["dtypes"])
+            metadata.source_profile = profile_source(data_path, sample)
+            metadata.schema_fingerprint = schema_fp
+        except Exception:
+            logger.exception("Could not profile source %s for %s; saving without it", data_path, client_id)
+    return metadata
+
+
+def _fingerprints_match(metadata: dict, pseudocode: str, mapping_fp: str, schema_fp: str) -> bool:
+    return (
+        metadata.get("mapping_fingerprint") == mapping_fp
+        and metadata.get("schema_fingerprint") == schema_fp
+        and metadata.get("pseudocode_fingerprint") == pseudocode_fingerprint(pseudocode)
+    )
+
+
+def _gather(client_id: str, required: str, **loaders: Callable) -> dict:
+    """Run the required loader, then the others concurrently, logging how long each took.
+
+    If the required loader returns None the others are not run at all.
+
+    Returns:
+        {name: loader result}, or {required: None}. Re-raises the first loader
+        error, after all finish.
+    """
+    timings = {}
+
+    def timed(name: str, load: Callable):
+        start = time.perf_counter()
+        try:
+            return load()
+        finally:
+            timings[name] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = {required: timed(required, loaders[required])}
+    others = {name: load for name, load in loaders.items() if name != required}
+    if results[required] is None:
+        logger.info("No %s for %s after %.2fs — skipping %s", required, client_id, timings[required],
+                    ", ".join(others) or "nothing")
+        return results
+
+    if others:
+        with ThreadPoolExecutor(max_workers=len(others)) as pool:
+            futures = {name: pool.submit(timed, name, load) for name, load in others.items()}
+            results.update({name: future.result() for name, future in futures.items()})
+    logger.info("Change-detection inputs for %s in %.2fs: %s", client_id, time.perf_counter() - start,
+                ", ".join(f"{name} {seconds:.2f}s" for name, seconds in timings.items()))
+    return results
+
+
+def _ask_llm(mapping: dict, sample: dict, pseudocode: str, diff_summary: str) -> dict:
+    """LLM verdict: {needs_regeneration, reason}."""
+    sections = plan_prompt("change_detection", CHANGE_DETECTION, {
+        "current_mapping": mapping,
+        "current_data_sample": {
+            "columns": sample["columns"],
+            "dtypes": sample["dtypes"],
+            "row_count": sample["row_count"],
+            "sample_rows": sample["sample_rows"][:10],
+        },
+        "stored_pseudocode": pseudocode,
+        "profile_diff": diff_summary,
+    }, sample_path=("current_data_sample", "sample_rows"))
+    user_message = json.dumps(sections, default=str)
+
+    result = run_agent_json(CHANGE_DETECTION, user_message, phase="change_detection")
+    return {"needs_regeneration": result["needs_regeneration"], "reason": result["reason"]}
+
 
 def run_change_detection(client_id: str, mapping_path: str, data_path: str) -> dict:
     """Phase 1: Determine if transformation needs regeneration.
@@ -20,29 +145,62 @@ def run_change_detection(client_id: str, mapping_path: str, data_path: str) -> d
     Returns:
         {needs_regeneration: bool, reason: str, existing_code: dict|None}
     """
+    # Without approved code the mapping and sample are not needed; with it they
+    # are independent reads
+    inputs = _gather(
+        client_id,
+        "approved_code",
+        approved_code=lambda: get_approved_code(client_id),
+        mapping=lambda: read_mapping_with_fingerprint(mapping_path),
+        data_sample=lambda: sample_source_data(data_path, include_frame=True),
+    )
+
     # Check if we have existing approved code
-    existing = get_approved_code(client_id)
+    existing = inputs["approved_code"]
     if existing is None:
         logger.info("No existing code for %s — needs full generation", client_id)
         return {"needs_regeneration": True, "reason": "No existing approved code", "existing_code": None}
 
-    # Read current inputs
-    mapping = read_mapping_spreadsheet(mapping_path)
-    sample = sample_source_data(data_path)
+    metadata = existing["metadata"]
+    sample = inputs["data_sample"]
+    mapping, mapping_fp = inputs["mapping"]
+    schema_fp = schema_fingerprint(sample["columns"], sample["dtypes"])
 
-    # Ask LLM to compare
-    user_message = json.dumps({
-        "current_mapping": mapping,
-        "current_data_sample": {
-            "columns": sample["columns"],
-            "dtypes": sample["dtypes"],
-            "row_count": sample["row_count"],
-            "sample_rows": sample["sample_rows"][:10],  # Limit for token budget
-        },
-        "stored_pseudocode": existing["pseudocode"],
-    }, default=str)
+    if _fingerprints_match(metadata, existing["pseudocode"], mapping_fp, schema_fp):
+        logger.info("Fingerprints unchanged for %s — reusing approved code", client_id)
+        return {
+            "needs_regeneration": False,
+            "reason": "Mapping, source schema and pseudocode are unchanged since approval",
+            "existing_code": existing,
+        }
+
+    # Deterministic check against the profile stored at approval time
+    profile_diff = None
+    stored_profile = metadata.get("source_profile")
+    if stored_profile:
+        profile_diff = diff_profiles(stored_profile, profile_source(data_path, sample))
+        if profile_diff["structural"]:
+            reason = f"Source schema changed: {describe_diff(profile_diff)}"
+            logger.info("%s for %s — skipping LLM comparison", reason, client_id)
+            return {"needs_regeneration": True, "reason": reason, "existing_code": None}
+    else:
+        sample.pop("frame")
+    diff_summary = describe_diff(profile_diff) if profile_diff else "(no stored profile)"
 
-    result = run_agent_json(CHANGE_DETECTION, user_message)
+    verdict_key = json.dumps([
+        mapping_fp, schema_fp, pseudocode_fingerprint(existing["pseudocode"]), diff_summary,
+        prompt_fingerprint(CHANGE_DETECTION),
+    ])
+    if VERDICT_CACHE_TTL > 0:
+        cache = get_json_cache("verdicts", VERDICT_CACHE_TTL)
+        result = cache.get(verdict_key)
+        logger.info("Verdict cache %s for %s (hit rate %.3f)",
+                    "miss" if result is None else "hit", client_id, cache.stats()["hit_rate"])
+        if result is None:
+            result = _ask_llm(mapping, sample, existing["pseudocode"], diff_summary)
+            cache.put(verdict_key, result)
+    else:
+        result = _ask_llm(mapping, sample, existing["pseudocode"], diff_summary)
 
     return {
         "needs_regeneration": result["needs_regeneration"],
@@ -1,9 +1,11 @@
 """Phase 4a: PySpark code generation from approved pseudocode."""
 
+import json
 import logging
 from agent.runner import run_agent_code
 from agent.prompts import CODE_GENERATION, CODE_FIX
 from tools.adls import sample_source_data
+from tools.semantic_types import infer_semantic_types
 
 logger = logging.getLogger(__name__)
 
@@ -22,10 +24,16 @@ def generate_pyspark(
     """
     # Get actual source column names to help LLM generate correct code
     source_columns = ""
+    column_types = "(none detected)"
     if data_path:
         try:
-            sample = sample_source_data(data_path, n_rows=5)
+            # Column names and types only need the head, whatever SAMPLE_STRATEGY
+            # profiling uses; other strategies stream the whole file on every attempt.
+            sample = sample_source_data(data_path, include_frame=True, strategy="head")
             source_columns = ", ".join(sample["columns"])
+            semantic_types = infer_semantic_types(sample["frame"])
+            if semantic_types:
+                column_types = json.dumps(semantic_types, indent=1)
         except Exception as e:
             logger.warning("Could not sample source data for column names: %s", e)
 
@@ -35,8 +43,9 @@ def generate_pyspark(
         client_id=client_id,
         pseudocode=pseudocode,
         source_columns=source_columns,
+        column_types=column_types,
     )
-    code = run_agent_code(prompt, "Generate the PySpark transformation code.")
+    code = run_agent_code(prompt, "Generate the PySpark transformation code.", phase="code_generation")
     logger.info("Generated PySpark code for %s (%d chars)", client_id, len(code))
     return code
 
@@ -48,6 +57,6 @@ def fix_pyspark(pyspark_code: str, error_log: str) -> str:
         Fixed PySpark code as string.
     """
     prompt = CODE_FIX.format(error_log=error_log, pyspark_code=pyspark_code)
-    code = run_agent_code(prompt, "Fix the code and return the complete corrected script.")
+    code = run_agent_code(prompt, "Fix the code and return the complete corrected script.", phase="code_fix")
     logger.info("Fixed PySpark code (%d chars)", len(code))
     return code
@@ -0,0 +1,95 @@
+"""Batch change detection across every client with approved code.
+
+Runs Phase 1 for each client in approved-code/ against the mapping and data
+paths recorded at approval, on a bounded thread pool, and collects one report
+of which clients need regeneration. Each client goes through the usual
+fingerprint -> profile diff -> LLM ladder, so unchanged clients cost a few
+storage reads and no LLM call.
+"""
+
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from activities.change_detection import run_change_detection
+from clients.adls import upload_file
+from clients.json_cache import get_json_cache_stats
+from tools.github_code import get_approved_code, list_approved_clients
+
+logger = logging.getLogger(__name__)
+
+# Clients checked concurrently. Work is mostly storage and LLM I/O.
+FLEET_SWEEP_WORKERS = int(os.environ.get("FLEET_SWEEP_WORKERS", "8"))
+
+# Reports are written to this ADLS container, under change-detection-sweeps/.
+REPORT_CONTAINER = "audit-trail"
+
+
+def _check_client(client_id: str) -> dict:
+    start = time.perf_counter()
+    entry = {"client_id": client_id}
+    try:
+        metadata = get_approved_code(client_id)["metadata"]
+        if not (metadata.get("mapping_path") and metadata.get("data_path")):
+            entry.update(status="skipped", reason="No mapping_path/data_path recorded at approval")
+        else:
+            detection = run_change_detection(client_id, metadata["mapping_path"], metadata["data_path"])
+            entry.update(
+                status="regenerate" if detection["needs_regeneration"] else "reuse",
+                reason=detection["reason"],
+            )
+    except Exception as e:
+        logger.exception("Change detection failed for %s", client_id)
+        entry.update(status="error", reason=str(e))
+    entry["seconds"] = round(time.perf_counter() - start, 3)
+    return entry
+
+
+def sweep_change_detection(client_ids: list[str] | None = None, workers: int | None = None) -> dict:
+    """Run change detection for many clients concurrently.
+
+    Args:
+        client_ids: Clients to check (default: every client in approved-code/).
+        workers: Concurrent checks (default FLEET_SWEEP_WORKERS).
+
+    Returns:
+        Report dict: started_at, seconds, counts per status, per-client results
+        ({client_id, status, reason, seconds}; status is "reuse", "regenerate",
+        "skipped" or "error") and cache hit rates.
+    """
+    client_ids = list_approved_clients() if client_ids is None else client_ids
+    workers = max(1, min(workers or FLEET_SWEEP_WORKERS, len(client_ids) or 1))
+    started_at = datetime.utcnow()
+    start = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(_check_client, client_ids))
+
+    counts = {}
+    for entry in results:
+        counts[entry["status"]] = counts.get(entry["status"], 0) + 1
+    report = {
+        "started_at": started_at.isoformat(),
+        "seconds": round(time.perf_counter() - start, 3),
+        "workers": workers,
+        "counts": counts,
+        "clients": results,
+        "cache_stats": get_json_cache_stats(),
+    }
+    logger.info("Change-detection sweep of %d clients in %.1fs: %s", len(results), report["seconds"], counts)
+    return report
+
+
+def save_sweep_report(report: dict) -> str:
+    """Write a sweep report to the audit-trail container.
+
+    Returns:
+        Path of the report within the container.
+    """
+    stamp = datetime.fromisoformat(report["started_at"]).strftime("%Y%m%d_%H%M%S")
+    path = f"change-detection-sweeps/{stamp}.json"
+    upload_file(REPORT_CONTAINER, path, json.dumps(report, indent=2, default=str).encode())
+    return path
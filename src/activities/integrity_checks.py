@@ -4,12 +4,23 @@ Validates transformation output against expected schema and business rules.
 """
 
 import logging
+
+import pyarrow as pa
 from models.integrity import CheckResult, IntegrityReport
 from tools.adls import read_spark_output
 
 logger = logging.getLogger(__name__)
 
 
+def _distinct_rows(table: pa.Table | None, sample_rows: list[dict]) -> int:
+    if table is not None and table.num_columns:
+        try:
+            return table.group_by(table.column_names).aggregate([]).num_rows
+        except (pa.ArrowNotImplementedError, pa.ArrowTypeError):
+            pass  # e.g. list or struct columns cannot be group keys
+    return len({str(sorted(row.items())) for row in sample_rows})
+
+
 def run_integrity_checks(output_path: str, expected_columns: list[str] | None = None) -> IntegrityReport:
     """Run deterministic validation on Spark output.
 
@@ -17,6 +28,7 @@ def run_integrity_checks(output_path: str, expected_columns: list[str] | None =
     - Output file exists and is readable
     - Row count > 0
     - Expected columns present (if provided)
+    - All Spark part files share one schema
     - No fully-null columns
     - No duplicate rows (sample-based)
 
@@ -28,7 +40,7 @@ def run_integrity_checks(output_path: str, expected_columns: list[str] | None =
 
     # 1. Read output
     try:
-        output = read_spark_output(output_path)
+        output = read_spark_output(output_path, include_table=True)
     except Exception as e:
         return IntegrityReport(
             checks=[CheckResult(name="read_output", passed=False, message=f"Failed to read output: {e}")],
@@ -60,12 +72,31 @@ def run_integrity_checks(output_path: str, expected_columns: list[str] | None =
         if missing:
             errors.append(f"Missing columns: {missing}")
 
+    # 3b. Part-file schema consistency (multi-part Spark output only)
+    if "schema_consistent" in output:
+        mismatches = output.get("schema_mismatches", [])
+        checks.append(CheckResult(
+            name="part_schema_consistency",
+            passed=output["schema_consistent"],
+            message=(f"{len(mismatches)} part files differ in schema" if mismatches
+                     else "All part files share the same schema"),
+            details={"mismatched_parts": mismatches, "part_file_count": output.get("part_file_count")},
+        ))
+        if mismatches:
+            errors.append(f"{len(mismatches)} part files have a different schema")
+
+    # The sample is checked on its Arrow table when the reader returned one
+    table: pa.Table | None = output.get("table")
+
     # 4. Null column check
     if output["sample_rows"]:
         sample_rows = output["sample_rows"]
         for col in output["columns"]:
-            null_count = sum(1 for row in sample_rows if row.get(col) is None)
-            if null_count == len(sample_rows):
+            if table is not None and col in table.column_names:
+                all_null = table.column(col).null_count == table.num_rows
+            else:
+                all_null = all(row.get(col) is None for row in sample_rows)
+            if all_null:
                 checks.append(CheckResult(
                     name=f"null_check_{col}",
                     passed=False,
@@ -75,14 +106,13 @@ def run_integrity_checks(output_path: str, expected_columns: list[str] | None =
 
     # 5. Duplicate check (on sample)
     if output["sample_rows"]:
-        sample_strs = [str(sorted(row.items())) for row in output["sample_rows"]]
-        unique_count = len(set(sample_strs))
-        dup_count = len(sample_strs) - unique_count
+        sample_size = len(output["sample_rows"])
+        dup_count = sample_size - _distinct_rows(table, output["sample_rows"])
         checks.append(CheckResult(
             name="duplicate_check",
             passed=dup_count == 0,
             message=f"{dup_count} duplicate rows found in sample" if dup_count else "No duplicates in sample",
-            details={"duplicates": dup_count, "sample_size": len(sample_strs)},
+            details={"duplicates": dup_count, "sample_size": sample_size},
         ))
         if dup_count > 0:
             errors.append(f"{dup_count} duplicate rows in sample")
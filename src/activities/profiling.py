@@ -3,10 +3,24 @@
 import json
 import logging
 import re
-from agent.runner import run_agent
+
+import pandas as pd
+import pyarrow as pa
+from agent.runner import is_json, run_agent
 from agent.prompts import PROFILING_AND_PSEUDOCODE, PSEUDOCODE_REVISION
-from tools.adls import read_mapping_spreadsheet, sample_source_data
-from tools.profiling import profile_data
+from agent.token_budget import plan_prompt
+from clients.adls import get_file_metadata
+from clients.json_cache import get_json_cache
+from tools.adls import iter_source_tables, read_mapping_spreadsheet, sample_source_data
+from tools.fingerprints import schema_fingerprint
+from tools.parallel_profiling import profile_chunks_parallel, profile_data_parallel
+from tools.semantic_types import annotate_profile
+from tools.profiling import (
+    PROFILE_CACHE_TTL,
+    PROFILE_CHUNK_ROWS,
+    PROFILE_MODE,
+    PROFILER_VERSION,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -70,6 +84,43 @@ def _enrich_with_samples(pseudocode: dict, sample_data: dict) -> dict:
     return pseudocode
 
 
+def _compute_profile(data_path: str, frame: pd.DataFrame | pa.Table) -> dict:
+    if PROFILE_MODE == "full":
+        profile = profile_chunks_parallel(iter_source_tables(data_path, PROFILE_CHUNK_ROWS))
+    else:
+        profile = profile_data_parallel(frame)
+    return annotate_profile(profile, frame)
+
+
+def profile_source(data_path: str, sample: dict | None = None) -> dict:
+    """Profile the source file, reusing the cached profile while its ETag and schema are unchanged.
+
+    Args:
+        sample: sample_source_data(data_path, include_frame=True) output, if the
+            caller already has one (its "frame" is popped).
+    """
+    if sample is None:
+        sample = sample_source_data(data_path, include_frame=True)
+    frame = sample.pop("frame")
+    if PROFILE_CACHE_TTL <= 0:
+        return _compute_profile(data_path, frame)
+
+    etag = get_file_metadata("data", data_path)["etag"]
+    key = json.dumps([
+        data_path, etag, schema_fingerprint(sample["columns"], sample["dtypes"]), PROFILER_VERSION, PROFILE_MODE,
+        sample["sample_strategy"], sample.get("stratify_by"),
+    ])
+    cache = get_json_cache("profiles", PROFILE_CACHE_TTL)
+    profile = cache.get(key)
+    if profile is not None:
+        logger.info("Reusing cached profile for %s (etag %s)", data_path, etag)
+        return profile
+
+    profile = _compute_profile(data_path, frame)
+    cache.put(key, profile)
+    return profile
+
+
 def run_profiling(client_id: str, mapping_path: str, data_path: str) -> str:
     """Phase 2: Profile data and generate structured pseudocode.
 
@@ -77,17 +128,21 @@ def run_profiling(client_id: str, mapping_path: str, data_path: str) -> str:
         Structured pseudocode as JSON string.
     """
     mapping = read_mapping_spreadsheet(mapping_path)
-    sample = sample_source_data(data_path)
-    profile = profile_data(sample)
+    sample = sample_source_data(data_path, include_frame=True)
+    profile = profile_source(data_path, sample)
 
-    user_message = json.dumps({
+    sections = plan_prompt("profiling", PROFILING_AND_PSEUDOCODE, {
         "client_id": client_id,
         "mapping": mapping,
         "data_profile": profile,
         "sample_rows": sample["sample_rows"][:20],
-    }, default=str)
+    }, profile_key="data_profile")
+    user_message = json.dumps(sections, default=str)
 
-    raw_response = run_agent(PROFILING_AND_PSEUDOCODE, user_message)
+    raw_response = run_agent(
+        PROFILING_AND_PSEUDOCODE, user_message, phase="profiling", stop_at_closing_fence=True,
+        cacheable=lambda text: is_json(_extract_json(text)),
+    )
 
     # Extract and validate JSON
     json_str = _extract_json(raw_response)
@@ -109,7 +164,10 @@ def revise_pseudocode(pseudocode: str, feedback: str) -> str:
         Revised structured pseudocode as JSON string.
     """
     prompt = PSEUDOCODE_REVISION.format(feedback=feedback, pseudocode=pseudocode)
-    raw_response = run_agent(prompt, "Please provide the revised pseudocode JSON.")
+    raw_response = run_agent(
+        prompt, "Please provide the revised pseudocode JSON.", phase="pseudocode_revision", stop_at_closing_fence=True,
+        cacheable=lambda text: is_json(_extract_json(text)),
+    )
 
     # Extract and validate JSON
     json_str = _extract_json(raw_response)
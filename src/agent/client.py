@@ -1,11 +1,32 @@
-"""Azure OpenAI client setup using DefaultAzureCredential."""
+"""Azure OpenAI client setup using DefaultAzureCredential.
 
+The client is built once per process and shared by all threads. Reusing it
+keeps the credential (probed once, not per call), the token provider's cached
+bearer token (refreshed shortly before it expires) and the HTTP connection pool
+(no new TLS handshake per call).
+
+Call latencies are tracked per client: the first call pays for the token and
+the handshake, later ones show the steady state (see get_client_latency_stats
+and scripts/bench_openai_client.py).
+"""
+
+import logging
 import os
-from openai import AzureOpenAI
+import threading
+import time
+
+from openai import AzureOpenAI, DefaultHttpxClient
 from azure.identity import DefaultAzureCredential, get_bearer_token_provider
 
+logger = logging.getLogger(__name__)
 
-def get_openai_client() -> AzureOpenAI:
+_lock = threading.Lock()
+_client: AzureOpenAI | None = None
+_latency = {"first_call": None, "calls": 0, "total": 0.0, "max": 0.0}
+
+
+def build_openai_client() -> AzureOpenAI:
+    """A new, unshared client; callers other than benchmarks use get_openai_client()."""
     token_provider = get_bearer_token_provider(
         DefaultAzureCredential(process_timeout=30),
         "https://cognitiveservices.azure.com/.default",
@@ -14,8 +35,58 @@ def get_openai_client() -> AzureOpenAI:
         azure_endpoint=os.environ["AZURE_OPENAI_ENDPOINT"],
         azure_ad_token_provider=token_provider,
         api_version="2024-10-21",
+        http_client=DefaultHttpxClient(),
     )
 
 
+def get_openai_client() -> AzureOpenAI:
+    """Process-wide Azure OpenAI client, created on first use."""
+    global _client
+    with _lock:
+        if _client is None:
+            start = time.perf_counter()
+            _client = build_openai_client()
+            logger.info("Created Azure OpenAI client in %.1f ms", (time.perf_counter() - start) * 1000)
+        return _client
+
+
+def _reset_latency() -> None:
+    _latency.update(first_call=None, calls=0, total=0.0, max=0.0)
+
+
+def reset_openai_client() -> None:
+    """Close and drop the shared client (e.g. after rotating the endpoint)."""
+    global _client
+    with _lock:
+        if _client is not None:
+            _client.close()
+            _client = None
+        _reset_latency()
+
+
+def record_call_latency(seconds: float) -> str:
+    """Record one LLM call on the shared client; returns "first call" or "steady state"."""
+    with _lock:
+        if _latency["first_call"] is None:
+            _latency["first_call"] = seconds
+            return "first call"
+        _latency["calls"] += 1
+        _latency["total"] += seconds
+        _latency["max"] = max(_latency["max"], seconds)
+        return "steady state"
+
+
+def get_client_latency_stats() -> dict:
+    """First-call latency and steady-state latency (later calls) of the shared client, in seconds."""
+    with _lock:
+        calls = _latency["calls"]
+        return {
+            "first_call_seconds": _latency["first_call"],
+            "steady_state_calls": calls,
+            "steady_state_mean_seconds": round(_latency["total"] / calls, 3) if calls else None,
+            "steady_state_max_seconds": round(_latency["max"], 3) if calls else None,
+        }
+
+
 def get_deployment() -> str:
     return os.environ["AZURE_OPENAI_DEPLOYMENT"]
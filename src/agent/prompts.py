@@ -6,6 +6,7 @@ You will receive:
 1. The current mapping spreadsheet (column definitions and transformation rules)
 2. A sample of the current source data (first 100 rows)
 3. The previously approved pseudocode (the plain-English transformation plan)
+4. profile_diff: how the source data's null rates, cardinalities and detected value formats have shifted since approval (column structure is already known to be unchanged when a diff is given)
 
 Compare the current inputs against the stored pseudocode. Determine if the data or mapping has changed in a way that requires regenerating the transformation.
 
@@ -101,6 +102,7 @@ IMPORTANT:
 - Include ALL field mappings from the mapping spreadsheet
 - Group related mappings into single field_mapping steps where logical
 - Order steps logically (read → map → transform → filter → output)
+- Where a profiled column has a semantic_type (date with spark_format, cusip/isin/sedol, currency_code, numeric_string), state the exact parse or cast (e.g. "parse Trade Date as MM/dd/yyyy") so it can be done natively instead of validating row by row. If a date has no spark_format but candidate_formats, the sample fits several formats: take the format from the mapping, or list the candidates as an open question for the auditor
 - Return ONLY valid JSON, no markdown or explanatory text"""
 
 PSEUDOCODE_REVISION = """You are a data engineering agent. The auditor has reviewed the structured pseudocode and provided feedback.
@@ -148,6 +150,9 @@ Client ID: {client_id}
 Source data columns (use these EXACT column names when reading from the input file):
 {source_columns}
 
+Detected column types (parse with native Spark functions, e.g. F.to_date(col, spark_format) or casts after stripping separators; do not validate row by row with Python UDFs; a date with candidate_formats instead of a spark_format is ambiguous, so use the format stated in the pseudocode):
+{column_types}
+
 Approved pseudocode:
 {pseudocode}"""
 
@@ -0,0 +1,84 @@
+"""Content-addressed cache for LLM responses (opt-in via LLM_CACHE_TTL).
+
+Durable activity retries, repeated review loops and dev reruns send
+byte-identical requests; with the cache on they are answered locally. The key
+is a hash of the whole request (deployment, messages, sampling parameters), so
+any change to a prompt or its inputs is a miss.
+
+Two tiers: an in-process LRU of recent responses, backed by the persistent
+"llm_responses" JSON cache (see clients.json_cache) with LLM_CACHE_TTL.
+Hits and misses are counted per calling phase.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from clients.json_cache import get_json_cache
+
+# Seconds a response is reused for an identical request; 0 (default) disables the cache.
+LLM_CACHE_TTL = int(os.environ.get("LLM_CACHE_TTL", "0"))
+
+# Responses kept in the in-process LRU tier.
+LLM_CACHE_MEMORY_ENTRIES = int(os.environ.get("LLM_CACHE_MEMORY_ENTRIES", "256"))
+
+_lock = threading.Lock()
+_memory: OrderedDict[str, str] = OrderedDict()
+_stats: dict[str, dict[str, int]] = {}
+
+
+def response_key(request: dict) -> str:
+    """Hash of a chat-completions request body."""
+    payload = json.dumps(request, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _remember(key: str, response: str) -> None:
+    with _lock:
+        _memory[key] = response
+        _memory.move_to_end(key)
+        while len(_memory) > LLM_CACHE_MEMORY_ENTRIES:
+            _memory.popitem(last=False)
+
+
+def _count(phase: str, hit: bool) -> None:
+    with _lock:
+        counts = _stats.setdefault(phase, {"hits": 0, "misses": 0})
+        counts["hits" if hit else "misses"] += 1
+
+
+def get_cached_response(key: str, phase: str) -> str | None:
+    """Cached response for key, from memory or the persistent store."""
+    with _lock:
+        response = _memory.get(key)
+        if response is not None:
+            _memory.move_to_end(key)
+    if response is None:
+        response = get_json_cache("llm_responses", LLM_CACHE_TTL).get(key)
+        if response is not None:
+            _remember(key, response)
+    _count(phase, response is not None)
+    return response
+
+
+def cache_response(key: str, response: str) -> None:
+    _remember(key, response)
+    get_json_cache("llm_responses", LLM_CACHE_TTL).put(key, response)
+
+
+def get_llm_cache_stats() -> dict[str, dict]:
+    """Hit/miss counts and hit rate per calling phase."""
+    with _lock:
+        return {
+            phase: {**counts, "hit_rate": round(counts["hits"] / (counts["hits"] + counts["misses"]), 3)}
+            for phase, counts in _stats.items()
+        }
+
+
+def reset_llm_cache() -> None:
+    """Clear the in-process tier and the counters (the persistent store is kept)."""
+    with _lock:
+        _memory.clear()
+        _stats.clear()
@@ -2,42 +2,107 @@
 
 import json
 import logging
-from agent.client import get_openai_client, get_deployment
+import os
+import threading
+import time
+from typing import Callable
+from agent.client import get_client_latency_stats, get_deployment, get_openai_client, record_call_latency
+from agent.response_cache import LLM_CACHE_TTL, cache_response, get_cached_response, response_key
+from agent.streaming import stream_completion
 
 logger = logging.getLogger(__name__)
 
+# "blocking" waits for the whole completion; "streaming" consumes tokens as they
+# arrive, reports time to first token, and lets code/JSON calls stop at the closing fence.
+LLM_RESPONSE_MODE = os.environ.get("LLM_RESPONSE_MODE", "blocking")
 
-def run_agent(system_prompt: str, user_message: str) -> str:
+_last_call = threading.local()
+
+
+def get_last_call_stats() -> dict | None:
+    """Timing stats of this thread's most recent LLM call (None if it was a cache hit)."""
+    return getattr(_last_call, "stats", None)
+
+
+def run_agent(
+    system_prompt: str,
+    user_message: str,
+    phase: str = "default",
+    stop_at_closing_fence: bool = False,
+    cacheable: Callable[[str], bool] | None = None,
+) -> str:
     """Run an agent call with a system prompt and user message.
 
+    Args:
+        phase: Calling phase (e.g. "change_detection"), for response-cache stats.
+        stop_at_closing_fence: In streaming mode, stop reading once a response
+            that opens with a code fence closes it (text after it is dropped).
+        cacheable: Caller's check that a fresh response parses; responses it
+            rejects are returned but not cached, so a retry asks again.
+
     Returns the assistant's response text.
     """
-    client = get_openai_client()
     deployment = get_deployment()
-
-    logger.info("Calling Azure OpenAI (deployment=%s)", deployment)
-
-    response = client.chat.completions.create(
-        model=deployment,
-        messages=[
+    request = {
+        "model": deployment,
+        "messages": [
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_message},
         ],
-    )
+    }
 
-    result = response.choices[0].message.content
-    logger.info(
-        "LLM response: %d chars, %d prompt tokens, %d completion tokens",
-        len(result),
-        response.usage.prompt_tokens,
-        response.usage.completion_tokens,
-    )
+    _last_call.stats = None
+    cache_key = response_key(request) if LLM_CACHE_TTL > 0 else None
+    if cache_key:
+        cached = get_cached_response(cache_key, phase)
+        if cached is not None:
+            logger.info("LLM response cache hit (phase=%s, %d chars)", phase, len(cached))
+            return cached
+
+    client = get_openai_client()
+    logger.info("Calling Azure OpenAI (deployment=%s, phase=%s, mode=%s)", deployment, phase, LLM_RESPONSE_MODE)
+
+    if LLM_RESPONSE_MODE == "streaming":
+        result, _last_call.stats = stream_completion(client, request, stop_at_closing_fence)
+    else:
+        start = time.perf_counter()
+        response = client.chat.completions.create(**request)
+        latency = time.perf_counter() - start
+
+        result = response.choices[0].message.content
+        logger.info(
+            "LLM response in %.2fs: %d chars, %d prompt tokens, %d completion tokens",
+            latency,
+            len(result),
+            response.usage.prompt_tokens,
+            response.usage.completion_tokens,
+        )
+        _last_call.stats = {
+            "ttft": None,
+            "seconds": round(latency, 3),
+            "completion_tokens": response.usage.completion_tokens,
+            "tokens_per_second": round(response.usage.completion_tokens / latency, 1) if latency > 0 else None,
+            "stopped_early": False,
+        }
+    kind = record_call_latency(_last_call.stats["seconds"])
+    if kind == "steady state":
+        steady = get_client_latency_stats()
+        logger.info("LLM call latency %.2fs (steady state; mean %.2fs over %d calls, first call %.2fs)",
+                    _last_call.stats["seconds"], steady["steady_state_mean_seconds"],
+                    steady["steady_state_calls"], steady["first_call_seconds"])
+    else:
+        logger.info("LLM call latency %.2fs (first call on this client)", _last_call.stats["seconds"])
+    if cache_key:
+        if cacheable is None or cacheable(result):
+            cache_response(cache_key, result)
+        else:
+            logger.warning("Not caching unparseable LLM response (phase=%s)", phase)
     return result
 
 
-def run_agent_code(system_prompt: str, user_message: str) -> str:
+def run_agent_code(system_prompt: str, user_message: str, phase: str = "default") -> str:
     """Run agent and extract clean Python code from the response."""
-    result = run_agent(system_prompt, user_message)
+    result = run_agent(system_prompt, user_message, phase=phase, stop_at_closing_fence=True)
     text = result.strip()
 
     # Strip markdown code fences if present
@@ -62,15 +127,28 @@ def run_agent_code(system_prompt: str, user_message: str) -> str:
     return "\n".join(final_lines[start_idx:])
 
 
-def run_agent_json(system_prompt: str, user_message: str) -> dict:
-    """Run agent and parse the response as JSON."""
-    result = run_agent(system_prompt, user_message)
-
+def _strip_json_fence(result: str) -> str:
     # Try to extract JSON from the response (handle markdown code blocks)
     text = result.strip()
     if text.startswith("```"):
         lines = text.split("\n")
         # Remove first and last lines (```json and ```)
         text = "\n".join(lines[1:-1])
+    return text
+
 
-    return json.loads(text)
+def is_json(text: str) -> bool:
+    try:
+        json.loads(text)
+    except ValueError:
+        return False
+    return True
+
+
+def run_agent_json(system_prompt: str, user_message: str, phase: str = "default") -> dict:
+    """Run agent and parse the response as JSON."""
+    result = run_agent(
+        system_prompt, user_message, phase=phase, stop_at_closing_fence=True,
+        cacheable=lambda text: is_json(_strip_json_fence(text)),
+    )
+    return json.loads(_strip_json_fence(result))
@@ -0,0 +1,90 @@
+"""Streaming chat completions with incremental code-fence detection.
+
+Tokens are consumed as they arrive. When the caller only wants the fenced
+block (run_agent_code, run_agent_json, and the pseudocode JSON of the profiling
+phase) and the response opens with a fence, the stream is closed as soon as the closing fence line arrives, so trailing
+commentary is neither waited for nor billed.
+
+Each call reports time to first token and generation speed in tokens per
+second (from the usage chunk, or one token per content chunk when the stream
+was stopped before usage arrived).
+"""
+
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class FenceWatcher:
+    """Follows streamed text line by line and notices when the opening code fence closes."""
+
+    def __init__(self):
+        self.opens_with_fence: bool | None = None
+        self.close_end: int | None = None  # offset just past the closing fence line
+        self._offset = 0  # offset of the start of the pending line
+        self._pending = ""
+
+    def feed(self, delta: str) -> bool:
+        """Add streamed text; True once the fence that opened the response has closed."""
+        self._pending += delta
+        while self.close_end is None and "\n" in self._pending:
+            line, self._pending = self._pending.split("\n", 1)
+            self._offset += len(line) + 1
+            stripped = line.strip()
+            if self.opens_with_fence is None:
+                if stripped:
+                    self.opens_with_fence = stripped.startswith("```")
+            elif self.opens_with_fence and stripped == "```":
+                self.close_end = self._offset
+        return self.close_end is not None
+
+
+def stream_completion(client, request: dict, stop_at_closing_fence: bool = False) -> tuple[str, dict]:
+    """Run a chat completion as a stream.
+
+    Returns:
+        (response text, {ttft, seconds, completion_tokens, tokens_per_second, stopped_early})
+    """
+    start = time.perf_counter()
+    stream = client.chat.completions.create(**request, stream=True, stream_options={"include_usage": True})
+    watcher = FenceWatcher()
+    parts, chunks, ttft, usage, stopped = [], 0, None, None, False
+    try:
+        for chunk in stream:
+            if chunk.usage:
+                usage = chunk.usage
+            # Azure sends a prompt-filter chunk with no choices first, and usage last
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if not delta:
+                continue
+            if ttft is None:
+                ttft = time.perf_counter() - start
+            chunks += 1
+            parts.append(delta)
+            if stop_at_closing_fence and watcher.feed(delta):
+                stopped = True
+                break
+    finally:
+        stream.close()
+    seconds = time.perf_counter() - start
+
+    text = "".join(parts)
+    if stopped:
+        text = text[:watcher.close_end]
+    tokens = usage.completion_tokens if usage else chunks
+    generating = seconds - (ttft or 0.0)
+    stats = {
+        "ttft": round(ttft, 3) if ttft is not None else None,
+        "seconds": round(seconds, 3),
+        "completion_tokens": tokens,
+        "tokens_per_second": round(tokens / generating, 1) if generating > 0 else None,
+        "stopped_early": stopped,
+    }
+    logger.info(
+        "LLM stream in %.2fs: first token after %.2fs, %d tokens at %s tokens/s%s",
+        seconds, ttft or 0.0, tokens, stats["tokens_per_second"], " (stopped at closing fence)" if stopped else "",
+    )
+    return text, stats
@@ -0,0 +1,177 @@
+"""Token budgets for LLM prompts.
+
+Measures each section of a prompt's JSON user message with tiktoken and, when
+the prompt exceeds its phase's budget, trims the least valuable content first:
+
+1. source columns that are entirely null, and not named in the other sections
+   (e.g. the mapping), are dropped from the profile and the sample rows;
+2. long sample cells are truncated;
+3. sample rows are halved, down to MIN_SAMPLE_ROWS;
+4. profile top values are cut to the two most frequent.
+
+Mapping rules and pseudocode are never trimmed. The final allocation per
+section is logged for every planned prompt.
+"""
+
+import json
+import logging
+import os
+import threading
+
+import tiktoken
+
+logger = logging.getLogger(__name__)
+
+# tiktoken encoding of the deployed model (o200k_base: GPT-4o family).
+TOKEN_ENCODING = os.environ.get("TOKEN_ENCODING", "o200k_base")
+
+# Prompt budgets (system prompt + user message) per phase; unknown phases are not trimmed.
+PHASE_TOKEN_BUDGETS = {
+    "profiling": int(os.environ.get("PROFILING_TOKEN_BUDGET", "60000")),
+    "change_detection": int(os.environ.get("CHANGE_DETECTION_TOKEN_BUDGET", "20000")),
+}
+
+MAX_CELL_CHARS = 200
+MIN_SAMPLE_ROWS = 3
+
+_lock = threading.Lock()
+_encoding = None
+_encoding_failed = False
+
+
+def _get_encoding():
+    global _encoding, _encoding_failed
+    with _lock:
+        if _encoding is None and not _encoding_failed:
+            try:
+                _encoding = tiktoken.get_encoding(TOKEN_ENCODING)
+            except Exception as e:
+                # The BPE file is downloaded on first use; offline, fall back to an estimate
+                logger.warning("Could not load tiktoken encoding %s (%s); estimating 4 chars per token",
+                               TOKEN_ENCODING, e)
+                _encoding_failed = True
+        return _encoding
+
+
+def count_tokens(text: str) -> int:
+    encoding = _get_encoding()
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def _section_tokens(sections: dict) -> dict[str, int]:
+    return {name: count_tokens(json.dumps(value, default=str)) for name, value in sections.items()}
+
+
+def _get_path(obj: dict, path: tuple):
+    for key in path:
+        if not isinstance(obj, dict) or key not in obj:
+            return None
+        obj = obj[key]
+    return obj
+
+
+def _set_path(obj: dict, path: tuple, value) -> None:
+    for key in path[:-1]:
+        obj = obj[key]
+    obj[path[-1]] = value
+
+
+def _low_value_columns(profile: dict | None, rows: list[dict], context: str) -> set:
+    """All-null columns that context (the untrimmed sections, as JSON) does not mention.
+
+    Constant columns are kept: a single repeated value (a currency, a fund code)
+    is often exactly what a mapping rule filters or defaults on.
+    """
+    if profile:
+        empty = {col for col, stats in profile.get("columns", {}).items() if stats.get("null_rate") == 1.0}
+    elif rows:
+        empty = {col for col in rows[0] if all(row.get(col) in (None, "") for row in rows)}
+    else:
+        empty = set()
+    return {col for col in empty if col not in context}
+
+
+def _truncate(value):
+    if isinstance(value, str) and len(value) > MAX_CELL_CHARS:
+        return value[:MAX_CELL_CHARS] + "…"
+    return value
+
+
+def plan_prompt(
+    phase: str,
+    system_prompt: str,
+    sections: dict,
+    sample_path: tuple = ("sample_rows",),
+    profile_key: str | None = None,
+) -> dict:
+    """Trim prompt sections to the phase's token budget.
+
+    Args:
+        phase: Key into PHASE_TOKEN_BUDGETS.
+        system_prompt: Counted against the budget, never trimmed.
+        sections: The user message's top-level fields (serialised as JSON).
+        sample_path: Path within sections to the source sample rows.
+        profile_key: Section holding the tools.profiling output, if any.
+
+    Returns:
+        A trimmed copy of sections (sections itself is not modified).
+    """
+    sections = json.loads(json.dumps(sections, default=str))
+    budget = PHASE_TOKEN_BUDGETS.get(phase)
+    system_tokens = count_tokens(system_prompt)
+    tokens = _section_tokens(sections)
+    original = system_tokens + sum(tokens.values())
+    actions = []
+
+    def over() -> bool:
+        return budget is not None and system_tokens + sum(tokens.values()) > budget
+
+    def update(*names: str) -> None:
+        tokens.update(_section_tokens({name: sections[name] for name in names if name in sections}))
+
+    profile = sections.get(profile_key) if profile_key else None
+    rows = _get_path(sections, sample_path) or []
+    touched = [name for name in (profile_key, sample_path[0]) if name]
+
+    if over():
+        context = json.dumps({name: value for name, value in sections.items() if name not in touched}, default=str)
+        dropped = _low_value_columns(profile, rows, context)
+        if dropped:
+            if profile:
+                for col in dropped:
+                    profile["columns"].pop(col, None)
+            rows = [{k: v for k, v in row.items() if k not in dropped} for row in rows]
+            _set_path(sections, sample_path, rows)
+            update(*touched)
+            actions.append(f"dropped {len(dropped)} empty columns")
+
+    if over() and rows:
+        rows = [{k: _truncate(v) for k, v in row.items()} for row in rows]
+        _set_path(sections, sample_path, rows)
+        update(sample_path[0])
+        actions.append(f"truncated cells to {MAX_CELL_CHARS} chars")
+
+    sampled = len(rows)
+    while over() and len(rows) > MIN_SAMPLE_ROWS:
+        rows = rows[:max(MIN_SAMPLE_ROWS, len(rows) // 2)]
+        _set_path(sections, sample_path, rows)
+        update(sample_path[0])
+    if len(rows) < sampled:
+        actions.append(f"kept {len(rows)} of {sampled} sample rows")
+
+    if over() and profile:
+        for stats in profile.get("columns", {}).values():
+            if "top_values" in stats:
+                stats["top_values"] = dict(list(stats["top_values"].items())[:2])
+        update(profile_key)
+        actions.append("cut top values to 2 per column")
+
+    total = system_tokens + sum(tokens.values())
+    allocation = ", ".join(f"{name} {count}" for name, count in {"system": system_tokens, **tokens}.items())
+    logger.info("Prompt tokens for %s: %d of %s budget (was %d) — %s%s", phase, total, budget or "no",
+                original, allocation, f"; {'; '.join(actions)}" if actions else "")
+    if over():
+        logger.warning("Prompt for %s still exceeds its %d-token budget after trimming", phase, budget)
+    return sections
@@ -7,6 +7,8 @@ from pathlib import Path
 import pandas as pd
 from agent_framework import tool
 
+from tools.arrow_io import read_csv_table, to_pandas
+
 # Base path for input data
 INPUT_DIR = Path(__file__).parent.parent.parent / "input_data"
 
@@ -107,7 +109,7 @@ def read_source_data_sample(
     n_rows: Annotated[int, "Number of rows to sample"] = 10
 ) -> str:
     """Read sample rows from Effective_Transactions source file."""
-    df = pd.read_csv(INPUT_DIR / "Effective_Transactions_sample.csv", nrows=n_rows)
+    df = to_pandas(read_csv_table(str(INPUT_DIR / "Effective_Transactions_sample.csv"), n_rows=n_rows))
 
     result = {
         "columns": list(df.columns),
@@ -121,7 +123,7 @@ def read_source_data_sample(
 @tool
 def list_source_columns() -> str:
     """List all column names in the source file with their data types."""
-    df = pd.read_csv(INPUT_DIR / "Effective_Transactions_sample.csv", nrows=5)
+    df = to_pandas(read_csv_table(str(INPUT_DIR / "Effective_Transactions_sample.csv"), n_rows=5))
 
     columns = []
     for col in df.columns:
@@ -137,7 +139,7 @@ def list_source_columns() -> str:
 @tool
 def get_data_profile() -> str:
     """Get a statistical profile of the source data (nulls, uniques, distributions)."""
-    df = pd.read_csv(INPUT_DIR / "Effective_Transactions_sample.csv")
+    df = to_pandas(read_csv_table(str(INPUT_DIR / "Effective_Transactions_sample.csv")))
 
     profile = {
         "row_count": len(df),
@@ -1,43 +1,415 @@
 import os
 import io
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Callable
+
+import requests
+from azure.core.pipeline.transport import RequestsTransport
 from azure.identity import DefaultAzureCredential
-from azure.storage.filedatalake import DataLakeServiceClient
+from azure.storage.filedatalake import DataLakeServiceClient, FileSystemClient
+
+from clients.download_cache import CACHE_DIR, CACHE_MAX_BYTES, DownloadCache
+from clients.storage import StorageBackend
+
+# "azure" (default) or "local" (LOCAL_STORAGE_ROOT directory, see clients/local_storage.py).
+STORAGE_BACKEND = os.environ.get("STORAGE_BACKEND", "azure")
+
+# Connections kept alive per account. Functions runs activities on a thread pool
+# (PYTHON_THREADPOOL_THREAD_COUNT), so the pool should be at least that large.
+POOL_SIZE = int(os.environ.get("ADLS_POOL_SIZE", "16"))
+
+# Streaming uploads hold at most UPLOAD_CONCURRENCY blocks of UPLOAD_BLOCK_SIZE in memory.
+UPLOAD_BLOCK_SIZE = int(os.environ.get("ADLS_UPLOAD_BLOCK_SIZE", str(8 * 1024 * 1024)))
+UPLOAD_CONCURRENCY = int(os.environ.get("ADLS_UPLOAD_CONCURRENCY", "4"))
+
+_lock = threading.Lock()
+_credential: DefaultAzureCredential | None = None
+_download_cache: DownloadCache | None = None
+_backend: StorageBackend | None = None
+
+
+def _get_credential() -> DefaultAzureCredential:
+    """Shared credential so the credential chain is probed once and tokens are reused."""
+    global _credential
+    if _credential is None:
+        with _lock:
+            if _credential is None:
+                _credential = DefaultAzureCredential()
+    return _credential
+
+
+def _pooled_transport() -> RequestsTransport:
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+    session.mount("https://", adapter)
+    return RequestsTransport(session=session, session_owner=False)
+
+
+def get_download_cache() -> DownloadCache | None:
+    """Process-wide download cache, or None when disabled (ADLS_CACHE_MAX_BYTES=0)."""
+    global _download_cache
+    if CACHE_MAX_BYTES <= 0:
+        return None
+    if _download_cache is None:
+        with _lock:
+            if _download_cache is None:
+                _download_cache = DownloadCache(CACHE_DIR, CACHE_MAX_BYTES)
+    return _download_cache
+
+
+def get_download_cache_stats() -> dict:
+    cache = get_download_cache()
+    return cache.stats() if cache else {"hits": 0, "misses": 0, "hit_rate": 0.0, "bytes_saved": 0}
+
+
+class _ChunkStream(io.RawIOBase):
+    """Read-only file object over an iterator of byte chunks."""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._buffer = memoryview(b"")
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        while not self._buffer:
+            try:
+                self._buffer = memoryview(next(self._chunks))
+            except StopIteration:
+                return 0
+        n = min(len(b), len(self._buffer))
+        b[:n] = self._buffer[:n]
+        self._buffer = self._buffer[n:]
+        return n
+
+
+class AzureStorageBackend(StorageBackend):
+    """ADLS Gen2 backend with a registry of pooled clients.
+
+    Holds one service client per account and one file-system client per
+    (account, container). Clients are thread-safe once built; the lock only
+    guards lazy construction. Without an explicit credential the process-wide
+    DefaultAzureCredential is shared.
+    """
+
+    def __init__(self, credential=None):
+        self._credential = credential
+        self._lock = threading.Lock()
+        self._service_clients: dict[str, DataLakeServiceClient] = {}
+        self._fs_clients: dict[tuple[str, str], FileSystemClient] = {}
+
+    @property
+    def credential(self):
+        """The credential passed in, or None when the shared default is used."""
+        return self._credential
+
+    def get_service_client(self) -> DataLakeServiceClient:
+        account_name = os.environ["ADLS_ACCOUNT_NAME"]
+        client = self._service_clients.get(account_name)
+        if client is None:
+            credential = self._credential or _get_credential()
+            with self._lock:
+                client = self._service_clients.get(account_name)
+                if client is None:
+                    client = DataLakeServiceClient(
+                        account_url=f"https://{account_name}.dfs.core.windows.net",
+                        credential=credential,
+                        transport=_pooled_transport(),
+                    )
+                    self._service_clients[account_name] = client
+        return client
+
+    def get_file_system_client(self, container: str) -> FileSystemClient:
+        key = (os.environ["ADLS_ACCOUNT_NAME"], container)
+        fs = self._fs_clients.get(key)
+        if fs is None:
+            service = self.get_service_client()
+            with self._lock:
+                fs = self._fs_clients.get(key)
+                if fs is None:
+                    fs = service.get_file_system_client(container)
+                    self._fs_clients[key] = fs
+        return fs
+
+    def reset(self) -> None:
+        with self._lock:
+            self._fs_clients.clear()
+            self._service_clients.clear()
+
+    def download_file(self, container: str, path: str) -> bytes:
+        """Download a whole file, served from the local cache when its ETag is unchanged."""
+        fs = self.get_file_system_client(container)
+        file_client = fs.get_file_client(path)
+        cache = get_download_cache()
+        if cache is None:
+            return file_client.download_file().readall()
+
+        key = f"{fs.account_name}/{container}/{path}"
+        cached = cache.get(key, file_client.get_file_properties().etag)
+        if cached is not None:
+            return cached
+
+        download = file_client.download_file()
+        data = download.readall()
+        # Store under the ETag of the bytes actually downloaded, not the one probed above
+        cache.put(key, download.properties.etag, data)
+        return data
+
+    def download_range(self, container: str, path: str, offset: int, length: int) -> bytes:
+        file_client = self.get_file_system_client(container).get_file_client(path)
+        return file_client.download_file(offset=offset, length=length).readall()
+
+    def open_stream(self, container: str, path: str) -> io.BufferedReader:
+        file_client = self.get_file_system_client(container).get_file_client(path)
+        return io.BufferedReader(_ChunkStream(file_client.download_file().chunks()), buffer_size=1 << 20)
+
+    def upload_file(self, container: str, path: str, data: bytes) -> None:
+        file_client = self.get_file_system_client(container).get_file_client(path)
+        file_client.upload_data(data, overwrite=True)
+
+    def upload_stream(
+        self,
+        container: str,
+        path: str,
+        stream: BinaryIO,
+        total_size: int | None = None,
+        block_size: int | None = None,
+        max_concurrency: int | None = None,
+        progress: Callable[[int, int | None], None] | None = None,
+    ) -> int:
+        """Append fixed-size blocks in parallel to a temporary file, flush, then rename it over path.
+
+        The existing file at path is only replaced once every block has landed; on
+        failure it is left as it was and the temporary file is deleted.
+        """
+        block_size = block_size or UPLOAD_BLOCK_SIZE
+        max_concurrency = max_concurrency or UPLOAD_CONCURRENCY
+        fs = self.get_file_system_client(container)
+        # Dot-prefixed, so Spark and list-based readers skip it while it is written
+        directory, _, name = path.rpartition("/")
+        temp_name = f".{name}.{uuid.uuid4().hex}.uploading"
+        temp_path = f"{directory}/{temp_name}" if directory else temp_name
+        file_client = fs.get_file_client(temp_path)
+        file_client.create_file()
+        try:
+            size = self._append_blocks(file_client, stream, total_size, block_size, max_concurrency, progress)
+            file_client.rename_file(f"{fs.file_system_name}/{path}")
+        except BaseException:
+            try:
+                file_client.delete_file()
+            except Exception:
+                pass  # the upload error matters more than the leftover temporary file
+            raise
+        return size
+
+    @staticmethod
+    def _append_blocks(
+        file_client,
+        stream: BinaryIO,
+        total_size: int | None,
+        block_size: int,
+        max_concurrency: int,
+        progress: Callable[[int, int | None], None] | None,
+    ) -> int:
+        """Append the stream's blocks in parallel and flush them; returns the size."""
+        slots = threading.BoundedSemaphore(max_concurrency)
+        progress_lock = threading.Lock()
+        uploaded = 0
+        errors: list[Exception] = []
+
+        def append(block: bytes, offset: int) -> None:
+            nonlocal uploaded
+            try:
+                file_client.append_data(block, offset=offset, length=len(block))
+            except Exception as e:
+                errors.append(e)
+                return
+            finally:
+                slots.release()
+            with progress_lock:
+                uploaded += len(block)
+                if progress:
+                    progress(uploaded, total_size)
+
+        offset = 0
+        with ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+            while not errors:
+                slots.acquire()  # wait for a free slot before reading the next block
+                block = stream.read(block_size)
+                if not block:
+                    slots.release()
+                    break
+                pool.submit(append, block, offset)
+                offset += len(block)
+
+        if errors:
+            raise errors[0]
+
+        # Appended data only becomes visible once flushed at the final length
+        file_client.flush_data(offset)
+        return offset
+
+    def list_files(self, container: str, prefix: str = "") -> list[str]:
+        paths = self.get_file_system_client(container).get_paths(path=prefix)
+        return [p.name for p in paths]
+
+    def list_file_properties(self, container: str, prefix: str = "") -> list[dict]:
+        return [
+            {"name": p.name, "size": p.content_length, "last_modified": str(p.last_modified)}
+            for p in self.get_file_system_client(container).get_paths(path=prefix)
+            if not p.is_directory
+        ]
+
+    def get_file_metadata(self, container: str, path: str) -> dict:
+        file_client = self.get_file_system_client(container).get_file_client(path)
+        props = file_client.get_file_properties()
+        return {"etag": props.etag, "size": props.size, "last_modified": str(props.last_modified)}
+
+
+_default_azure = AzureStorageBackend()
+
+
+def get_storage_backend() -> StorageBackend:
+    """Active backend: set_storage_backend() override, else per STORAGE_BACKEND."""
+    global _backend
+    if _backend is None:
+        with _lock:
+            if _backend is None:
+                if STORAGE_BACKEND == "local":
+                    from clients.local_storage import LocalStorageBackend
+
+                    _backend = LocalStorageBackend(os.environ["LOCAL_STORAGE_ROOT"])
+                else:
+                    _backend = _default_azure
+    return _backend
+
+
+def set_storage_backend(backend: StorageBackend | None) -> None:
+    """Swap the backend for this process (None restores the configured default)."""
+    global _backend
+    with _lock:
+        _backend = backend
+
+
+def _azure_backend() -> AzureStorageBackend:
+    backend = get_storage_backend()
+    return backend if isinstance(backend, AzureStorageBackend) else _default_azure
 
 
 def get_adls_client() -> DataLakeServiceClient:
-    account_name = os.environ["ADLS_ACCOUNT_NAME"]
-    return DataLakeServiceClient(
-        account_url=f"https://{account_name}.dfs.core.windows.net",
-        credential=DefaultAzureCredential(),
-    )
+    return _azure_backend().get_service_client()
+
+
+def get_file_system_client(container: str) -> FileSystemClient:
+    """Cached file-system client for a container, sharing the account's connection pool."""
+    return _azure_backend().get_file_system_client(container)
+
+
+def reset_adls_clients() -> None:
+    """Drop all cached clients and the shared credential (e.g. after credential rotation)."""
+    global _credential
+    _azure_backend().reset()
+    with _lock:
+        _credential = None
 
 
 def download_file(container: str, path: str) -> bytes:
-    client = get_adls_client()
-    fs = client.get_file_system_client(container)
-    file_client = fs.get_file_client(path)
-    download = file_client.download_file()
-    return download.readall()
+    return get_storage_backend().download_file(container, path)
+
+
+def download_range(container: str, path: str, offset: int, length: int) -> bytes:
+    """Download `length` bytes starting at `offset` (a single ranged GET)."""
+    return get_storage_backend().download_range(container, path, offset, length)
+
+
+def open_stream(container: str, path: str) -> BinaryIO:
+    """Open a file for sequential reading without holding the whole blob in memory."""
+    return get_storage_backend().open_stream(container, path)
+
+
+class RangedFile(io.RawIOBase):
+    """Seekable read-only file object that fetches bytes with ranged GETs on demand.
+
+    Lets readers such as pyarrow.parquet jump to the footer and read only the
+    column chunks they need instead of downloading the whole blob.
+    """
+
+    def __init__(self, container: str, path: str, size: int | None = None, tail: bytes = b""):
+        self.container = container
+        self.path = path
+        self.size = size if size is not None else get_file_metadata(container, path)["size"]
+        # Optional prefetched last bytes of the file (e.g. a Parquet footer fetched in bulk)
+        self._tail = tail
+        self._tail_start = self.size - len(tail)
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._pos, io.SEEK_END: self.size}[whence]
+        self._pos = max(0, base + offset)
+        return self._pos
+
+    def readinto(self, b) -> int:
+        length = min(len(b), self.size - self._pos)
+        if length <= 0:
+            return 0
+        if self._tail and self._pos >= self._tail_start:
+            start = self._pos - self._tail_start
+            data = self._tail[start:start + length]
+        else:
+            data = download_range(self.container, self.path, self._pos, length)
+        b[:len(data)] = data
+        self._pos += len(data)
+        return len(data)
 
 
 def upload_file(container: str, path: str, data: bytes) -> None:
-    client = get_adls_client()
-    fs = client.get_file_system_client(container)
-    file_client = fs.get_file_client(path)
-    file_client.upload_data(data, overwrite=True)
+    get_storage_backend().upload_file(container, path, data)
+
+
+def upload_stream(
+    container: str,
+    path: str,
+    stream: BinaryIO,
+    total_size: int | None = None,
+    block_size: int = UPLOAD_BLOCK_SIZE,
+    max_concurrency: int = UPLOAD_CONCURRENCY,
+    progress: Callable[[int, int | None], None] | None = None,
+) -> int:
+    """Upload from a file handle in fixed-size blocks appended in parallel, then commit.
+
+    Peak memory is about block_size * max_concurrency regardless of file size.
+    progress(bytes_uploaded, total_size) is called after each block lands.
+
+    Returns:
+        Number of bytes uploaded.
+    """
+    return get_storage_backend().upload_stream(
+        container, path, stream, total_size=total_size, block_size=block_size,
+        max_concurrency=max_concurrency, progress=progress,
+    )
 
 
 def list_files(container: str, prefix: str = "") -> list[str]:
-    client = get_adls_client()
-    fs = client.get_file_system_client(container)
-    paths = fs.get_paths(path=prefix)
-    return [p.name for p in paths]
+    return get_storage_backend().list_files(container, prefix)
+
+
+def list_file_properties(container: str, prefix: str = "") -> list[dict]:
+    """List files under a prefix with sizes, skipping directories."""
+    return get_storage_backend().list_file_properties(container, prefix)
 
 
 def get_file_metadata(container: str, path: str) -> dict:
     """Get file properties including ETag."""
-    client = get_adls_client()
-    fs = client.get_file_system_client(container)
-    file_client = fs.get_file_client(path)
-    props = file_client.get_file_properties()
-    return {"etag": props.etag, "size": props.size, "last_modified": str(props.last_modified)}
+    return get_storage_backend().get_file_metadata(container, path)
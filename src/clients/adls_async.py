@@ -0,0 +1,171 @@
+"""Async ADLS client layer for fetching several files concurrently.
+
+Built on the SDK's aio clients. Async callers await the functions directly; sync
+callers go through run_sync(), which schedules the coroutine on one long-lived
+background event loop so the aio clients (and their connection pools) are reused
+across calls. They authenticate with the active AzureStorageBackend's credential
+when one was passed in (a sync credential is called from a worker thread), else
+with an aio DefaultAzureCredential. When a non-Azure storage backend is active
+(e.g. the local-directory backend), calls run the sync backend in worker threads
+instead.
+"""
+
+import asyncio
+import inspect
+import os
+import threading
+import weakref
+
+from azure.identity.aio import DefaultAzureCredential
+from azure.storage.filedatalake.aio import DataLakeServiceClient, FileSystemClient
+
+from clients import adls
+from clients.adls import get_download_cache
+
+# Default cap on in-flight requests for the *_many helpers.
+MAX_CONCURRENCY = int(os.environ.get("ADLS_ASYNC_CONCURRENCY", "16"))
+
+_lock = threading.Lock()
+_io_loop: asyncio.AbstractEventLoop | None = None
+
+# aio clients are bound to the loop they were created on, so cache per loop.
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict]" = weakref.WeakKeyDictionary()
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    global _io_loop
+    with _lock:
+        if _io_loop is None:
+            _io_loop = asyncio.new_event_loop()
+            threading.Thread(target=_io_loop.run_forever, name="adls-async-io", daemon=True).start()
+    return _io_loop
+
+
+def run_sync(coro, timeout: float | None = None):
+    """Run a coroutine from sync code on the shared I/O loop and return its result."""
+    return asyncio.run_coroutine_threadsafe(coro, _get_loop()).result(timeout)
+
+
+def _azure_active() -> bool:
+    return isinstance(adls.get_storage_backend(), adls.AzureStorageBackend)
+
+
+class _ThreadedCredential:
+    """Async view of a sync credential: get_token runs in a worker thread."""
+
+    def __init__(self, credential):
+        self._credential = credential
+
+    async def get_token(self, *scopes, **kwargs):
+        return await asyncio.to_thread(self._credential.get_token, *scopes, **kwargs)
+
+    async def close(self) -> None:
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        pass
+
+
+def _async_credential(credential):
+    if credential is None:
+        return DefaultAzureCredential()
+    if inspect.iscoroutinefunction(credential.get_token):
+        return credential
+    return _ThreadedCredential(credential)
+
+
+async def get_file_system_client(container: str) -> FileSystemClient:
+    backend = adls.get_storage_backend()
+    credential = backend.credential if isinstance(backend, adls.AzureStorageBackend) else None
+    account_name = os.environ["ADLS_ACCOUNT_NAME"]
+    loop_clients = _clients.setdefault(asyncio.get_running_loop(), {})
+    # Keyed by backend too, so swapping in a backend with another credential takes effect
+    key = (backend, account_name, container)
+    if key not in loop_clients:
+        service = loop_clients.get((backend, account_name))
+        if service is None:
+            service = loop_clients[(backend, account_name)] = DataLakeServiceClient(
+                account_url=f"https://{account_name}.dfs.core.windows.net",
+                credential=_async_credential(credential),
+            )
+        loop_clients[key] = service.get_file_system_client(container)
+    return loop_clients[key]
+
+
+async def download_file(container: str, path: str) -> bytes:
+    """Download a whole file, using the same ETag-keyed cache as the sync client."""
+    if not _azure_active():
+        return await asyncio.to_thread(adls.download_file, container, path)
+    fs = await get_file_system_client(container)
+    file_client = fs.get_file_client(path)
+    cache = get_download_cache()
+    if cache is None:
+        download = await file_client.download_file()
+        return await download.readall()
+
+    # The cache does blocking disk I/O under a threading.Lock, so keep it off the event loop
+    key = f"{fs.account_name}/{container}/{path}"
+    props = await file_client.get_file_properties()
+    cached = await asyncio.to_thread(cache.get, key, props.etag)
+    if cached is not None:
+        return cached
+
+    download = await file_client.download_file()
+    data = await download.readall()
+    await asyncio.to_thread(cache.put, key, download.properties.etag, data)
+    return data
+
+
+async def download_range(container: str, path: str, offset: int, length: int) -> bytes:
+    if not _azure_active():
+        return await asyncio.to_thread(adls.download_range, container, path, offset, length)
+    fs = await get_file_system_client(container)
+    download = await fs.get_file_client(path).download_file(offset=offset, length=length)
+    return await download.readall()
+
+
+async def list_files(container: str, prefix: str = "") -> list[str]:
+    if not _azure_active():
+        return await asyncio.to_thread(adls.list_files, container, prefix)
+    fs = await get_file_system_client(container)
+    return [p.name async for p in fs.get_paths(path=prefix)]
+
+
+async def get_file_metadata(container: str, path: str) -> dict:
+    """Get file properties including ETag."""
+    if not _azure_active():
+        return await asyncio.to_thread(adls.get_file_metadata, container, path)
+    fs = await get_file_system_client(container)
+    props = await fs.get_file_client(path).get_file_properties()
+    return {"etag": props.etag, "size": props.size, "last_modified": str(props.last_modified)}
+
+
+async def _gather_limited(coros: list, max_concurrency: int) -> list:
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def limited(coro):
+        async with semaphore:
+            return await coro
+
+    return await asyncio.gather(*(limited(c) for c in coros))
+
+
+async def download_many(
+    container: str, paths: list[str], max_concurrency: int = MAX_CONCURRENCY
+) -> dict[str, bytes]:
+    """Download several files with at most max_concurrency requests in flight."""
+    data = await _gather_limited([download_file(container, p) for p in paths], max_concurrency)
+    return dict(zip(paths, data))
+
+
+async def download_ranges(
+    container: str, ranges: list[tuple[str, int, int]], max_concurrency: int = MAX_CONCURRENCY
+) -> list[bytes]:
+    """Fetch (path, offset, length) ranges concurrently, returning bytes in input order."""
+    return await _gather_limited(
+        [download_range(container, path, offset, length) for path, offset, length in ranges],
+        max_concurrency,
+    )
@@ -25,3 +25,12 @@ def query_messages(thread_id: str) -> list[dict]:
         partition_key=thread_id,
     )
     return list(items)
+
+
+def get_cache_container() -> ContainerProxy:
+    """Container backing clients.json_cache (partition key /namespace, per-item TTL)."""
+    endpoint = os.environ["COSMOS_ENDPOINT"]
+    database_name = os.environ.get("COSMOS_DATABASE", "agent-db")
+    client = CosmosClient(url=endpoint, credential=DefaultAzureCredential())
+    db = client.get_database_client(database_name)
+    return db.get_container_client("cache")
@@ -0,0 +1,89 @@
+"""ETag-keyed on-disk cache for ADLS downloads.
+
+Blobs are stored under a content-addressed file name with a small JSON sidecar
+holding the ETag. A lookup is served from disk only when the caller's current
+ETag matches the stored one. Total size is bounded; the least recently used
+entries are evicted first (access time is tracked via the file's mtime).
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+CACHE_DIR = os.environ.get("ADLS_CACHE_DIR", str(Path(tempfile.gettempdir()) / "dea-adls-cache"))
+CACHE_MAX_BYTES = int(os.environ.get("ADLS_CACHE_MAX_BYTES", str(1024 ** 3)))
+
+
+class DownloadCache:
+    def __init__(self, directory: str | Path, max_bytes: int):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self._lock = threading.Lock()
+
+    def _paths(self, key: str) -> tuple[Path, Path]:
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        return self.directory / f"{digest}.bin", self.directory / f"{digest}.json"
+
+    def get(self, key: str, etag: str) -> bytes | None:
+        """Return cached bytes for key if stored under this ETag, else None."""
+        data_path, meta_path = self._paths(key)
+        with self._lock:
+            try:
+                meta = json.loads(meta_path.read_text())
+                data = data_path.read_bytes() if meta["etag"] == etag else None
+            except (OSError, ValueError, KeyError):
+                data = None
+
+            if data is None or len(data) != meta.get("size"):
+                self.misses += 1
+                return None
+
+            os.utime(data_path)  # mark as recently used
+            self.hits += 1
+            self.bytes_saved += len(data)
+            return data
+
+    def put(self, key: str, etag: str, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+        data_path, meta_path = self._paths(key)
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            # Write to a temp file first so readers in other processes never see partial data
+            tmp = data_path.with_suffix(f".tmp{threading.get_ident()}")
+            tmp.write_bytes(data)
+            os.replace(tmp, data_path)
+            meta_path.write_text(json.dumps({"key": key, "etag": etag, "size": len(data)}))
+            self._evict()
+
+    def _evict(self) -> None:
+        entries = []
+        for data_path in self.directory.glob("*.bin"):
+            try:
+                st = data_path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, data_path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, data_path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            data_path.unlink(missing_ok=True)
+            data_path.with_suffix(".json").unlink(missing_ok=True)
+            total -= size
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "bytes_saved": self.bytes_saved,
+        }
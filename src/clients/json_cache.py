@@ -0,0 +1,179 @@
+"""Persistent key/value cache for JSON-serialisable results (profiles, verdicts, ...).
+
+Each cache is a namespace with its own TTL. Two backends:
+
+- local (default): one JSON file per entry under JSON_CACHE_DIR/<namespace>, with
+  least-recently-used eviction once the directory exceeds JSON_CACHE_MAX_BYTES.
+- cosmos: items in the Cosmos DB "cache" container, partitioned by namespace.
+  Expiry uses Cosmos' per-item TTL; size is not bounded client-side.
+
+Keys are arbitrary strings (hashed for storage). Lookups never raise: a backend
+error is logged and treated as a miss, so a cache outage only costs recomputation.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+from azure.cosmos.exceptions import CosmosResourceNotFoundError
+
+from clients.cosmos import get_cache_container
+
+logger = logging.getLogger(__name__)
+
+# "local" or "cosmos".
+CACHE_BACKEND = os.environ.get("JSON_CACHE_BACKEND", "local")
+CACHE_DIR = os.environ.get("JSON_CACHE_DIR", str(Path(tempfile.gettempdir()) / "dea-json-cache"))
+CACHE_MAX_BYTES = int(os.environ.get("JSON_CACHE_MAX_BYTES", str(256 * 1024 ** 2)))
+
+_lock = threading.Lock()
+_caches: dict[str, "JsonCache"] = {}
+
+
+def _digest(key: str) -> str:
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+class JsonCache(ABC):
+    def __init__(self, namespace: str, ttl_seconds: int):
+        self.namespace = namespace
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str):
+        """Cached value for key, or None if absent or expired."""
+        try:
+            value = self._get(key)
+        except Exception as e:
+            logger.warning("%s cache lookup failed: %s", self.namespace, e)
+            value = None
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def put(self, key: str, value) -> None:
+        try:
+            self._put(key, value)
+        except Exception as e:
+            logger.warning("%s cache write failed: %s", self.namespace, e)
+
+    @abstractmethod
+    def _get(self, key: str):
+        ...
+
+    @abstractmethod
+    def _put(self, key: str, value) -> None:
+        ...
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+class LocalJsonCache(JsonCache):
+    def __init__(self, directory: str | Path, namespace: str, ttl_seconds: int, max_bytes: int):
+        super().__init__(namespace, ttl_seconds)
+        self.directory = Path(directory) / namespace
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{_digest(key)}.json"
+
+    def _get(self, key: str):
+        path = self._path(key)
+        with self._lock:
+            try:
+                entry = json.loads(path.read_text())
+            except FileNotFoundError:
+                return None
+            if entry["key"] != key:
+                return None
+            if entry["expires_at"] < time.time():
+                path.unlink(missing_ok=True)
+                return None
+            os.utime(path)  # mark as recently used
+            return entry["value"]
+
+    def _put(self, key: str, value) -> None:
+        entry = {"key": key, "expires_at": time.time() + self.ttl_seconds, "value": value}
+        path = self._path(key)
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".tmp{threading.get_ident()}")
+            tmp.write_text(json.dumps(entry, default=str))
+            os.replace(tmp, path)
+            self._evict()
+
+    def _evict(self) -> None:
+        entries = []
+        for path in self.directory.glob("*.json"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+
+class CosmosJsonCache(JsonCache):
+    def __init__(self, container, namespace: str, ttl_seconds: int):
+        super().__init__(namespace, ttl_seconds)
+        self.container = container
+
+    def _get(self, key: str):
+        try:
+            item = self.container.read_item(item=_digest(key), partition_key=self.namespace)
+        except CosmosResourceNotFoundError:
+            return None
+        return item["value"] if item.get("key") == key else None
+
+    def _put(self, key: str, value) -> None:
+        self.container.upsert_item({
+            "id": _digest(key),
+            "namespace": self.namespace,
+            "key": key,
+            "value": json.loads(json.dumps(value, default=str)),
+            "ttl": self.ttl_seconds,
+        })
+
+
+def get_json_cache(namespace: str, ttl_seconds: int) -> JsonCache:
+    """Process-wide cache for a namespace, on the backend chosen by JSON_CACHE_BACKEND."""
+    with _lock:
+        if namespace not in _caches:
+            if CACHE_BACKEND == "cosmos":
+                _caches[namespace] = CosmosJsonCache(get_cache_container(), namespace, ttl_seconds)
+            else:
+                _caches[namespace] = LocalJsonCache(CACHE_DIR, namespace, ttl_seconds, CACHE_MAX_BYTES)
+        return _caches[namespace]
+
+
+def get_json_cache_stats() -> dict[str, dict]:
+    """Hit/miss counts for every cache namespace used in this process."""
+    with _lock:
+        return {namespace: cache.stats() for namespace, cache in _caches.items()}
+
+
+def reset_json_caches() -> None:
+    with _lock:
+        _caches.clear()
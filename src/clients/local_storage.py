@@ -0,0 +1,119 @@
+"""Local-directory storage backend for offline benchmarks and tests.
+
+Each container is a folder under the root directory. ETags are content hashes,
+so a file's ETag changes exactly when its bytes change. Enable it with
+STORAGE_BACKEND=local and LOCAL_STORAGE_ROOT=<dir>, or set_storage_backend().
+"""
+
+import hashlib
+import os
+import shutil
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import BinaryIO, Callable
+
+from clients.storage import StorageBackend
+
+_COPY_BLOCK_SIZE = 8 * 1024 * 1024
+
+
+class LocalStorageBackend(StorageBackend):
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+        # (path, size, mtime_ns) -> etag, so unchanged files are hashed once
+        self._etags: dict[tuple[str, int, int], str] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, container: str, path: str) -> Path:
+        resolved = (self.root / container / path).resolve()
+        if not resolved.is_relative_to((self.root / container).resolve()):
+            raise ValueError(f"Path escapes container: {container}/{path}")
+        return resolved
+
+    def download_file(self, container: str, path: str) -> bytes:
+        return self._path(container, path).read_bytes()
+
+    def download_range(self, container: str, path: str, offset: int, length: int) -> bytes:
+        with open(self._path(container, path), "rb") as f:
+            f.seek(offset)
+            return f.read(length)
+
+    def open_stream(self, container: str, path: str) -> BinaryIO:
+        return open(self._path(container, path), "rb")
+
+    def upload_file(self, container: str, path: str, data: bytes) -> None:
+        target = self._path(container, path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(data)
+
+    def upload_stream(
+        self,
+        container: str,
+        path: str,
+        stream: BinaryIO,
+        total_size: int | None = None,
+        block_size: int | None = None,
+        max_concurrency: int | None = None,
+        progress: Callable[[int, int | None], None] | None = None,
+    ) -> int:
+        target = self._path(container, path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        # Like the Azure backend: the target is only replaced once the whole stream is written
+        temp = target.with_name(f".{target.name}.{threading.get_ident()}.uploading")
+        written = 0
+        try:
+            with open(temp, "wb") as out:
+                while block := stream.read(block_size or _COPY_BLOCK_SIZE):
+                    out.write(block)
+                    written += len(block)
+                    if progress:
+                        progress(written, total_size)
+            os.replace(temp, target)
+        finally:
+            temp.unlink(missing_ok=True)
+        return written
+
+    def list_file_properties(self, container: str, prefix: str = "") -> list[dict]:
+        base = self._path(container, prefix)
+        if not base.is_dir():
+            raise FileNotFoundError(f"Not a directory: {container}/{prefix}")
+        container_root = (self.root / container).resolve()
+        return [
+            {
+                "name": p.relative_to(container_root).as_posix(),
+                "size": p.stat().st_size,
+                "last_modified": str(datetime.fromtimestamp(p.stat().st_mtime, tz=timezone.utc)),
+            }
+            for p in sorted(base.rglob("*"))
+            if p.is_file()
+        ]
+
+    def list_files(self, container: str, prefix: str = "") -> list[str]:
+        return [f["name"] for f in self.list_file_properties(container, prefix)]
+
+    def get_file_metadata(self, container: str, path: str) -> dict:
+        target = self._path(container, path)
+        st = target.stat()
+        key = (str(target), st.st_size, st.st_mtime_ns)
+        with self._lock:
+            etag = self._etags.get(key)
+        if etag is None:
+            digest = hashlib.sha256()
+            with open(target, "rb") as f:
+                while block := f.read(_COPY_BLOCK_SIZE):
+                    digest.update(block)
+            etag = f'"{digest.hexdigest()[:32]}"'
+            with self._lock:
+                self._etags[key] = etag
+        return {
+            "etag": etag,
+            "size": st.st_size,
+            "last_modified": str(datetime.fromtimestamp(st.st_mtime, tz=timezone.utc)),
+        }
+
+    def copy_in(self, local_file: str | Path, container: str, path: str) -> None:
+        """Place an existing local file into the store (benchmark setup helper)."""
+        target = self._path(container, path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(local_file, target)
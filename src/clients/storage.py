@@ -0,0 +1,54 @@
+"""Storage backend interface.
+
+clients/adls.py exposes module-level functions (download_file, list_files, ...)
+that delegate to the active backend: Azure Data Lake by default, or a local
+directory (clients/local_storage.py) for offline benchmarks and tests.
+Containers map to ADLS file systems or top-level folders; paths are
+"/"-separated and relative to the container.
+"""
+
+from abc import ABC, abstractmethod
+from typing import BinaryIO, Callable
+
+
+class StorageBackend(ABC):
+    @abstractmethod
+    def download_file(self, container: str, path: str) -> bytes:
+        ...
+
+    @abstractmethod
+    def download_range(self, container: str, path: str, offset: int, length: int) -> bytes:
+        ...
+
+    @abstractmethod
+    def open_stream(self, container: str, path: str) -> BinaryIO:
+        """Open a file for sequential reading without loading it into memory."""
+
+    @abstractmethod
+    def upload_file(self, container: str, path: str, data: bytes) -> None:
+        ...
+
+    @abstractmethod
+    def upload_stream(
+        self,
+        container: str,
+        path: str,
+        stream: BinaryIO,
+        total_size: int | None = None,
+        block_size: int | None = None,
+        max_concurrency: int | None = None,
+        progress: Callable[[int, int | None], None] | None = None,
+    ) -> int:
+        """Upload from a file handle without loading it into memory. Returns bytes written."""
+
+    @abstractmethod
+    def list_file_properties(self, container: str, prefix: str = "") -> list[dict]:
+        """Files (not directories) under a prefix as {name, size, last_modified} dicts."""
+
+    @abstractmethod
+    def list_files(self, container: str, prefix: str = "") -> list[str]:
+        ...
+
+    @abstractmethod
+    def get_file_metadata(self, container: str, path: str) -> dict:
+        """{etag, size, last_modified} for a file."""
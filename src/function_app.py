@@ -1,18 +1,18 @@
 import json
 import logging
-from datetime import datetime
+import os
 
 import azure.functions as func
 import azure.durable_functions as df
 
-from activities.change_detection import run_change_detection
+from activities.change_detection import approval_metadata, run_change_detection
 from activities.profiling import run_profiling, revise_pseudocode as revise_pseudocode_impl
 from activities.code_generation import generate_pyspark, fix_pyspark
 from activities.spark_execution import execute_spark_job
 from activities.integrity_checks import run_integrity_checks
+from activities.fleet_sweep import save_sweep_report, sweep_change_detection
 from activities.audit import log_agent_message, log_auditor_message, get_thread_messages
 from tools.github_code import save_approved_code
-from models.approved_code import ApprovedCodeMetadata
 from orchestrator.transform import orchestrator_function
 
 logger = logging.getLogger(__name__)
@@ -108,6 +108,19 @@ def get_messages(req: func.HttpRequest) -> func.HttpResponse:
     return func.HttpResponse(json.dumps(messages, default=str), mimetype="application/json")
 
 
+# ──────────────────────────────────────────
+# Timer Triggers
+# ──────────────────────────────────────────
+
+# Nightly fleet-wide change detection; registered only when a schedule is configured.
+if os.environ.get("FLEET_SWEEP_SCHEDULE"):
+    @app.timer_trigger(schedule="%FLEET_SWEEP_SCHEDULE%", arg_name="timer", run_on_startup=False)
+    def fleet_sweep(timer: func.TimerRequest) -> None:
+        report = sweep_change_detection()
+        path = save_sweep_report(report)
+        logger.info("Change-detection sweep report saved to audit-trail/%s: %s", path, report["counts"])
+
+
 # ──────────────────────────────────────────
 # Durable Functions Orchestrator
 # ──────────────────────────────────────────
@@ -172,10 +185,10 @@ def log_message(input: dict) -> dict:
 
 @app.activity_trigger(input_name="input")
 def save_code(input: dict) -> dict:
-    metadata = ApprovedCodeMetadata(
-        client_id=input["client_id"],
-        approved_by="auditor",
-        approved_at=datetime.utcnow(),
+    metadata = approval_metadata(
+        input["client_id"], input["pseudocode"],
+        mapping_path=input.get("mapping_path", ""),
+        data_path=input.get("data_path", ""),
     )
     save_approved_code(input["client_id"], input["pseudocode"], input["pyspark_code"], metadata)
     return {"saved": True}
@@ -8,3 +8,11 @@ class ApprovedCodeMetadata(BaseModel):
     approved_at: datetime
     last_run_at: datetime | None = None
     run_count: int = 0
+    # Inputs the code was approved against, for change detection
+    mapping_path: str | None = None
+    data_path: str | None = None
+    mapping_fingerprint: str | None = None
+    schema_fingerprint: str | None = None
+    pseudocode_fingerprint: str | None = None
+    # tools.profiling output for the source data
+    source_profile: dict | None = None
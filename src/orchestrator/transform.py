@@ -207,6 +207,8 @@ def orchestrator_function(context):
         "client_id": client_id,
         "pseudocode": pseudocode or "",
         "pyspark_code": pyspark_code,
+        "mapping_path": mapping_path,
+        "data_path": data_path,
     })
 
     return {"status": "completed", "output_path": output_path}
@@ -1,104 +1,426 @@
 """ADLS tools for reading mapping spreadsheets, sampling data, and reading output."""
 
 import io
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator
+
 import openpyxl
 import pandas as pd
-from clients.adls import download_file, list_files
+import pyarrow as pa
+from clients.adls import (
+    download_file,
+    download_range,
+    get_file_metadata,
+    list_file_properties,
+    open_stream,
+)
+from clients import adls_async
+from tools.arrow_io import as_frame, count_csv_rows, iter_csv_tables, read_csv_table
+from tools.fingerprints import workbook_fingerprint
+from tools.parquet import merge_column_stats, open_parquet, parquet_head, parquet_summary
+from tools.sampling import SAMPLE_STRATEGY, SAMPLE_STRATIFY_BY, stream_sample
+
+logger = logging.getLogger(__name__)
+
+# First ranged read for CSV sampling; doubled until enough complete rows are parsed.
+CSV_SAMPLE_INITIAL_BYTES = 256 * 1024
+
+# Concurrent reads for multi-part Spark output, and how many parts the sample spans.
+OUTPUT_READ_WORKERS = 16
+SAMPLE_PARTS = 8
+
+# Bytes fetched from the end of each part file; covers the footer of typical Spark output.
+FOOTER_PREFETCH_BYTES = 64 * 1024
+
+
+def _column_names(header: tuple, width: int) -> list:
+    """Name columns the way pd.read_excel does: blanks become "Unnamed: i", duplicates get ".n"."""
+    names, seen = [], {}
+    for i in range(width):
+        name = header[i] if i < len(header) and header[i] is not None else f"Unnamed: {i}"
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def _stream_sheet(ws, n_rows: int) -> dict:
+    """Header, first N rows and a row count for one sheet in a single pass over its rows."""
+    rows = ws.iter_rows(values_only=True)
+    header = next(rows, None)
+    if header is None:
+        return {"columns": [], "row_count": 0, "sample_rows": []}
+
+    def trimmed(row: tuple) -> tuple:
+        end = len(row)
+        while end and row[end - 1] is None:
+            end -= 1
+        return row[:end]
+
+    # Like pd.read_excel: interior blank rows count as rows, trailing blank rows do not
+    header = trimmed(header)
+    sample, row_count, blanks, width = [], 0, 0, len(header)
+    for row in rows:
+        row = trimmed(row)
+        if not row:
+            blanks += 1
+            continue
+        width = max(width, len(row))
+        sample.extend([()] * min(blanks, n_rows - len(sample)))
+        row_count += blanks + 1
+        blanks = 0
+        if len(sample) < n_rows:
+            sample.append(row)
+
+    if width == 0:
+        return {"columns": [], "row_count": 0, "sample_rows": []}
+
+    columns = _column_names(header, width)
+    return {
+        "columns": columns,
+        "row_count": row_count,
+        "sample_rows": [
+            {col: (row[i] if i < len(row) else None) for i, col in enumerate(columns)}
+            for row in sample
+        ],
+    }
+
+
+def _open_mapping(path: str) -> openpyxl.Workbook:
+    data = download_file("mappings", path)
+    return openpyxl.load_workbook(io.BytesIO(data), read_only=True, data_only=True)
+
+
+def _read_sheets(wb: openpyxl.Workbook, n_rows: int, sheets: list[str] | None = None) -> dict:
+    return {
+        sheet_name: _stream_sheet(wb[sheet_name], n_rows)
+        for sheet_name in wb.sheetnames
+        if sheets is None or sheet_name in sheets
+    }
+
+
+def _fingerprint_sheets(wb: openpyxl.Workbook) -> str:
+    return workbook_fingerprint((name, wb[name].iter_rows(values_only=True)) for name in wb.sheetnames)
 
 
-def read_mapping_spreadsheet(path: str) -> dict:
+def read_mapping_spreadsheet(path: str, n_rows: int = 10, sheets: list[str] | None = None) -> dict:
     """Download Excel mapping from ADLS and return structured column mappings.
 
+    The workbook is parsed once in read-only mode; each sheet's rows are streamed
+    to collect the header and first N rows and to count the rest.
+
     Args:
         path: Path within the 'mappings' container (e.g. "CLIENT_001/mapping.xlsx").
+        n_rows: Sample rows to keep per sheet.
+        sheets: Only load these sheets (default: all sheets).
 
     Returns:
         Dict with sheet names as keys, each containing columns and sample rows.
     """
-    data = download_file("mappings", path)
-    wb = openpyxl.load_workbook(io.BytesIO(data), read_only=True, data_only=True)
+    wb = _open_mapping(path)
+    try:
+        return _read_sheets(wb, n_rows, sheets)
+    finally:
+        wb.close()
 
-    result = {}
-    for sheet_name in wb.sheetnames:
-        df = pd.read_excel(io.BytesIO(data), sheet_name=sheet_name)
-        result[sheet_name] = {
-            "columns": list(df.columns),
-            "row_count": len(df),
-            "sample_rows": df.head(10).to_dict(orient="records"),
-        }
 
-    return result
+def mapping_fingerprint(path: str) -> str:
+    """Fingerprint of every cell in the mapping workbook.
+
+    Hashes cell values rather than file bytes, which change whenever Excel re-saves.
+    """
+    wb = _open_mapping(path)
+    try:
+        return _fingerprint_sheets(wb)
+    finally:
+        wb.close()
 
 
-def sample_source_data(path: str, n_rows: int = 100) -> dict:
-    """Read first N rows from source data file in ADLS.
+def read_mapping_with_fingerprint(path: str, n_rows: int = 10) -> tuple[dict, str]:
+    """read_mapping_spreadsheet and mapping_fingerprint from a single download."""
+    wb = _open_mapping(path)
+    try:
+        return _read_sheets(wb, n_rows), _fingerprint_sheets(wb)
+    finally:
+        wb.close()
 
-    Args:
-        path: Path within the 'data' container (e.g. "CLIENT_001/transactions.csv").
+
+def _sample_csv_head(path: str, n_rows: int) -> tuple[pa.Table, int, bool]:
+    """Parse the first N rows of a CSV using growing ranged reads.
 
     Returns:
-        Dict with columns, row_count, and sample rows.
+        (sample table, row_count, row_count_exact). The row count is exact only when the
+        whole file fit in the ranges read; otherwise it is extrapolated from the
+        average row width of the parsed prefix.
     """
-    data = download_file("data", path)
+    size = get_file_metadata("data", path)["size"]
+    buf = b""
+    step = CSV_SAMPLE_INITIAL_BYTES
+    while True:
+        length = min(step, size - len(buf))
+        if length > 0:
+            buf += download_range("data", path, len(buf), length)
+        complete = len(buf) >= size
+
+        # Only hand the parser whole lines; a quoted field cut mid-value raises and we grow
+        text = buf if complete else buf[: buf.rfind(b"\n") + 1]
+        table = None
+        if text:
+            try:
+                table = read_csv_table(io.BytesIO(text), dictionary_strings=False)
+            except pa.ArrowInvalid:
+                if complete:
+                    raise
+        if complete or (table is not None and table.num_rows >= n_rows):
+            break
+        step *= 2
+
+    if table is None:
+        # Empty file: no header, no rows
+        return pa.table({}), 0, True
+    if complete or table.num_rows == 0:
+        return table.slice(0, n_rows), table.num_rows, complete
+
+    header_bytes = text.find(b"\n") + 1
+    avg_row_bytes = (len(text) - header_bytes) / table.num_rows
+    return table.slice(0, n_rows), round((size - header_bytes) / avg_row_bytes), False
 
-    if path.endswith(".parquet"):
-        df = pd.read_parquet(io.BytesIO(data))
-    elif path.endswith(".csv"):
-        df = pd.read_csv(io.BytesIO(data), nrows=n_rows)
-    else:
-        df = pd.read_excel(io.BytesIO(data), nrows=n_rows)
 
-    sample = df.head(n_rows)
+def _sample_parquet(container: str, path: str, n_rows: int, columns: list[str] | None = None):
+    """Sample a Parquet file from its footer and first row group only.
+
+    Returns:
+        (sample, footer summary)
+    """
+    pf = open_parquet(container, path)
+    return parquet_head(pf, n_rows, columns=columns), parquet_summary(pf)
+
+
+def _sample_result(sample: pd.DataFrame | pa.Table, row_count: int, **extra) -> dict:
+    # The JSON payload is the edge where Arrow samples become pandas
+    sample = as_frame(sample)
     return {
         "columns": list(sample.columns),
         "dtypes": {col: str(dtype) for col, dtype in sample.dtypes.items()},
-        "row_count": len(df),
+        "row_count": row_count,
+        **extra,
         "sample_rows": sample.to_dict(orient="records"),
     }
 
 
-def read_spark_output(path: str, n_rows: int = 50) -> dict:
+def count_source_rows(path: str) -> int:
+    """Count data rows in a source CSV by streaming it once (constant memory)."""
+    with open_stream("data", path) as stream:
+        return count_csv_rows(stream)
+
+
+def iter_source_tables(
+    path: str, chunk_rows: int = 100_000, columns: list[str] | None = None
+) -> Iterator[pa.Table | pd.DataFrame]:
+    """Yield a source file in chunks of at most chunk_rows rows.
+
+    CSV is streamed through the Arrow parser and Parquet is read batch by batch,
+    so memory stays bounded by one chunk; those chunks are Arrow tables. Excel
+    workbooks (read whole, then split) and CSVs whose types change mid-file
+    (finished with pandas) yield DataFrames.
+    """
+    if path.endswith(".parquet"):
+        pf = open_parquet("data", path)
+        for batch in pf.iter_batches(batch_size=chunk_rows, columns=columns):
+            yield pa.Table.from_batches([batch])
+    elif path.endswith(".csv"):
+        yielded = 0
+        try:
+            with open_stream("data", path) as stream:
+                for table in iter_csv_tables(stream, chunk_rows, columns):
+                    yield table
+                    yielded += table.num_rows
+            return
+        except pa.ArrowInvalid as e:
+            logger.info("Arrow CSV types changed mid-file in %s (%s); continuing with pandas", path, e)
+        # pandas widens column types per chunk, so it can read what Arrow's first-block types cannot
+        with open_stream("data", path) as stream:
+            yield from pd.read_csv(stream, chunksize=chunk_rows, usecols=columns, skiprows=range(1, yielded + 1))
+    else:
+        df = pd.read_excel(io.BytesIO(download_file("data", path)), usecols=columns)
+        for start in range(0, len(df), chunk_rows):
+            yield df.iloc[start:start + chunk_rows]
+
+
+def iter_source_chunks(
+    path: str, chunk_rows: int = 100_000, columns: list[str] | None = None
+) -> Iterator[pd.DataFrame]:
+    """iter_source_tables as DataFrames, for consumers that work in pandas (the samplers)."""
+    for chunk in iter_source_tables(path, chunk_rows, columns):
+        yield as_frame(chunk)
+
+
+def sample_source_data(
+    path: str,
+    n_rows: int = 100,
+    exact_row_count: bool = False,
+    columns: list[str] | None = None,
+    include_frame: bool = False,
+    strategy: str | None = None,
+    stratify_by: str | None = None,
+) -> dict:
+    """Read a sample of N rows from source data file in ADLS.
+
+    The default "head" strategy takes the first N rows. CSV files are sampled with
+    ranged reads, so only the bytes needed for N rows are downloaded. Their
+    row_count is estimated unless exact_row_count is set, which streams the whole
+    file once to count rows. Parquet files are read from the footer plus the first
+    row group only, and also report column_stats.
+
+    The other strategies (see tools/sampling.py) stream the whole file once and
+    also return an exact row count.
+
+    Args:
+        path: Path within the 'data' container (e.g. "CLIENT_001/transactions.csv").
+        columns: Optional column projection.
+        include_frame: Also return the sample under "frame": an Arrow table for CSV
+            and Parquet heads, else a DataFrame (not JSON-serialisable; pop it
+            before sending the result anywhere).
+        strategy: "head", "reservoir", "stratified" or "diversity" (default: SAMPLE_STRATEGY).
+        stratify_by: Key column for "stratified" (default: SAMPLE_STRATIFY_BY).
+
+    Returns:
+        Dict with columns, dtypes, row_count, row_count_exact, sample rows, the
+        sample_strategy used and, for "stratified", its stratify_by column.
+    """
+    strategy = strategy or SAMPLE_STRATEGY
+    extra = {"sample_strategy": strategy}
+    if strategy == "stratified":
+        extra["stratify_by"] = stratify_by = stratify_by or SAMPLE_STRATIFY_BY
+    if strategy != "head":
+        sample, row_count = stream_sample(
+            iter_source_chunks(path, columns=columns), strategy, n_rows, stratify_by=stratify_by,
+        )
+        row_count_exact = True
+    elif path.endswith(".parquet"):
+        sample, summary = _sample_parquet("data", path, n_rows, columns=columns)
+        row_count, row_count_exact = summary["row_count"], True
+        extra["column_stats"] = summary["column_stats"]
+    elif path.endswith(".csv"):
+        sample, row_count, row_count_exact = _sample_csv_head(path, n_rows)
+        if exact_row_count and not row_count_exact:
+            row_count, row_count_exact = count_source_rows(path), True
+    else:
+        data = download_file("data", path)
+        df = pd.read_excel(io.BytesIO(data), nrows=n_rows)
+        sample = df.head(n_rows)
+        row_count, row_count_exact = len(df), len(df) < n_rows
+
+    result = _sample_result(sample, row_count, row_count_exact=row_count_exact, **extra)
+    if include_frame:
+        result["frame"] = sample
+    return result
+
+
+def _is_part_file(name: str) -> bool:
+    base = name.rsplit("/", 1)[-1]
+    return base.endswith(".parquet") and not base.startswith(("_", "."))
+
+
+def _read_part_footers(parts: list[dict]) -> list[dict]:
+    """Prefetch every part's tail concurrently (async), then parse the footers locally."""
+    ranges = []
+    for part in parts:
+        length = min(FOOTER_PREFETCH_BYTES, part["size"])
+        ranges.append((part["name"], part["size"] - length, length))
+    tails = adls_async.run_sync(adls_async.download_ranges("output", ranges, OUTPUT_READ_WORKERS))
+
+    footers = []
+    for part, tail in zip(parts, tails):
+        # Footers larger than the prefetch fall back to ranged reads inside RangedFile
+        pf = open_parquet("output", part["name"], size=part["size"], tail=tail)
+        footers.append({"file": pf, "schema": pf.schema_arrow, **parquet_summary(pf)})
+    return footers
+
+
+def _read_parts(parts: list[dict], n_rows: int) -> tuple[dict, pa.Table | pd.DataFrame]:
+    """Summarise every part file from its footer and sample rows across parts.
+
+    Returns:
+        (summary, sample)
+    """
+    footers = _read_part_footers(parts)
+
+    # Spread the sample over evenly spaced non-empty parts rather than only the first
+    non_empty = [f for f in footers if f["row_count"] > 0]
+    k = min(len(non_empty), SAMPLE_PARTS, n_rows)
+    chosen = [non_empty[i * len(non_empty) // k] for i in range(k)]
+    per_part = -(-n_rows // k) if k else 0
+    with ThreadPoolExecutor(max_workers=max(1, k)) as pool:
+        samples = list(pool.map(lambda f: parquet_head(f["file"], per_part), chosen))
+
+    base_schema = footers[0]["schema"]
+    mismatches = [p["name"] for p, f in zip(parts, footers) if not f["schema"].equals(base_schema)]
+    if not samples:
+        sample = base_schema.empty_table()
+    else:
+        try:
+            sample = pa.concat_tables(samples, promote_options="permissive").slice(0, n_rows)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            # Parts whose types cannot be unified: let pandas widen them
+            sample = pd.concat([as_frame(s) for s in samples], ignore_index=True).head(n_rows)
+
+    frame = as_frame(sample)
+    return {
+        "columns": base_schema.names,
+        "dtypes": {col: str(dtype) for col, dtype in frame.dtypes.items()},
+        "row_count": sum(f["row_count"] for f in footers),
+        "column_stats": merge_column_stats([f["column_stats"] for f in footers]),
+        "sample_rows": frame.to_dict(orient="records"),
+        "part_file_count": len(parts),
+        "total_bytes": sum(p["size"] for p in parts),
+        "parts": [
+            {"path": p["name"], "row_count": f["row_count"], "bytes": p["size"]}
+            for p, f in zip(parts, footers)
+        ],
+        "schema_consistent": not mismatches,
+        "schema_mismatches": mismatches,
+    }, sample
+
+
+def read_spark_output(path: str, n_rows: int = 50, include_table: bool = False) -> dict:
     """Read Spark output from ADLS for validation.
 
     Handles both single files and Spark output directories (multiple part files).
+    For directories, every part file's footer is read concurrently to get the true
+    row count and check that all parts share one schema; the sample is drawn
+    across parts.
 
     Args:
         path: Path within the 'output' container (e.g. "CLIENT_001/20260207").
+        include_table: Also return the sample as an Arrow table under "table"
+            (omitted when the parts' types could only be unified by pandas).
 
     Returns:
-        Dict with columns, row_count, and sample rows.
+        Dict with columns, row_count, and sample rows (plus per-part row counts and
+        bytes for directories).
     """
     # Try to list files in the path (Spark typically writes a directory of part files)
     try:
-        files = list_files("output", prefix=path)
-        parquet_files = [f for f in files if f.endswith(".parquet") and not f.startswith("_")]
-
-        if parquet_files:
-            # Read the first parquet part file for validation
-            data = download_file("output", parquet_files[0])
-            df = pd.read_parquet(io.BytesIO(data))
-            sample = df.head(n_rows)
-            return {
-                "columns": list(sample.columns),
-                "dtypes": {col: str(dtype) for col, dtype in sample.dtypes.items()},
-                "row_count": len(df),
-                "sample_rows": sample.to_dict(orient="records"),
-                "part_file_count": len(parquet_files),
-            }
+        parts = [f for f in list_file_properties("output", prefix=path) if _is_part_file(f["name"])]
     except Exception:
-        pass
+        parts = []
 
-    # Fallback: try reading as a single file
-    data = download_file("output", path)
-    if path.endswith(".parquet"):
-        df = pd.read_parquet(io.BytesIO(data))
+    if parts:
+        result, sample = _read_parts(parts, n_rows)
+    elif path.endswith(".parquet"):
+        # Fallback: try reading as a single file
+        sample, summary = _sample_parquet("output", path, n_rows)
+        result = _sample_result(sample, summary["row_count"], column_stats=summary["column_stats"])
     else:
-        df = pd.read_csv(io.BytesIO(data))
+        table = read_csv_table(io.BytesIO(download_file("output", path)))
+        sample = table.slice(0, n_rows)
+        result = _sample_result(sample, table.num_rows)
 
-    sample = df.head(n_rows)
-    return {
-        "columns": list(sample.columns),
-        "dtypes": {col: str(dtype) for col, dtype in sample.dtypes.items()},
-        "row_count": len(df),
-        "sample_rows": sample.to_dict(orient="records"),
-    }
+    if include_table and isinstance(sample, pa.Table):
+        result["table"] = sample
+    return result
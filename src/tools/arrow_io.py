@@ -0,0 +1,173 @@
+"""Arrow-backed CSV reading: multi-threaded parsing, column projection and
+dictionary-encoded strings.
+
+Readers return pyarrow Tables; profiling accepts them directly. Call to_pandas()
+only where rows are turned into JSON for a prompt or an API response.
+"""
+
+import csv
+from typing import BinaryIO, Iterator
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pcsv
+
+# Bytes per parse block. Blocks are parsed in parallel by read_csv_table, and the
+# streaming readers infer column types from the first block.
+CSV_BLOCK_SIZE = 16 * 1024 * 1024
+
+
+def _dedupe_names(names: list[str]) -> list[str]:
+    """Suffix repeated column names .1, .2, ... the way pandas.read_csv does,
+    skipping suffixes that are already header names."""
+    taken, counts, unique = set(names), {}, []
+    for name in names:
+        if name not in counts:
+            counts[name] = 1
+            unique.append(name)
+            continue
+        suffix = counts[name]
+        while f"{name}.{suffix}" in taken:
+            suffix += 1
+        counts[name] = suffix + 1
+        taken.add(f"{name}.{suffix}")
+        unique.append(f"{name}.{suffix}")
+    return unique
+
+
+def _read_header(source: BinaryIO) -> list[str]:
+    """Consume the header line and return its de-duplicated column names."""
+    return _dedupe_names(next(csv.reader([source.readline().decode("utf-8-sig")]), []))
+
+
+def _read_options(header: list[str]) -> pcsv.ReadOptions:
+    # Arrow keeps repeated header names as-is, so the header is read here and
+    # passed in de-duplicated (an empty header leaves Arrow to raise "Empty CSV")
+    if not header:
+        return pcsv.ReadOptions(block_size=CSV_BLOCK_SIZE)
+    return pcsv.ReadOptions(block_size=CSV_BLOCK_SIZE, column_names=header)
+
+
+def _convert_options(columns: list[str] | None, dictionary_strings: bool) -> pcsv.ConvertOptions:
+    return pcsv.ConvertOptions(
+        include_columns=columns or [],
+        auto_dict_encode=dictionary_strings,
+        strings_can_be_null=True,
+    )
+
+
+def read_csv_table(
+    source: str | BinaryIO,
+    columns: list[str] | None = None,
+    n_rows: int | None = None,
+    dictionary_strings: bool = True,
+) -> pa.Table:
+    """Parse a CSV into an Arrow table.
+
+    The whole file is parsed on all cores unless n_rows is given, in which case
+    blocks are streamed until n_rows rows are read. Repeated header names get
+    .1, .2, ... suffixes, as with pandas.
+
+    Raises:
+        pyarrow.ArrowInvalid: malformed CSV, or (with n_rows) a later block that
+            does not fit the types inferred from the first.
+    """
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            return read_csv_table(f, columns, n_rows, dictionary_strings)
+
+    header = _read_header(source)
+    read, convert = _read_options(header), _convert_options(columns, dictionary_strings)
+    try:
+        if n_rows is None:
+            return pcsv.read_csv(source, read_options=read, convert_options=convert)
+        reader = pcsv.open_csv(source, read_options=read, convert_options=convert)
+    except pa.ArrowInvalid as e:
+        # Header-only file: no rows, and no types to infer
+        if header and "Empty CSV" in str(e):
+            return pa.table({name: pa.nulls(0) for name in columns or header})
+        raise
+    batches, rows = [], 0
+    for batch in reader:
+        batches.append(batch)
+        rows += batch.num_rows
+        if rows >= n_rows:
+            break
+    return pa.Table.from_batches(batches, schema=reader.schema).slice(0, n_rows)
+
+
+def iter_csv_tables(
+    source: BinaryIO, chunk_rows: int, columns: list[str] | None = None, dictionary_strings: bool = True
+) -> Iterator[pa.Table]:
+    """Stream a CSV as Arrow tables of chunk_rows rows (the last may be shorter).
+
+    Raises:
+        pyarrow.ArrowInvalid: when a block does not fit the types inferred from the
+            first block (e.g. a text value deep into a numeric column).
+    """
+    header = _read_header(source)
+    try:
+        reader = pcsv.open_csv(
+            source,
+            read_options=_read_options(header),
+            convert_options=_convert_options(columns, dictionary_strings),
+        )
+    except pa.ArrowInvalid as e:
+        if header and "Empty CSV" in str(e):
+            return
+        raise
+    pending, rows = [], 0
+    for batch in reader:
+        pending.append(batch)
+        rows += batch.num_rows
+        while rows >= chunk_rows:
+            table = pa.Table.from_batches(pending, schema=reader.schema)
+            yield table.slice(0, chunk_rows)
+            rest = table.slice(chunk_rows)
+            pending, rows = rest.to_batches(), rest.num_rows
+    if rows:
+        yield pa.Table.from_batches(pending, schema=reader.schema)
+
+
+def count_csv_rows(source: BinaryIO) -> int:
+    """Count data rows, parsing only the first column as text."""
+    header = _read_header(source)
+    if not header:
+        return 0
+    try:
+        reader = pcsv.open_csv(
+            source,
+            read_options=_read_options(header),
+            convert_options=pcsv.ConvertOptions(include_columns=header[:1], column_types={header[0]: pa.string()}),
+        )
+    except pa.ArrowInvalid as e:
+        # Header-only file: nothing left after the header line
+        if "Empty CSV" in str(e):
+            return 0
+        raise
+    rows = 0
+    for batch in reader:
+        rows += batch.num_rows
+    return rows
+
+
+def decode_dictionaries(table: pa.Table) -> pa.Table:
+    """Replace dictionary-encoded columns with their plain value type."""
+    for i, field in enumerate(table.schema):
+        if pa.types.is_dictionary(field.type):
+            table = table.set_column(i, field.name, pc.cast(table.column(i), field.type.value_type))
+    return table
+
+
+def to_pandas(table: pa.Table) -> pd.DataFrame:
+    """Convert at the edge, with strings as plain columns rather than Categoricals."""
+    return decode_dictionaries(table).to_pandas()
+
+
+def as_frame(data: pd.DataFrame | pa.Table) -> pd.DataFrame:
+    """A DataFrame for code that needs pandas, whichever form the data is in."""
+    if isinstance(data, pa.Table):
+        # Tables made from pandas round-trip to the original dtypes; others decode dictionaries
+        return data.to_pandas() if data.schema.pandas_metadata else to_pandas(data)
+    return data
@@ -0,0 +1,39 @@
+"""Stable content fingerprints used as cache keys and change signals."""
+
+import hashlib
+import json
+from typing import Iterable
+
+
+def _fingerprint(obj) -> str:
+    payload = json.dumps(obj, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def schema_fingerprint(columns: list[str], dtypes: dict[str, str]) -> str:
+    """Hash of column names, order and dtypes (as reported by sample_source_data)."""
+    return _fingerprint([[col, dtypes.get(col)] for col in columns])
+
+
+def pseudocode_fingerprint(pseudocode: str) -> str:
+    return _fingerprint(pseudocode)
+
+
+def prompt_fingerprint(template: str) -> str:
+    """Hash of a prompt template, so results cached under it expire when it is edited."""
+    return _fingerprint(template)
+
+
+def workbook_fingerprint(sheets: Iterable[tuple[str, Iterable[tuple]]]) -> str:
+    """Hash of every sheet name and cell value, fed row by row.
+
+    Args:
+        sheets: (sheet name, rows of cell values) pairs, e.g. from openpyxl's
+            iter_rows(values_only=True).
+    """
+    digest = hashlib.sha256()
+    for name, rows in sheets:
+        digest.update(json.dumps(["sheet", name]).encode())
+        for row in rows:
+            digest.update(json.dumps(row, separators=(",", ":"), default=str).encode())
+    return digest.hexdigest()[:16]
@@ -16,6 +16,19 @@ REPO_ROOT = Path(os.environ.get("REPO_ROOT", Path(__file__).resolve().parents[2]
 APPROVED_CODE_DIR = REPO_ROOT / "approved-code"
 
 
+_APPROVED_FILES = ("pseudocode.md", "transform.py", "metadata.json")
+
+
+def list_approved_clients() -> list[str]:
+    """Client IDs with a complete approved-code entry, sorted."""
+    if not APPROVED_CODE_DIR.exists():
+        return []
+    return sorted(
+        d.name for d in APPROVED_CODE_DIR.iterdir()
+        if d.is_dir() and all((d / name).exists() for name in _APPROVED_FILES)
+    )
+
+
 def get_approved_code(client_id: str) -> dict | None:
     """Read approved code for a client from the repo.
 
@@ -0,0 +1,183 @@
+"""Parallel profiling for wide frames: columns are split across a process pool.
+
+The frame (or, for full-file profiling, each chunk) is written once as an Arrow
+IPC file in shared memory (/dev/shm where available). Workers memory-map it and
+read only their columns, so the data is never pickled to them; only per-column
+profiles or sketches come back.
+"""
+
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Iterable
+
+import pandas as pd
+import pyarrow as pa
+
+from tools.profiling import _as_frame, profile_chunks, profile_data, profile_sketch, sketch_chunks
+from tools.sketches import TableSketch
+
+# Worker processes for profiling; 1 profiles in-process.
+PROFILE_WORKERS = int(os.environ.get("PROFILE_WORKERS", "1"))
+
+# Frames smaller than this many cells are profiled in-process (pool overhead dominates).
+PARALLEL_MIN_CELLS = 1_000_000
+
+# Column partitions per worker; more than one evens out slow (string) and fast (numeric) columns.
+PARTITIONS_PER_WORKER = 2
+
+_SHM_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+_lock = threading.Lock()
+_pools: dict[int, ProcessPoolExecutor] = {}
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    # spawn, not fork: the parent runs background I/O threads that must not be forked
+    with _lock:
+        if workers not in _pools:
+            _pools[workers] = ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn"))
+        return _pools[workers]
+
+
+def shutdown_pools() -> None:
+    with _lock:
+        for pool in _pools.values():
+            pool.shutdown()
+        _pools.clear()
+
+
+def _profile_columns(path: str, columns: list[str]) -> dict:
+    """Worker: profile some columns of the memory-mapped Arrow file."""
+    with pa.memory_map(path) as source:
+        table = pa.ipc.open_file(source).read_all().select(columns)
+        return profile_data(table)
+
+
+def _sketch_columns(path: str, columns: list[str]) -> TableSketch:
+    """Worker: sketch some columns of a memory-mapped Arrow chunk."""
+    with pa.memory_map(path) as source:
+        table = pa.ipc.open_file(source).read_all().select(columns)
+    sketch = TableSketch()
+    sketch.update(_as_frame(table))
+    return sketch
+
+
+def _write_shm(table: pa.Table) -> str:
+    fd, path = tempfile.mkstemp(suffix=".arrow", dir=_SHM_DIR)
+    os.close(fd)
+    try:
+        with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    except BaseException:
+        Path(path).unlink(missing_ok=True)
+        raise
+    return path
+
+
+def _partitions(columns: list, parts: int) -> list[list]:
+    size = -(-len(columns) // parts)
+    return [columns[i:i + size] for i in range(0, len(columns), size)]
+
+
+def profile_data_parallel(data: dict | pd.DataFrame | pa.Table, workers: int | None = None) -> dict:
+    """profile_data with columns partitioned across worker processes.
+
+    Returns exactly what profile_data returns. Small frames, a single worker, and
+    frames Arrow cannot represent (e.g. mixed-type object columns) are profiled
+    in-process.
+    """
+    workers = workers or PROFILE_WORKERS
+    if isinstance(data, pa.Table):
+        table = data
+        n_cells = table.num_rows * table.num_columns
+    else:
+        df = _as_frame(data)
+        n_cells = df.size
+        if workers <= 1 or n_cells < PARALLEL_MIN_CELLS or df.columns.has_duplicates:
+            return profile_data(df)
+        try:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+            return profile_data(df)
+
+    if workers <= 1 or n_cells < PARALLEL_MIN_CELLS or table.num_rows == 0:
+        return profile_data(table)
+
+    path = _write_shm(table)
+    try:
+        partitions = _partitions(table.column_names, workers * PARTITIONS_PER_WORKER)
+        pool = _get_pool(workers)
+        partials = list(pool.map(_profile_columns, [path] * len(partitions), partitions))
+    finally:
+        Path(path).unlink(missing_ok=True)
+
+    # Partitions are contiguous and in order, so column and anomaly order match profile_data
+    return {
+        "columns": {col: p for partial in partials for col, p in partial["columns"].items()},
+        "row_count": table.num_rows,
+        "total_columns": table.num_columns,
+        "anomalies": [a for partial in partials for a in partial["anomalies"]],
+    }
+
+
+def profile_chunks_parallel(chunks: Iterable[pd.DataFrame | pa.Table], workers: int | None = None) -> dict:
+    """profile_chunks with each chunk's columns sketched across worker processes.
+
+    The next chunk is read while the pool sketches the current one; the column
+    sketches are merged in the parent. Arrow chunks (see tools.adls.iter_source_tables)
+    go to shared memory as they are; DataFrames are converted first. Returns what
+    profile_chunks returns, up to the approximation of merged t-digests and
+    heavy-hitter counters. Small chunks, a single worker, and chunks Arrow cannot
+    represent are sketched in-process.
+    """
+    workers = workers or PROFILE_WORKERS
+    if workers <= 1:
+        return profile_chunks(chunks)
+
+    total = TableSketch()
+    pending = None  # (shm path, futures, rows) of the chunk the pool is working on
+
+    def collect(path: str, futures: list, rows: int) -> None:
+        try:
+            sketch = TableSketch()
+            for future in futures:
+                sketch.columns.update(future.result().columns)
+            sketch.row_count = rows
+        finally:
+            Path(path).unlink(missing_ok=True)
+        total.merge(sketch)
+
+    try:
+        for chunk in chunks:
+            table = chunk if isinstance(chunk, pa.Table) else None
+            if table is None and chunk.size >= PARALLEL_MIN_CELLS and not chunk.columns.has_duplicates:
+                try:
+                    table = pa.Table.from_pandas(chunk, preserve_index=False)
+                except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+                    pass
+            if table is not None and table.num_rows * table.num_columns < PARALLEL_MIN_CELLS:
+                table = None
+            previous = pending
+            pending = None
+            if table is not None:
+                path = _write_shm(table)
+                partitions = _partitions(table.column_names, workers * PARTITIONS_PER_WORKER)
+                pending = (path, [_get_pool(workers).submit(_sketch_columns, path, cols) for cols in partitions],
+                           table.num_rows)
+            # Chunks are merged in file order, whichever way they were sketched
+            if previous:
+                collect(*previous)
+            if table is None:
+                total.merge(sketch_chunks([chunk]))
+        if pending:
+            previous, pending = pending, None
+            collect(*previous)
+    finally:
+        if pending:
+            Path(pending[0]).unlink(missing_ok=True)
+
+    return profile_sketch(total)
@@ -0,0 +1,81 @@
+"""Footer-aware Parquet reading over ranged ADLS reads.
+
+Schema, row counts and column statistics come from the footer alone; sample rows
+come from the first row group, restricted to the requested columns.
+"""
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from clients.adls import RangedFile
+
+
+def open_parquet(container: str, path: str, size: int | None = None, tail: bytes = b"") -> pq.ParquetFile:
+    """Open a Parquet file in ADLS; only the footer is fetched until rows are read.
+
+    Pass the file's last bytes as `tail` when they were already fetched in bulk.
+    """
+    return pq.ParquetFile(RangedFile(container, path, size=size, tail=tail))
+
+
+def _stat_value(value):
+    return value.decode("utf-8", errors="replace") if isinstance(value, bytes) else value
+
+
+def merge_column_stats(stats_list: list[dict[str, dict]]) -> dict[str, dict]:
+    """Combine per-column min/max/null statistics from several row groups or files."""
+    merged: dict[str, dict] = {}
+    for stats in stats_list:
+        for name, col in stats.items():
+            target = merged.setdefault(name, {"null_count": 0})
+            target["null_count"] += col.get("null_count", 0)
+            if col.get("complete") is False:
+                target["complete"] = False
+            if "min" in col:
+                target["min"] = col["min"] if "min" not in target else min(target["min"], col["min"])
+            if "max" in col:
+                target["max"] = col["max"] if "max" not in target else max(target["max"], col["max"])
+    return merged
+
+
+def parquet_summary(pf: pq.ParquetFile) -> dict:
+    """Schema, row counts and per-column min/max/null counts from the footer."""
+    meta = pf.metadata
+    row_group_stats = []
+    for rg_index in range(meta.num_row_groups):
+        rg = meta.row_group(rg_index)
+        rg_stats = {}
+        for col_index in range(rg.num_columns):
+            chunk = rg.column(col_index)
+            st = chunk.statistics
+            col = rg_stats[chunk.path_in_schema] = {}
+            if st is None:
+                col["complete"] = False
+                continue
+            if st.has_null_count:
+                col["null_count"] = st.null_count
+            if st.has_min_max:
+                col["min"], col["max"] = _stat_value(st.min), _stat_value(st.max)
+        row_group_stats.append(rg_stats)
+
+    return {
+        "columns": pf.schema_arrow.names,
+        "row_count": meta.num_rows,
+        "row_group_count": meta.num_row_groups,
+        "column_stats": merge_column_stats(row_group_stats),
+    }
+
+
+def parquet_head(pf: pq.ParquetFile, n_rows: int, columns: list[str] | None = None) -> pa.Table:
+    """First N rows, reading only the first row group(s) and the projected columns."""
+    tables = []
+    remaining = n_rows
+    for rg_index in range(pf.metadata.num_row_groups):
+        if remaining <= 0:
+            break
+        table = pf.read_row_group(rg_index, columns=columns)
+        tables.append(table.slice(0, remaining))
+        remaining -= tables[-1].num_rows
+
+    if not tables:
+        return pf.schema_arrow.empty_table().select(columns or pf.schema_arrow.names)
+    return pa.concat_tables(tables)
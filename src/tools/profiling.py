@@ -1,57 +1,179 @@
 """Data profiling tool — generates column-level statistics for LLM prompts."""
 
+import os
+from typing import Iterable
+
 import pandas as pd
+import pyarrow as pa
+
+from tools.arrow_io import as_frame
+from tools.sketches import TableSketch
+
+# Bump whenever the profile output changes, so cached profiles are recomputed.
+PROFILER_VERSION = 3
+
+# Most frequent values reported per non-numeric column.
+TOP_K = 5
+
+# "sample" profiles the first rows sampled from the source; "full" streams the whole
+# file through mergeable sketches (approximate distinct counts and quantiles).
+PROFILE_MODE = os.environ.get("PROFILE_MODE", "sample")
+
+# Rows per chunk for full-file profiling.
+PROFILE_CHUNK_ROWS = int(os.environ.get("PROFILE_CHUNK_ROWS", "100000"))
+
+# How long a computed profile is reused while the source file is unchanged; 0 disables.
+PROFILE_CACHE_TTL = int(os.environ.get("PROFILE_CACHE_TTL", str(7 * 24 * 3600)))
+
+
+def _as_frame(data: dict | pd.DataFrame | pa.Table) -> pd.DataFrame:
+    if isinstance(data, (pd.DataFrame, pa.Table)):
+        return as_frame(data)
+    return pd.DataFrame(data["sample_rows"])
+
+
+def _top_values(df: pd.DataFrame, k: int = TOP_K) -> dict[str, dict[str, int]]:
+    """Top-k value counts for every column of df in one melt + groupby pass.
+
+    Ties keep first-occurrence order, matching Series.value_counts().
+    """
+    long = df.melt(var_name="_column", value_name="_value").dropna(subset=["_value"])
+    counts = long.groupby(["_column", "_value"], sort=False).size().reset_index(name="_count")
+    counts = counts.sort_values(["_column", "_count"], ascending=[True, False], kind="stable")
+    top = counts.groupby("_column", sort=False).head(k)
+
+    result: dict[str, dict[str, int]] = {col: {} for col in df.columns}
+    for col, value, count in top.itertuples(index=False):
+        result[col][str(value)] = int(count)
+    return result
+
+
+def _anomalies(col: str, col_profile: dict, non_null: int) -> list[str]:
+    anomalies = []
+    if col_profile["null_rate"] > 0.5:
+        anomalies.append(f"Column '{col}' has >50% nulls ({col_profile['null_rate']:.0%})")
+
+    if col_profile["unique_count"] == 1 and non_null > 1:
+        anomalies.append(f"Column '{col}' has only 1 unique value (constant)")
+    return anomalies
 
 
-def profile_data(data: dict) -> dict:
+def profile_data(data: dict | pd.DataFrame | pa.Table) -> dict:
     """Compute column-level statistics from sampled data.
 
+    Statistics are computed for all columns at once (null and distinct counts over
+    the whole frame, min/max/mean over the numeric block, top values over the rest)
+    rather than column by column.
+
     Args:
-        data: Dict with "columns", "sample_rows" (as returned by sample_source_data).
+        data: A DataFrame or Arrow table, or a dict with "columns", "sample_rows"
+            (as returned by sample_source_data).
 
     Returns:
         Dict with per-column profile: type, null_rate, unique_count, min, max,
         top_values, and anomaly flags.
     """
-    df = pd.DataFrame(data["sample_rows"])
+    df = _as_frame(data)
 
     if df.empty:
         return {"columns": {}, "row_count": 0, "anomalies": []}
 
+    n = len(df)
+    null_counts = df.isna().sum()
+    unique_counts = df.nunique()
+    non_null_counts = n - null_counts
+
+    numeric_cols = [col for col, dtype in df.dtypes.items() if pd.api.types.is_numeric_dtype(dtype)]
+    numeric_set = set(numeric_cols)
+    other_cols = [col for col in df.columns if col not in numeric_set]
+
+    numeric = df[numeric_cols].astype("float64")
+    mins, maxs, means = numeric.min(), numeric.max(), numeric.mean()
+    top_values = _top_values(df[other_cols]) if other_cols else {}
+
     profile = {}
     anomalies = []
 
-    for col in df.columns:
-        series = df[col]
+    for col, dtype in df.dtypes.items():
         col_profile = {
-            "dtype": str(series.dtype),
-            "null_count": int(series.isna().sum()),
-            "null_rate": round(float(series.isna().mean()), 3),
-            "unique_count": int(series.nunique()),
+            "dtype": str(dtype),
+            "null_count": int(null_counts[col]),
+            "null_rate": round(float(null_counts[col]) / n, 3),
+            "unique_count": int(unique_counts[col]),
         }
 
-        non_null = series.dropna()
-        if len(non_null) > 0:
-            if pd.api.types.is_numeric_dtype(series):
-                col_profile["min"] = float(non_null.min())
-                col_profile["max"] = float(non_null.max())
-                col_profile["mean"] = round(float(non_null.mean()), 2)
+        if non_null_counts[col] > 0:
+            if col in numeric_set:
+                col_profile["min"] = float(mins[col])
+                col_profile["max"] = float(maxs[col])
+                col_profile["mean"] = round(float(means[col]), 2)
             else:
-                top = non_null.value_counts().head(5)
-                col_profile["top_values"] = {str(k): int(v) for k, v in top.items()}
+                col_profile["top_values"] = top_values[col]
 
-        # Flag anomalies
-        if col_profile["null_rate"] > 0.5:
-            anomalies.append(f"Column '{col}' has >50% nulls ({col_profile['null_rate']:.0%})")
+        anomalies += _anomalies(col, col_profile, int(non_null_counts[col]))
+        profile[col] = col_profile
 
-        if col_profile["unique_count"] == 1 and len(non_null) > 1:
-            anomalies.append(f"Column '{col}' has only 1 unique value (constant)")
+    return {
+        "columns": profile,
+        "row_count": n,
+        "total_columns": len(df.columns),
+        "anomalies": anomalies,
+    }
+
+
+def profile_sketch(sketch: TableSketch) -> dict:
+    """Turn a TableSketch into the profile_data output shape.
 
+    unique_count is a HyperLogLog estimate and numeric columns also report
+    approximate quartiles; null counts, min, max and mean are exact.
+    """
+    if sketch.row_count == 0:
+        return {"columns": {}, "row_count": 0, "anomalies": []}
+
+    profile = {}
+    anomalies = []
+    for col, col_sketch in sketch.columns.items():
+        non_null = col_sketch.count - col_sketch.nulls
+        col_profile = {
+            "dtype": col_sketch.dtype,
+            "null_count": col_sketch.nulls,
+            "null_rate": round(col_sketch.nulls / col_sketch.count, 3),
+            "unique_count": min(col_sketch.distinct.estimate(), non_null),
+        }
+
+        if non_null > 0:
+            if col_sketch.is_numeric:
+                col_profile["min"] = col_sketch.min
+                col_profile["max"] = col_sketch.max
+                col_profile["mean"] = round(col_sketch.sum / col_sketch.numeric_count, 2)
+                col_profile["quantiles"] = {
+                    f"p{int(q * 100)}": col_sketch.digest.quantile(q) for q in (0.25, 0.5, 0.75)
+                }
+            else:
+                col_profile["top_values"] = col_sketch.heavy.top(TOP_K)
+
+        anomalies += _anomalies(col, col_profile, non_null)
         profile[col] = col_profile
 
     return {
         "columns": profile,
-        "row_count": len(df),
-        "total_columns": len(df.columns),
+        "row_count": sketch.row_count,
+        "total_columns": len(profile),
         "anomalies": anomalies,
     }
+
+
+def sketch_chunks(chunks: Iterable[pd.DataFrame | pa.Table]) -> TableSketch:
+    """Fold chunks into a TableSketch (merge sketches from other workers with .merge)."""
+    sketch = TableSketch()
+    for chunk in chunks:
+        sketch.update(as_frame(chunk))
+    return sketch
+
+
+def profile_chunks(chunks: Iterable[pd.DataFrame | pa.Table]) -> dict:
+    """Profile an entire dataset chunk by chunk in constant memory.
+
+    Same output shape as profile_data, computed over every row rather than a sample.
+    """
+    return profile_sketch(sketch_chunks(chunks))
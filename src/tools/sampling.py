@@ -0,0 +1,196 @@
+"""Streaming row samplers for picking representative source rows.
+
+Each sampler sees the file once, chunk by chunk, and holds at most its sample
+plus one chunk in memory (stratified: its sample for every stratum seen).
+Random choices use a fixed seed, so sampling an unchanged file is repeatable.
+
+- reservoir: uniform random rows (bottom-k of random keys).
+- stratified: equal share per value of a key column (e.g. "Transaction Code"),
+  random within each stratum; small strata are taken whole.
+- diversity: greedily picks rows that add categorical values not yet in the
+  sample, then fills up with random rows.
+"""
+
+import os
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+# "head" (first rows, ranged read), "reservoir", "stratified" or "diversity".
+SAMPLE_STRATEGY = os.environ.get("SAMPLE_STRATEGY", "head")
+
+# Key column for stratified sampling when the caller does not pass one.
+SAMPLE_STRATIFY_BY = os.environ.get("SAMPLE_STRATIFY_BY")
+
+# Non-numeric columns with at most this many distinct values (in the first chunk)
+# are the categorical columns diversity sampling tries to cover.
+CATEGORICAL_MAX_DISTINCT = 200
+
+STRATEGIES = ("head", "reservoir", "stratified", "diversity")
+
+_KEY = "__sample_key__"
+
+
+class ReservoirSampler:
+    def __init__(self, n_rows: int, seed: int = 0):
+        self.n_rows = n_rows
+        self.rng = np.random.default_rng(seed)
+        self.rows: pd.DataFrame | None = None
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        keys = self.rng.random(len(chunk))
+        full = self.rows is not None and len(self.rows) >= self.n_rows
+        threshold = self.rows[_KEY].max() if full else np.inf
+        candidates = chunk[keys < threshold].assign(**{_KEY: keys[keys < threshold]})
+        if candidates.empty:
+            return
+        combined = candidates if self.rows is None else pd.concat([self.rows, candidates])
+        self.rows = combined.nsmallest(self.n_rows, _KEY)
+
+    def result(self) -> pd.DataFrame | None:
+        return None if self.rows is None else self.rows.sort_index().drop(columns=_KEY)
+
+
+class StratifiedSampler:
+    def __init__(self, n_rows: int, by: str, seed: int = 0):
+        if not by:
+            raise ValueError("Stratified sampling needs a stratify_by column")
+        self.n_rows = n_rows
+        self.by = by
+        self.rng = np.random.default_rng(seed)
+        self.rows: pd.DataFrame | None = None
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        if self.by not in chunk.columns:
+            raise ValueError(f"stratify_by column not found: {self.by}")
+        candidates = chunk.assign(**{_KEY: self.rng.random(len(chunk))})
+        combined = candidates if self.rows is None else pd.concat([self.rows, candidates])
+        # Any single stratum may end up owning the whole sample, so keep up to n per stratum
+        combined = combined.sort_values(_KEY, kind="stable")
+        rows = combined.groupby(self.by, dropna=False, sort=False).head(self.n_rows)
+        # result() takes every stratum's lowest-keyed row before any second row, so once
+        # there are n strata only the n lowest first keys can be sampled: keeping just
+        # those strata bounds memory at n^2 rows however many strata the file has.
+        leaders = rows.drop_duplicates(self.by).head(self.n_rows)[self.by]
+        self.rows = rows[rows[self.by].isin(leaders)]
+
+    def result(self) -> pd.DataFrame | None:
+        if self.rows is None:
+            return None
+        # Round-robin across strata: every stratum's k-th row comes before any (k+1)-th row
+        rank = self.rows.groupby(self.by, dropna=False, sort=False).cumcount()
+        order = np.lexsort((self.rows[_KEY].to_numpy(), rank.to_numpy()))
+        return self.rows.iloc[order[: self.n_rows]].sort_index().drop(columns=_KEY)
+
+
+class DiversitySampler:
+    def __init__(self, n_rows: int, seed: int = 0, max_distinct: int = CATEGORICAL_MAX_DISTINCT):
+        self.n_rows = n_rows
+        self.max_distinct = max_distinct
+        self.filler = ReservoirSampler(n_rows, seed)
+        self.columns: list | None = None
+        self.covered: dict = {}
+        self.selected: list[pd.DataFrame] = []
+
+    def _novelty(self, rows: pd.DataFrame) -> pd.Series:
+        """Per row: how many categorical values it has that the sample does not."""
+        novel = pd.DataFrame({
+            col: rows[col].notna() & ~rows[col].isin(list(self.covered[col])) for col in self.columns
+        }, index=rows.index)
+        return novel.sum(axis=1)
+
+    def _cover(self, row: pd.DataFrame, delta: int) -> None:
+        for col in self.columns:
+            value = row[col].iloc[0]
+            if pd.isna(value):
+                continue
+            self.covered[col][value] = self.covered[col].get(value, 0) + delta
+            if self.covered[col][value] == 0:
+                del self.covered[col][value]
+
+    def _redundant_row(self) -> int | None:
+        """Index in self.selected of a row whose values are all covered by other rows."""
+        for i, row in enumerate(self.selected):
+            values = [(col, row[col].iloc[0]) for col in self.columns]
+            if all(pd.isna(v) or self.covered[col][v] > 1 for col, v in values):
+                return i
+        return None
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        self.filler.update(chunk)
+        if self.columns is None:
+            self.columns = [
+                col for col in chunk.columns
+                if not pd.api.types.is_numeric_dtype(chunk[col].dtype) and chunk[col].nunique() <= self.max_distinct
+            ]
+            self.covered = {col: {} for col in self.columns}
+        if not self.columns:
+            return
+
+        # Only rows holding the first occurrence (in this chunk) of some value can be the
+        # best pick for that value; this bounds candidates by the number of distinct values
+        first_seen = np.zeros(len(chunk), dtype=bool)
+        for col in self.columns:
+            first_seen |= (~chunk[col].duplicated() & chunk[col].notna()).to_numpy()
+        candidates = chunk[first_seen]
+        while not candidates.empty:
+            novelty = self._novelty(candidates)
+            candidates = candidates[novelty > 0]
+            if candidates.empty:
+                break
+            best = candidates.loc[[novelty[novelty > 0].idxmax()]]
+            if len(self.selected) >= self.n_rows:
+                i = self._redundant_row()
+                if i is None:
+                    break
+                self._cover(self.selected.pop(i), -1)
+            self.selected.append(best)
+            self._cover(best, 1)
+            candidates = candidates.drop(best.index)
+
+    def result(self) -> pd.DataFrame | None:
+        filler = self.filler.result()
+        if not self.selected:
+            return filler
+        sample = pd.concat(self.selected)
+        if filler is not None and len(sample) < self.n_rows:
+            extra = filler[~filler.index.isin(sample.index)].head(self.n_rows - len(sample))
+            sample = pd.concat([sample, extra])
+        return sample.sort_index()
+
+
+def stream_sample(
+    chunks: Iterable[pd.DataFrame],
+    strategy: str,
+    n_rows: int,
+    stratify_by: str | None = None,
+    seed: int = 0,
+) -> tuple[pd.DataFrame, int]:
+    """Sample rows from a stream of chunks in one pass.
+
+    Returns:
+        (sample in file order, total row count)
+    """
+    if strategy == "reservoir":
+        sampler = ReservoirSampler(n_rows, seed)
+    elif strategy == "stratified":
+        sampler = StratifiedSampler(n_rows, stratify_by, seed)
+    elif strategy == "diversity":
+        sampler = DiversitySampler(n_rows, seed)
+    else:
+        raise ValueError(f"Unknown sampling strategy: {strategy} (expected one of {', '.join(STRATEGIES)})")
+
+    row_count, first = 0, None
+    for chunk in chunks:
+        # Index rows by their position in the file so the sample can be put back in order
+        chunk = chunk.set_axis(pd.RangeIndex(row_count, row_count + len(chunk)))
+        if first is None:
+            first = chunk.iloc[:0]
+        sampler.update(chunk)
+        row_count += len(chunk)
+
+    sample = sampler.result()
+    if sample is None:
+        sample = first if first is not None else pd.DataFrame()
+    return sample.reset_index(drop=True), row_count
@@ -0,0 +1,154 @@
+"""Deterministic diff between two data profiles (tools.profiling output).
+
+Compares the profile stored with approved code against the current source's
+profile, so change detection can decide most runs without an LLM:
+
+- structural changes (columns added, removed or renamed, dtype changes) always
+  mean the approved code no longer fits the data;
+- shifts (null rate, cardinality, semantic type) do not necessarily break the
+  code, but are worth showing to whoever decides. Semantic types come from a
+  head sample, where a date may fit several formats or a column may be all
+  null, so a change there is a hint rather than proof.
+"""
+
+from difflib import SequenceMatcher
+
+# Absolute change in null_rate that counts as a shift (0.02 -> 0.25 is one).
+NULL_RATE_SHIFT = 0.2
+
+# Absolute change in distinct ratio (unique_count / non-null rows) that counts as a shift.
+CARDINALITY_SHIFT = 0.3
+
+# A removed and an added column of the same kind are paired as a rename when
+# their names are at least this similar, or their top values overlap this much.
+RENAME_MIN_NAME_SIMILARITY = 0.6
+RENAME_MIN_VALUE_OVERLAP = 0.5
+
+STRUCTURAL_KEYS = ("added", "removed", "renamed", "dtype_changes")
+SHIFT_KEYS = ("semantic_type_changes", "null_rate_shifts", "cardinality_shifts")
+
+
+def _kind(dtype: str) -> str:
+    """Coarse dtype family. int64 <-> float64 is not a change: pandas turns an
+    integer column into float64 as soon as a sample contains a null."""
+    dtype = dtype.lower()
+    if dtype.startswith(("int", "uint", "float", "decimal")):
+        return "numeric"
+    if dtype.startswith("bool"):
+        return "bool"
+    if dtype.startswith(("datetime", "timestamp", "date")):
+        return "datetime"
+    return "string"
+
+
+def _semantic(col_profile: dict) -> str | None:
+    semantic = col_profile.get("semantic_type")
+    if not semantic:
+        return None
+    return "/".join(filter(None, [semantic["semantic_type"], semantic.get("format")]))
+
+
+def _distinct_ratio(col_profile: dict, row_count: int) -> float | None:
+    non_null = row_count - col_profile.get("null_count", 0)
+    if non_null <= 0:
+        return None
+    return min(col_profile.get("unique_count", 0) / non_null, 1.0)
+
+
+def _name_similarity(a: str, b: str) -> float:
+    return SequenceMatcher(None, a.lower().strip(), b.lower().strip()).ratio()
+
+
+def _value_overlap(a: dict, b: dict) -> float:
+    a_values, b_values = set(a.get("top_values", {})), set(b.get("top_values", {}))
+    if not a_values or not b_values:
+        return 0.0
+    return len(a_values & b_values) / len(a_values | b_values)
+
+
+def _match_renames(removed: list[str], added: list[str], old: dict, new: dict) -> list[tuple[str, str]]:
+    """Greedily pair removed with added columns, most similar pairs first."""
+    candidates = []
+    for old_col in removed:
+        for new_col in added:
+            if _kind(old[old_col]["dtype"]) != _kind(new[new_col]["dtype"]):
+                continue
+            name = _name_similarity(old_col, new_col)
+            values = _value_overlap(old[old_col], new[new_col])
+            if name >= RENAME_MIN_NAME_SIMILARITY or values >= RENAME_MIN_VALUE_OVERLAP:
+                candidates.append((name + values, old_col, new_col))
+
+    pairs, used = [], set()
+    for _, old_col, new_col in sorted(candidates, key=lambda c: -c[0]):
+        if old_col not in used and new_col not in used:
+            pairs.append((old_col, new_col))
+            used.update((old_col, new_col))
+    return pairs
+
+
+def diff_profiles(old: dict, new: dict) -> dict:
+    """Compare two profiles column by column.
+
+    Returns:
+        Dict with added/removed column names, renamed [{from, to}], and
+        dtype_changes / semantic_type_changes / null_rate_shifts /
+        cardinality_shifts as [{column, from, to}], plus "structural" (True
+        when the approved code cannot be reused as-is) and "changed".
+    """
+    old_cols, new_cols = old.get("columns", {}), new.get("columns", {})
+    removed = [col for col in old_cols if col not in new_cols]
+    added = [col for col in new_cols if col not in old_cols]
+    renames = _match_renames(removed, added, old_cols, new_cols)
+    renamed_from = {old_col for old_col, _ in renames}
+    renamed_to = {new_col for _, new_col in renames}
+
+    diff = {
+        "added": [col for col in added if col not in renamed_to],
+        "removed": [col for col in removed if col not in renamed_from],
+        "renamed": [{"from": old_col, "to": new_col} for old_col, new_col in renames],
+        "dtype_changes": [],
+        "semantic_type_changes": [],
+        "null_rate_shifts": [],
+        "cardinality_shifts": [],
+    }
+
+    # Renamed columns are compared with their old selves like any shared column
+    pairs = [(col, col) for col in old_cols if col in new_cols] + renames
+    for old_col, new_col in pairs:
+        before, after = old_cols[old_col], new_cols[new_col]
+        if _kind(before["dtype"]) != _kind(after["dtype"]):
+            diff["dtype_changes"].append({"column": new_col, "from": before["dtype"], "to": after["dtype"]})
+        if _semantic(before) != _semantic(after):
+            diff["semantic_type_changes"].append({"column": new_col, "from": _semantic(before), "to": _semantic(after)})
+
+        if abs(after.get("null_rate", 0.0) - before.get("null_rate", 0.0)) >= NULL_RATE_SHIFT:
+            diff["null_rate_shifts"].append({"column": new_col, "from": before.get("null_rate"), "to": after.get("null_rate")})
+
+        ratio_before = _distinct_ratio(before, old.get("row_count", 0))
+        ratio_after = _distinct_ratio(after, new.get("row_count", 0))
+        if ratio_before is not None and ratio_after is not None and abs(ratio_after - ratio_before) >= CARDINALITY_SHIFT:
+            diff["cardinality_shifts"].append({"column": new_col, "from": round(ratio_before, 3), "to": round(ratio_after, 3)})
+
+    diff["structural"] = any(diff[key] for key in STRUCTURAL_KEYS)
+    diff["changed"] = diff["structural"] or any(diff[key] for key in SHIFT_KEYS)
+    return diff
+
+
+def describe_diff(diff: dict) -> str:
+    """One-line human-readable summary, e.g. for a change-detection reason."""
+    parts = []
+    if diff["added"]:
+        parts.append(f"added {', '.join(diff['added'])}")
+    if diff["removed"]:
+        parts.append(f"removed {', '.join(diff['removed'])}")
+    if diff["renamed"]:
+        parts.append("renamed " + ", ".join(f"{r['from']} -> {r['to']}" for r in diff["renamed"]))
+    for key, label in (
+        ("dtype_changes", "type of"),
+        ("semantic_type_changes", "format of"),
+        ("null_rate_shifts", "null rate of"),
+        ("cardinality_shifts", "cardinality of"),
+    ):
+        if diff[key]:
+            parts.append(f"{label} " + ", ".join(f"{c['column']} ({c['from']} -> {c['to']})" for c in diff[key]))
+    return "; ".join(parts) if parts else "no schema or distribution changes"
@@ -0,0 +1,208 @@
+"""Semantic type inference for text columns.
+
+Detects what a string column actually holds, so generated code can cast it
+natively (to_date with a format, decimal casts) instead of validating row by
+row. Each detector runs vectorised over a column's distinct values, weighted by
+how often each occurs:
+
+- date / datetime, with the strptime format and the equivalent Spark pattern
+  (or the candidate patterns, when the values fit more than one)
+- CUSIP, ISIN and SEDOL identifiers, with the share of valid check digits
+- ISO 4217 currency codes
+- numbers stored as text (thousands separators, currency symbols, (negatives))
+"""
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from tools.arrow_io import as_frame
+
+# Share of non-null values that must match for a column to get a semantic type.
+MIN_MATCH_RATE = 0.95
+
+# Identifiers also need this share of valid check digits (plain numeric codes
+# match the CUSIP/SEDOL shapes, but only ~10% of them check out by chance).
+MIN_CHECK_DIGIT_RATE = 0.8
+
+# Candidate formats. When several match equally well the column is reported as
+# ambiguous (format None, with candidate_formats) rather than guessing.
+DATE_FORMATS = {
+    "%m/%d/%Y": "MM/dd/yyyy",
+    "%Y-%m-%d": "yyyy-MM-dd",
+    "%d/%m/%Y": "dd/MM/yyyy",
+    "%m/%d/%y": "MM/dd/yy",
+    "%Y%m%d": "yyyyMMdd",
+    "%d-%b-%Y": "dd-MMM-yyyy",
+    "%d-%b-%y": "dd-MMM-yy",
+    "%Y/%m/%d": "yyyy/MM/dd",
+    "%m-%d-%Y": "MM-dd-yyyy",
+}
+DATETIME_FORMATS = {
+    "%Y-%m-%d %H:%M:%S": "yyyy-MM-dd HH:mm:ss",
+    "%Y-%m-%dT%H:%M:%S": "yyyy-MM-dd'T'HH:mm:ss",
+    "%m/%d/%Y %H:%M:%S": "MM/dd/yyyy HH:mm:ss",
+    "%m/%d/%Y %I:%M:%S %p": "MM/dd/yyyy hh:mm:ss a",
+    "%m/%d/%Y %H:%M": "MM/dd/yyyy HH:mm",
+}
+
+ISO_CURRENCIES = frozenset("""
+AED AFN ALL AMD ANG AOA ARS AUD AWG AZN BAM BBD BDT BGN BHD BIF BMD BND BOB BRL BSD BTN BWP BYN BZD
+CAD CDF CHF CLP CNY COP CRC CUP CVE CZK DJF DKK DOP DZD EGP ERN ETB EUR FJD FKP GBP GEL GHS GIP GMD
+GNF GTQ GYD HKD HNL HTG HUF IDR ILS INR IQD IRR ISK JMD JOD JPY KES KGS KHR KMF KPW KRW KWD KYD KZT
+LAK LBP LKR LRD LSL LYD MAD MDL MGA MKD MMK MNT MOP MRU MUR MVR MWK MXN MYR MZN NAD NGN NIO NOK NPR
+NZD OMR PAB PEN PGK PHP PKR PLN PYG QAR RON RSD RUB RWF SAR SBD SCR SDG SEK SGD SHP SLE SOS SRD SSP
+STN SVC SYP SZL THB TJS TMT TND TOP TRY TTD TWD TZS UAH UGX USD UYU UZS VES VND VUV WST XAF XAG XAU
+XCD XDR XOF XPD XPF XPT YER ZAR ZMW ZWL
+""".split())
+
+_NUMBER_STRIP = r"[,$€£¥\s]"
+
+
+def _weighted_rate(mask: np.ndarray, weights: np.ndarray) -> float:
+    return float(weights[mask].sum() / weights.sum())
+
+
+def _char_values(values: pd.Series, width: int) -> np.ndarray:
+    """(n, width) array of character values: 0-9 for digits, 10-35 for A-Z, 36-38 for * @ #."""
+    codes = np.frombuffer("".join(values).encode("ascii"), dtype=np.uint8).reshape(-1, width).astype(np.int64)
+    out = np.where(codes <= ord("9"), codes - ord("0"), codes - ord("A") + 10)
+    out = np.where(codes == ord("*"), 36, out)
+    out = np.where(codes == ord("@"), 37, out)
+    return np.where(codes == ord("#"), 38, out)
+
+
+def _cusip_valid(values: pd.Series) -> np.ndarray:
+    v = _char_values(values, 9)
+    payload = v[:, :8] * np.array([1, 2] * 4)
+    total = (payload // 10 + payload % 10).sum(axis=1)
+    return (10 - total % 10) % 10 == v[:, 8]
+
+
+def _sedol_valid(values: pd.Series) -> np.ndarray:
+    v = _char_values(values, 7)
+    total = (v[:, :6] * np.array([1, 3, 1, 7, 3, 9])).sum(axis=1)
+    return (10 - total % 10) % 10 == v[:, 6]
+
+
+def _isin_valid(values: pd.Series) -> np.ndarray:
+    v = _char_values(values, 12)
+    # Letters expand to two digits (A -> 1, 0); lay out (tens, units) per character
+    digits = np.stack([v // 10, v % 10], axis=2).reshape(len(v), 24)
+    present = np.stack([v >= 10, np.ones_like(v, dtype=bool)], axis=2).reshape(len(v), 24)
+    # Luhn: counting from the right with the check digit at 1, double even positions
+    position = np.cumsum(present[:, ::-1], axis=1)[:, ::-1]
+    doubled = np.where(present & (position % 2 == 0), digits * 2, digits)
+    total = np.where(present, doubled // 10 + doubled % 10, 0).sum(axis=1)
+    return total % 10 == 0
+
+
+_IDENTIFIERS = {
+    "isin": (r"[A-Z]{2}[0-9A-Z]{9}[0-9]", _isin_valid),
+    "cusip": (r"[0-9A-Z*@#]{8}[0-9]", _cusip_valid),
+    "sedol": (r"[0-9BCDFGHJKLMNPQRSTVWXYZ]{6}[0-9]", _sedol_valid),
+}
+
+
+def _detect_date(values: pd.Series, weights: np.ndarray) -> dict | None:
+    for semantic_type, formats in (("date", DATE_FORMATS), ("datetime", DATETIME_FORMATS)):
+        rates = {
+            fmt: _weighted_rate(pd.to_datetime(values, format=fmt, errors="coerce").notna().to_numpy(), weights)
+            for fmt in formats
+        }
+        best = max(rates.values())
+        if best < MIN_MATCH_RATE:
+            continue
+        matches = [fmt for fmt, rate in rates.items() if rate == best]
+        if len(matches) == 1:
+            fmt = matches[0]
+            return {"semantic_type": semantic_type, "format": fmt, "spark_format": formats[fmt], "match_rate": round(best, 3)}
+        # e.g. no day above 12 yet: MM/dd and dd/MM both fit, so do not pick one
+        return {
+            "semantic_type": semantic_type,
+            "format": None,
+            "spark_format": None,
+            "candidate_formats": [formats[fmt] for fmt in matches],
+            "match_rate": round(best, 3),
+        }
+    return None
+
+
+def _detect_identifier(values: pd.Series, weights: np.ndarray) -> dict | None:
+    upper = values.str.upper()
+    for name, (pattern, is_valid) in _IDENTIFIERS.items():
+        shaped = upper.str.fullmatch(pattern).to_numpy(dtype=bool)
+        rate = _weighted_rate(shaped, weights)
+        if rate < MIN_MATCH_RATE:
+            continue
+        valid = np.zeros(len(values), dtype=bool)
+        valid[shaped] = is_valid(upper[shaped])
+        check_rate = float(weights[valid].sum() / weights[shaped].sum())
+        if check_rate >= MIN_CHECK_DIGIT_RATE:
+            return {"semantic_type": name, "match_rate": round(rate, 3), "check_digit_valid_rate": round(check_rate, 3)}
+    return None
+
+
+def _detect_currency(values: pd.Series, weights: np.ndarray) -> dict | None:
+    rate = _weighted_rate(values.str.upper().isin(ISO_CURRENCIES).to_numpy(), weights)
+    if rate >= MIN_MATCH_RATE:
+        return {"semantic_type": "currency_code", "match_rate": round(rate, 3)}
+    return None
+
+
+def _detect_numeric_string(values: pd.Series, weights: np.ndarray) -> dict | None:
+    negative = values.str.fullmatch(r"\(.*\)").to_numpy(dtype=bool)
+    cleaned = values.str.replace(_NUMBER_STRIP, "", regex=True).str.strip("()")
+    numbers = pd.to_numeric(cleaned, errors="coerce")
+    parsed = numbers.notna().to_numpy()
+    rate = _weighted_rate(parsed, weights)
+    if rate < MIN_MATCH_RATE:
+        return None
+    return {
+        "semantic_type": "numeric_string",
+        "match_rate": round(rate, 3),
+        "integer": bool((numbers[parsed] % 1 == 0).all()),
+        "thousands_separator": bool(values.str.contains(",", regex=False).any()),
+        "currency_symbol": bool(values.str.contains(r"[$€£¥]").any()),
+        "parenthesized_negatives": bool(negative.any()),
+    }
+
+
+def infer_semantic_type(series: pd.Series) -> dict | None:
+    """Semantic type of one column, or None for numeric, empty or free-text columns."""
+    if pd.api.types.is_numeric_dtype(series.dtype) or pd.api.types.is_datetime64_any_dtype(series.dtype):
+        return None
+    counts = series.dropna().astype(str).str.strip().value_counts()
+    counts = counts[counts.index != ""]
+    if counts.empty:
+        return None
+    values = pd.Series(counts.index, dtype=object)
+    weights = counts.to_numpy(dtype=np.float64)
+
+    # Every type but currency codes needs digits; skip those detectors for plain text
+    has_digits = _weighted_rate(values.str.contains(r"\d").to_numpy(dtype=bool), weights) >= MIN_MATCH_RATE
+    detectors = (_detect_date, _detect_identifier, _detect_currency, _detect_numeric_string) if has_digits else (_detect_currency,)
+    for detect in detectors:
+        result = detect(values, weights)
+        if result:
+            return result
+    return None
+
+
+def infer_semantic_types(df: pd.DataFrame | pa.Table) -> dict[str, dict]:
+    """Semantic types for every column of df that has one."""
+    df = as_frame(df)
+    result = {}
+    for col in df.columns:
+        semantic = infer_semantic_type(df[col])
+        if semantic:
+            result[col] = semantic
+    return result
+
+
+def annotate_profile(profile: dict, df: pd.DataFrame | pa.Table) -> dict:
+    """Attach "semantic_type" to each profiled column that has one (in place; returns profile)."""
+    for col, semantic in infer_semantic_types(df).items():
+        if col in profile.get("columns", {}):
+            profile["columns"][col]["semantic_type"] = semantic
+    return profile
@@ -0,0 +1,243 @@
+"""Mergeable column sketches for profiling data too large to hold in memory.
+
+Every sketch has a fixed memory footprint, is updated one chunk (a pandas
+Series) at a time, and merges with another sketch of the same kind, so partial
+profiles built from different chunks or workers combine into one.
+
+- HyperLogLog: approximate distinct count.
+- TDigest: approximate quantiles of a numeric column.
+- MisraGries: heavy hitters (top-k) with bounded counters.
+- ColumnSketch / TableSketch: the above plus exact null, min/max and sum counters.
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+
+def _hash(series: pd.Series) -> np.ndarray:
+    """Stable 64-bit hashes of the non-null values; numbers hash by value, not dtype."""
+    if pd.api.types.is_numeric_dtype(series.dtype):
+        series = series.astype("float64")
+    return pd.util.hash_pandas_object(series, index=False).to_numpy(dtype=np.uint64)
+
+
+def _bit_length(x: np.ndarray) -> np.ndarray:
+    """Bit length of each uint64 (exact: each half fits a float mantissa)."""
+    hi = (x >> np.uint64(32)).astype(np.float64)
+    lo = (x & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    return np.where(hi > 0, 32 + np.frexp(hi)[1], np.frexp(lo)[1])
+
+
+class HyperLogLog:
+    """Distinct-count estimator with 2**p one-byte registers (~1.04/sqrt(2**p) error)."""
+
+    def __init__(self, p: int = 14):
+        self.p = p
+        self.registers = np.zeros(1 << p, dtype=np.uint8)
+
+    def add(self, series: pd.Series) -> None:
+        series = series.dropna()
+        if series.empty:
+            return
+        h = _hash(series)
+        q = 64 - self.p
+        index = (h >> np.uint64(q)).astype(np.intp)
+        rest = h & np.uint64((1 << q) - 1)
+        rank = (q - _bit_length(rest) + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other: "HyperLogLog") -> None:
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self) -> int:
+        m = len(self.registers)
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if zeros == m:
+            return 0
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / float(np.sum(np.ldexp(1.0, -self.registers.astype(np.int64))))
+        if raw <= 2.5 * m and zeros:
+            return round(m * math.log(m / zeros))
+        return round(raw)
+
+
+class TDigest:
+    """Quantile sketch: weighted centroids, finer towards the tails.
+
+    Compression buckets sorted points by the k1 scale function, so each centroid
+    spans at most one unit of k and the digest keeps about delta / 2 centroids.
+    """
+
+    def __init__(self, delta: int = 200):
+        self.delta = delta
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.min = math.inf
+        self.max = -math.inf
+
+    def _compress(self, means: np.ndarray, weights: np.ndarray, presorted: bool = False) -> None:
+        if not presorted:
+            order = np.argsort(means)
+            means, weights = means[order], weights[order]
+        total = weights.sum()
+        q = (np.cumsum(weights) - weights / 2) / total
+        k = np.floor(self.delta / (2 * math.pi) * np.arcsin(2 * q - 1))
+        starts = np.flatnonzero(np.r_[True, k[1:] != k[:-1]])
+        self.weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / self.weights
+
+    def add(self, values: np.ndarray) -> None:
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return
+        # Compress the chunk on its own (a plain sort), then merge the two digests
+        values = np.sort(values)
+        batch = TDigest(self.delta)
+        batch.min, batch.max = float(values[0]), float(values[-1])
+        batch._compress(values, np.ones(len(values)), presorted=True)
+        self.merge(batch)
+
+    def merge(self, other: "TDigest") -> None:
+        if not len(other.means):
+            return
+        if not len(self.means):
+            self.means, self.weights = other.means.copy(), other.weights.copy()
+            self.min, self.max = other.min, other.max
+            return
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress(np.concatenate([self.means, other.means]), np.concatenate([self.weights, other.weights]))
+
+    def quantile(self, q: float) -> float | None:
+        if not len(self.means):
+            return None
+        centers = np.cumsum(self.weights) - self.weights / 2
+        positions = np.r_[0.0, centers, self.weights.sum()]
+        values = np.r_[self.min, self.means, self.max]
+        return float(np.interp(q * self.weights.sum(), positions, values))
+
+
+class MisraGries:
+    """Heavy-hitter counters: keeps at most `capacity` values.
+
+    Reported counts undercount the true frequency by at most total / (capacity + 1).
+    """
+
+    def __init__(self, capacity: int = 64):
+        self.capacity = capacity
+        self.counters = pd.Series(dtype="int64")
+
+    def _prune(self, counts: pd.Series) -> None:
+        if len(counts) > self.capacity:
+            threshold = counts.nlargest(self.capacity + 1).iloc[-1]
+            counts = counts[counts > threshold] - threshold
+        self.counters = counts.astype("int64")
+
+    def add(self, series: pd.Series) -> None:
+        counts = series.value_counts(dropna=True)
+        if not counts.empty:
+            self._prune(self.counters.add(counts, fill_value=0) if len(self.counters) else counts)
+
+    def merge(self, other: "MisraGries") -> None:
+        if len(other.counters):
+            self._prune(self.counters.add(other.counters, fill_value=0) if len(self.counters) else other.counters)
+
+    def top(self, k: int) -> dict[str, int]:
+        return {str(v): int(c) for v, c in self.counters.sort_values(ascending=False, kind="stable").head(k).items()}
+
+
+class ColumnSketch:
+    """Exact counters plus HLL, t-digest (numeric chunks) and Misra-Gries (other chunks)."""
+
+    def __init__(self):
+        self.dtypes: list[str] = []
+        self.count = 0
+        self.nulls = 0
+        self.numeric_count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.distinct = HyperLogLog()
+        self.digest = TDigest()
+        self.heavy = MisraGries()
+        self.saw_non_numeric = False
+
+    def update(self, series: pd.Series) -> None:
+        nulls = int(series.isna().sum())
+        self.count += len(series)
+        self.nulls += nulls
+        if nulls == len(series):
+            return
+        if str(series.dtype) not in self.dtypes:
+            self.dtypes.append(str(series.dtype))
+        self.distinct.add(series)
+        if pd.api.types.is_numeric_dtype(series.dtype):
+            values = series.to_numpy(dtype="float64", na_value=np.nan)
+            values = values[~np.isnan(values)]
+            self.numeric_count += len(values)
+            self.sum += float(values.sum())
+            self.min = min(self.min, float(values.min()))
+            self.max = max(self.max, float(values.max()))
+            self.digest.add(values)
+        else:
+            self.saw_non_numeric = True
+            self.heavy.add(series)
+
+    def merge(self, other: "ColumnSketch") -> None:
+        self.dtypes += [d for d in other.dtypes if d not in self.dtypes]
+        self.count += other.count
+        self.nulls += other.nulls
+        self.numeric_count += other.numeric_count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.saw_non_numeric |= other.saw_non_numeric
+        self.distinct.merge(other.distinct)
+        self.digest.merge(other.digest)
+        self.heavy.merge(other.heavy)
+
+    @property
+    def dtype(self) -> str:
+        """The column's dtype, or "object" if chunks disagreed (e.g. a stray text value)."""
+        if not self.dtypes:
+            return "object"
+        return self.dtypes[0] if len(self.dtypes) == 1 else "object"
+
+    @property
+    def is_numeric(self) -> bool:
+        return self.numeric_count > 0 and not self.saw_non_numeric
+
+
+class TableSketch:
+    """Per-column sketches for a table, updated chunk by chunk and mergeable."""
+
+    def __init__(self):
+        self.columns: dict[str, ColumnSketch] = {}
+        self.row_count = 0
+
+    def update(self, df: pd.DataFrame) -> None:
+        self.row_count += len(df)
+        for col in df.columns:
+            if col not in self.columns:
+                # Column first seen in a later chunk: it was null for the earlier rows
+                self.columns[col] = ColumnSketch()
+                self.columns[col].count = self.columns[col].nulls = self.row_count - len(df)
+            self.columns[col].update(df[col])
+        for col, sketch in self.columns.items():
+            if col not in df.columns:
+                sketch.count += len(df)
+                sketch.nulls += len(df)
+
+    def merge(self, other: "TableSketch") -> None:
+        for col, sketch in other.columns.items():
+            if col not in self.columns:
+                self.columns[col] = ColumnSketch()
+                self.columns[col].count = self.columns[col].nulls = self.row_count
+            self.columns[col].merge(sketch)
+        for col, sketch in self.columns.items():
+            if col not in other.columns:
+                sketch.count += other.row_count
+                sketch.nulls += other.row_count
+        self.row_count += other.row_count
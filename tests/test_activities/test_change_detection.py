@@ -0,0 +1,177 @@
+"""Unit tests for change detection, with storage and the LLM stubbed out."""
+
+import logging
+import re
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from activities import change_detection
+from activities.change_detection import approval_metadata, run_change_detection
+from clients.json_cache import LocalJsonCache
+from tools.fingerprints import pseudocode_fingerprint, schema_fingerprint
+
+PSEUDOCODE = "1. Map Fund to FUND_ID"
+COLUMNS = ["Fund", "Amount"]
+DTYPES = {"Fund": "str", "Amount": "float64"}
+
+
+def _sample() -> dict:
+    frame = pd.DataFrame({"Fund": ["F1", "F2"], "Amount": [1.5, 2.5]})
+    return {
+        "columns": COLUMNS, "dtypes": DTYPES, "row_count": 2,
+        "sample_rows": frame.to_dict(orient="records"), "frame": frame,
+    }
+
+
+@pytest.fixture
+def stubs(monkeypatch, tmp_path):
+    """Approved code whose fingerprints match the stubbed inputs; records LLM calls."""
+    state = {
+        "metadata": {
+            "mapping_fingerprint": "mapping-v1",
+            "schema_fingerprint": schema_fingerprint(COLUMNS, DTYPES),
+            "pseudocode_fingerprint": pseudocode_fingerprint(PSEUDOCODE),
+        },
+        "mapping_fp": "mapping-v1",
+        "llm_calls": [],
+    }
+
+    def run_agent_json(system_prompt, user_message, phase):
+        state["llm_calls"].append(user_message)
+        return {"needs_regeneration": False, "reason": "Only formatting changed"}
+
+    monkeypatch.setattr(change_detection, "get_approved_code", lambda client_id: {
+        "pseudocode": PSEUDOCODE, "pyspark_code": "df = df", "metadata": state["metadata"],
+    })
+    monkeypatch.setattr(change_detection, "read_mapping_with_fingerprint",
+                        lambda path: ({"Mapping": {"sample_rows": []}}, state["mapping_fp"]))
+    monkeypatch.setattr(change_detection, "sample_source_data", lambda path, include_frame: _sample())
+    monkeypatch.setattr(change_detection, "run_agent_json", run_agent_json)
+    monkeypatch.setattr(change_detection, "get_json_cache",
+                        lambda namespace, ttl: LocalJsonCache(tmp_path, namespace, ttl, 10 ** 6))
+    return state
+
+
+def test_matching_fingerprints_reuse_code_without_llm(stubs):
+    result = run_change_detection("C1", "C1/mapping.xlsx", "C1/data.csv")
+
+    assert result["needs_regeneration"] is False
+    assert result["existing_code"]["pseudocode"] == PSEUDOCODE
+    assert stubs["llm_calls"] == []
+
+
+def test_changed_fingerprint_asks_llm(stubs):
+    stubs["mapping_fp"] = "mapping-v2"
+
+    result = run_change_detection("C1", "C1/mapping.xlsx", "C1/data.csv")
+
+    assert len(stubs["llm_calls"]) == 1
+    assert result["reason"] == "Only formatting changed"
+    assert result["existing_code"]["pseudocode"] == PSEUDOCODE
+
+
+def test_identical_rerun_reuses_cached_verdict(monkeypatch, stubs):
+    monkeypatch.setattr(change_detection, "VERDICT_CACHE_TTL", 3600)
+    stubs["mapping_fp"] = "mapping-v2"
+
+    first = run_change_detection("C1", "C1/mapping.xlsx", "C1/data.csv")
+    second = run_change_detection("C1", "C1/mapping.xlsx", "C1/data.csv")
+
+    assert len(stubs["llm_calls"]) == 1
+    assert second["reason"] == first["reason"]
+    assert second["needs_regeneration"] is False
+
+
+def test_prompt_change_invalidates_cached_verdict(monkeypatch, stubs):
+    monkeypatch.setattr(change_detection, "VERDICT_CACHE_TTL", 3600)
+    stubs["mapping_fp"] = "mapping-v2"
+
+    run_change_detection("C1", "C1/mapping.xlsx", "C1/data.csv")
+    monkeypatch.setattr(change_detection, "CHANGE_DETECTION", change_detection.CHANGE_DETECTION + "\nBe strict.")
+    run_change_detection("C1", "C1/mapping.xlsx", "C1/data.csv")
+
+    assert len(stubs["llm_calls"]) == 2
+
+
+def test_gather_skips_other_loaders_without_required_result(caplog):
+    calls = []
+
+    with caplog.at_level(logging.INFO, logger="activities.change_detection"):
+        result = change_detection._gather(
+            "C1", "approved_code",
+            approved_code=lambda: calls.append("approved_code"),
+            mapping=lambda: calls.append("mapping"),
+        )
+
+    assert result == {"approved_code": None}
+    assert calls == ["approved_code"]
+    assert "skipping mapping" in caplog.text
+
+
+def test_gather_runs_others_after_required_and_concurrently(caplog):
+    events = []
+    both_started = threading.Barrier(2, timeout=5)
+
+    def loader(name):
+        def load():
+            events.append(f"{name} start")
+            if name != "approved_code":
+                both_started.wait()  # deadlocks unless the two run at the same time
+            time.sleep(0.01)
+            events.append(f"{name} end")
+            return name.upper()
+        return load
+
+    with caplog.at_level(logging.INFO, logger="activities.change_detection"):
+        result = change_detection._gather(
+            "C1", "approved_code", mapping=loader("mapping"), approved_code=loader("approved_code"),
+            data_sample=loader("data_sample"),
+        )
+
+    assert result == {"approved_code": "APPROVED_CODE", "mapping": "MAPPING", "data_sample": "DATA_SAMPLE"}
+    assert events[:2] == ["approved_code start", "approved_code end"]
+    assert "Change-detection inputs for C1" in caplog.text
+    for name in result:
+        assert re.search(rf"{name} \d+\.\d\ds", caplog.text)
+
+
+def test_gather_reraises_loader_errors():
+    def broken():
+        raise OSError("sample failed")
+
+    with pytest.raises(OSError, match="sample failed"):
+        change_detection._gather("C1", "approved_code", approved_code=lambda: {}, data_sample=broken)
+
+
+def test_approval_metadata_records_inputs(monkeypatch):
+    monkeypatch.setattr(change_detection, "mapping_fingerprint", lambda path: "mapping-v1")
+    monkeypatch.setattr(change_detection, "sample_source_data", lambda path, include_frame: _sample())
+    monkeypatch.setattr(change_detection, "profile_source", lambda path, sample: {"row_count": 2, "columns": {}})
+
+    metadata = approval_metadata("C1", PSEUDOCODE, mapping_path="C1/mapping.xlsx", data_path="C1/data.csv")
+
+    assert metadata.mapping_path == "C1/mapping.xlsx"
+    assert metadata.mapping_fingerprint == "mapping-v1"
+    assert metadata.schema_fingerprint == schema_fingerprint(COLUMNS, DTYPES)
+    assert metadata.pseudocode_fingerprint == pseudocode_fingerprint(PSEUDOCODE)
+    assert metadata.source_profile == {"row_count": 2, "columns": {}}
+
+
+def test_approval_metadata_survives_unreadable_inputs(monkeypatch):
+    def unavailable(*args, **kwargs):
+        raise OSError("storage unavailable")
+
+    monkeypatch.setattr(change_detection, "mapping_fingerprint", unavailable)
+    monkeypatch.setattr(change_detection, "sample_source_data", lambda path, include_frame: _sample())
+    monkeypatch.setattr(change_detection, "profile_source", unavailable)
+
+    metadata = approval_metadata("C1", PSEUDOCODE, mapping_path="C1/mapping.xlsx", data_path="C1/data.csv")
+
+    assert metadata.pseudocode_fingerprint == pseudocode_fingerprint(PSEUDOCODE)
+    assert metadata.data_path == "C1/data.csv"
+    assert metadata.mapping_fingerprint is None
+    assert metadata.schema_fingerprint is None
+    assert metadata.source_profile is None
@@ -0,0 +1,24 @@
+"""Unit tests for PySpark code generation, with storage and the LLM stubbed out."""
+
+import pandas as pd
+
+from activities import code_generation
+
+
+def test_generate_pyspark_samples_only_the_head(monkeypatch):
+    calls = []
+
+    def fake_sample(path, include_frame, strategy=None):
+        calls.append(strategy)
+        return {"columns": ["Fund", "Amount"], "frame": pd.DataFrame({"Fund": ["F1"], "Amount": [1.5]})}
+
+    prompts = []
+    monkeypatch.setattr(code_generation, "sample_source_data", fake_sample)
+    monkeypatch.setattr(code_generation, "run_agent_code",
+                        lambda prompt, user_message, phase: prompts.append(prompt) or "df = df")
+
+    code = code_generation.generate_pyspark("C1", "1. Map Fund", "in/", "out/", data_path="C1/data.csv")
+
+    assert code == "df = df"
+    assert calls == ["head"]
+    assert "Fund, Amount" in prompts[0]
@@ -0,0 +1,75 @@
+"""Unit tests for the fleet-wide change-detection sweep."""
+
+import json
+
+import pytest
+
+from activities import fleet_sweep
+
+METADATA = {
+    "acme": {"mapping_path": "mappings/acme.xlsx", "data_path": "raw/acme.csv"},
+    "globex": {"mapping_path": "mappings/globex.xlsx", "data_path": "raw/globex.csv"},
+    "initech": {"mapping_path": "mappings/initech.xlsx", "data_path": "raw/initech.csv"},
+    "umbrella": {"mapping_path": "mappings/umbrella.xlsx", "data_path": "raw/umbrella.csv"},
+    "hooli": {},  # approved before paths were recorded
+}
+
+
+@pytest.fixture
+def detections(monkeypatch):
+    """Stub storage and change detection; returns the client ids that were checked."""
+    checked = []
+
+    def fake_detection(client_id, mapping_path, data_path):
+        checked.append(client_id)
+        assert (mapping_path, data_path) == (METADATA[client_id]["mapping_path"], METADATA[client_id]["data_path"])
+        if client_id == "initech":
+            raise RuntimeError("mapping file not found")
+        return {"needs_regeneration": client_id == "globex", "reason": f"checked {client_id}"}
+
+    monkeypatch.setattr(fleet_sweep, "list_approved_clients", lambda: list(METADATA))
+    monkeypatch.setattr(fleet_sweep, "get_approved_code", lambda client_id: {"metadata": METADATA[client_id]})
+    monkeypatch.setattr(fleet_sweep, "run_change_detection", fake_detection)
+    monkeypatch.setattr(fleet_sweep, "get_json_cache_stats", lambda: {"verdicts": {"hits": 1}})
+    return checked
+
+
+def test_sweep_reports_every_client_and_isolates_errors(detections):
+    report = fleet_sweep.sweep_change_detection(workers=3)
+
+    assert sorted(detections) == ["acme", "globex", "initech", "umbrella"]
+    assert report["workers"] == 3
+    assert report["counts"] == {"reuse": 2, "regenerate": 1, "error": 1, "skipped": 1}
+    assert report["cache_stats"] == {"verdicts": {"hits": 1}}
+
+    by_client = {entry["client_id"]: entry for entry in report["clients"]}
+    assert [entry["client_id"] for entry in report["clients"]] == list(METADATA)
+    assert by_client["acme"]["status"] == "reuse"
+    assert by_client["globex"]["status"] == "regenerate"
+    assert by_client["globex"]["reason"] == "checked globex"
+    assert by_client["initech"]["status"] == "error"
+    assert by_client["initech"]["reason"] == "mapping file not found"
+    assert by_client["umbrella"]["status"] == "reuse"
+    assert by_client["hooli"]["status"] == "skipped"
+    assert all(entry["seconds"] >= 0 for entry in report["clients"])
+
+    json.dumps(report)  # the report is saved as JSON
+
+
+def test_sweep_of_selected_clients(detections):
+    report = fleet_sweep.sweep_change_detection(["acme", "initech"])
+
+    assert sorted(detections) == ["acme", "initech"]
+    assert report["workers"] == 2
+    assert report["counts"] == {"reuse": 1, "error": 1}
+
+
+def test_save_sweep_report(monkeypatch, detections):
+    uploads = {}
+    monkeypatch.setattr(fleet_sweep, "upload_file", lambda container, path, data: uploads.update({(container, path): data}))
+
+    report = fleet_sweep.sweep_change_detection(["acme"])
+    path = fleet_sweep.save_sweep_report(report)
+
+    assert path.startswith("change-detection-sweeps/") and path.endswith(".json")
+    assert json.loads(uploads[("audit-trail", path)])["counts"] == {"reuse": 1}
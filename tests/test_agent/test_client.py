@@ -0,0 +1,74 @@
+"""Unit tests for the shared Azure OpenAI client and its latency tracking."""
+
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import agent.client as client
+
+
+@pytest.fixture
+def built(monkeypatch):
+    """Stub the Azure SDK so building a client is slow but offline; returns the built clients."""
+    clients = []
+
+    def fake_openai(**kwargs):
+        time.sleep(0.05)  # widen the window in which other threads could race
+        instance = SimpleNamespace(kwargs=kwargs, close=lambda: None)
+        clients.append(instance)
+        return instance
+
+    monkeypatch.setenv("AZURE_OPENAI_ENDPOINT", "https://example.openai.azure.com")
+    monkeypatch.setattr(client, "DefaultAzureCredential", lambda **kw: object())
+    monkeypatch.setattr(client, "get_bearer_token_provider", lambda credential, scope: lambda: "token")
+    monkeypatch.setattr(client, "DefaultHttpxClient", lambda: object())
+    monkeypatch.setattr(client, "AzureOpenAI", fake_openai)
+    client.reset_openai_client()
+    yield clients
+    client.reset_openai_client()
+
+
+def test_concurrent_callers_build_one_client(built):
+    n = 16
+    barrier = threading.Barrier(n)
+    results = []
+
+    def worker():
+        barrier.wait()
+        results.append(client.get_openai_client())
+
+    threads = [threading.Thread(target=worker) for _ in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(built) == 1
+    assert len(results) == n
+    assert all(r is built[0] for r in results)
+
+
+def test_reset_builds_a_new_client(built):
+    first = client.get_openai_client()
+    client.reset_openai_client()
+    assert client.get_openai_client() is not first
+    assert len(built) == 2
+
+
+def test_latency_split_into_first_call_and_steady_state(built):
+    client.get_openai_client()
+    assert client.record_call_latency(2.0) == "first call"
+    assert client.record_call_latency(0.5) == "steady state"
+    assert client.record_call_latency(0.7) == "steady state"
+
+    assert client.get_client_latency_stats() == {
+        "first_call_seconds": 2.0,
+        "steady_state_calls": 2,
+        "steady_state_mean_seconds": 0.6,
+        "steady_state_max_seconds": 0.7,
+    }
+
+    client.reset_openai_client()
+    assert client.get_client_latency_stats()["first_call_seconds"] is None
@@ -0,0 +1,85 @@
+"""Unit tests for the LLM response cache."""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import agent.runner as runner
+from agent import response_cache
+from agent.response_cache import get_llm_cache_stats, reset_llm_cache, response_key
+from clients import json_cache
+
+
+class Calls(list):
+    """Requests sent to the stub; .replies queues response texts to return."""
+
+    replies: list
+
+
+@pytest.fixture
+def llm(monkeypatch, tmp_path):
+    """Stub OpenAI client recording each request; cache on, stored under tmp_path."""
+    calls = Calls()
+    replies = []  # queued response texts; default "answer <n>"
+
+    def create(**request):
+        calls.append(request)
+        message = SimpleNamespace(content=replies.pop(0) if replies else f"answer {len(calls)}")
+        usage = SimpleNamespace(prompt_tokens=10, completion_tokens=2)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=usage)
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    monkeypatch.setattr(runner, "get_openai_client", lambda: client)
+    monkeypatch.setattr(runner, "get_deployment", lambda: "gpt-test")
+    monkeypatch.setattr(runner, "LLM_CACHE_TTL", 60)
+    monkeypatch.setattr(response_cache, "LLM_CACHE_TTL", 60)
+    monkeypatch.setattr(json_cache, "CACHE_BACKEND", "local")
+    monkeypatch.setattr(json_cache, "CACHE_DIR", str(tmp_path))
+    json_cache.reset_json_caches()
+    reset_llm_cache()
+    calls.replies = replies
+    yield calls
+    json_cache.reset_json_caches()
+    reset_llm_cache()
+
+
+def test_identical_requests_are_answered_from_cache(llm):
+    first = runner.run_agent("system", "user", phase="profiling")
+    second = runner.run_agent("system", "user", phase="profiling")
+    other = runner.run_agent("system", "other user", phase="code_generation")
+
+    assert first == second == "answer 1"
+    assert other == "answer 2"
+    assert len(llm) == 2
+    assert get_llm_cache_stats() == {
+        "profiling": {"hits": 1, "misses": 1, "hit_rate": 0.5},
+        "code_generation": {"hits": 0, "misses": 1, "hit_rate": 0.0},
+    }
+
+
+def test_persistent_tier_survives_process_memory(llm):
+    runner.run_agent("system", "user")
+    reset_llm_cache()  # as if in a new worker process
+
+    assert runner.run_agent("system", "user") == "answer 1"
+    assert len(llm) == 1
+
+
+def test_key_covers_deployment_and_messages():
+    base = {"model": "a", "messages": [{"role": "user", "content": "x"}]}
+
+    assert response_key(base) == response_key(dict(reversed(list(base.items()))))
+    assert response_key(base) != response_key({**base, "model": "b"})
+    assert response_key(base) != response_key({**base, "temperature": 0})
+
+
+def test_unparseable_responses_are_not_cached(llm):
+    llm.replies += ["```json\n{not json\n```", '```json\n{"needs_regeneration": false}\n```']
+
+    with pytest.raises(json.JSONDecodeError):
+        runner.run_agent_json("system", "user", phase="change_detection")
+    # The retry gets a fresh completion, which is then cached
+    assert runner.run_agent_json("system", "user", phase="change_detection") == {"needs_regeneration": False}
+    assert runner.run_agent_json("system", "user", phase="change_detection") == {"needs_regeneration": False}
+    assert len(llm) == 2
@@ -0,0 +1,76 @@
+"""Unit tests for streamed completions and incremental fence detection."""
+
+from types import SimpleNamespace
+
+import agent.runner as runner
+from agent.streaming import FenceWatcher, stream_completion
+
+
+class FakeStream:
+    def __init__(self, deltas: list[str], completion_tokens: int | None = None):
+        self.deltas = deltas
+        self.completion_tokens = completion_tokens
+        self.consumed = 0
+        self.closed = False
+
+    def __iter__(self):
+        yield SimpleNamespace(choices=[], usage=None)  # prompt filter results
+        for delta in self.deltas:
+            self.consumed += 1
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=delta))], usage=None)
+        if self.completion_tokens is not None:
+            yield SimpleNamespace(choices=[], usage=SimpleNamespace(completion_tokens=self.completion_tokens))
+
+    def close(self):
+        self.closed = True
+
+
+def _client(stream: FakeStream):
+    return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=lambda **kw: stream)))
+
+
+CODE_DELTAS = ["```py", "thon\nimport os\n", "print(1)\n`", "``\n", "This script ", "prints 1.", " More text."]
+
+
+def test_fence_watcher_handles_fences_split_across_deltas():
+    watcher = FenceWatcher()
+    closed = [watcher.feed(delta) for delta in CODE_DELTAS[:4]]
+
+    assert closed == [False, False, False, True]
+    assert "".join(CODE_DELTAS)[:watcher.close_end] == "```python\nimport os\nprint(1)\n```\n"
+
+
+def test_fence_watcher_ignores_fences_after_prose():
+    watcher = FenceWatcher()
+    for delta in ["Here you go:\n", "```json\n", "{}\n", "```\n"]:
+        assert not watcher.feed(delta)
+    assert watcher.opens_with_fence is False
+
+
+def test_stream_stops_at_closing_fence():
+    stream = FakeStream(CODE_DELTAS, completion_tokens=40)
+    text, stats = stream_completion(_client(stream), {"model": "m", "messages": []}, stop_at_closing_fence=True)
+
+    assert text == "```python\nimport os\nprint(1)\n```\n"
+    assert stream.consumed == 4 and stream.closed
+    assert stats["stopped_early"] and stats["completion_tokens"] == 4  # no usage chunk: one per delta
+    assert stats["ttft"] is not None
+
+
+def test_stream_reads_everything_without_early_stop():
+    stream = FakeStream(CODE_DELTAS, completion_tokens=40)
+    text, stats = stream_completion(_client(stream), {"model": "m", "messages": []})
+
+    assert text == "".join(CODE_DELTAS)
+    assert stats["completion_tokens"] == 40 and not stats["stopped_early"]
+
+
+def test_run_agent_code_in_streaming_mode(monkeypatch):
+    stream = FakeStream(CODE_DELTAS)
+    monkeypatch.setattr(runner, "LLM_RESPONSE_MODE", "streaming")
+    monkeypatch.setattr(runner, "LLM_CACHE_TTL", 0)
+    monkeypatch.setattr(runner, "get_openai_client", lambda: _client(stream))
+    monkeypatch.setattr(runner, "get_deployment", lambda: "gpt-test")
+
+    assert runner.run_agent_code("system", "user") == "import os\nprint(1)"
+    assert runner.get_last_call_stats()["stopped_early"]
@@ -0,0 +1,70 @@
+"""Unit tests for the prompt token-budget planner."""
+
+import logging
+
+import pytest
+
+from agent import token_budget
+from agent.token_budget import plan_prompt
+
+
+@pytest.fixture(autouse=True)
+def char_tokens(monkeypatch):
+    """Count one token per 4 characters so tests need no tiktoken download."""
+    monkeypatch.setattr(token_budget, "count_tokens", lambda text: len(text) // 4)
+
+
+def _sections(n_rows: int = 20, cell: str = "x") -> dict:
+    rows = [{"id": i, "note": cell, "empty": None, "Fund Code": None, "const": "A"} for i in range(n_rows)]
+    profile = {"columns": {
+        "id": {"null_rate": 0.0, "unique_count": n_rows},
+        "note": {"null_rate": 0.0, "unique_count": 2, "top_values": {"a": 5, "b": 4, "c": 3}},
+        "empty": {"null_rate": 1.0, "unique_count": 0},
+        "Fund Code": {"null_rate": 1.0, "unique_count": 0},
+        "const": {"null_rate": 0.0, "unique_count": 1, "top_values": {"A": n_rows}},
+    }}
+    mapping = {"Mapping": {"sample_rows": [{"Source": "Fund Code", "Rule": "r" * 500}]}}
+    return {"mapping": mapping, "data_profile": profile, "sample_rows": rows}
+
+
+def test_within_budget_is_unchanged(monkeypatch):
+    monkeypatch.setitem(token_budget.PHASE_TOKEN_BUDGETS, "profiling", 100_000)
+    sections = _sections()
+
+    assert plan_prompt("profiling", "system", sections, profile_key="data_profile") == sections
+
+
+def test_trims_low_value_content_first(monkeypatch, caplog):
+    monkeypatch.setitem(token_budget.PHASE_TOKEN_BUDGETS, "profiling", 900)
+    sections = _sections(cell="y" * 1000)
+
+    with caplog.at_level(logging.INFO, logger="agent.token_budget"):
+        result = plan_prompt("profiling", "system", sections, profile_key="data_profile")
+
+    # Only the empty column the mapping does not mention is dropped; constants stay
+    assert set(result["data_profile"]["columns"]) == {"id", "note", "Fund Code", "const"}
+    assert set(result["sample_rows"][0]) == {"id", "note", "Fund Code", "const"}
+    assert len(result["sample_rows"][0]["note"]) == token_budget.MAX_CELL_CHARS + 1
+    assert token_budget.MIN_SAMPLE_ROWS <= len(result["sample_rows"]) < 20
+    # Mapping rules are never trimmed, and the input is not modified
+    assert result["mapping"] == sections["mapping"]
+    assert len(sections["sample_rows"]) == 20
+    assert "Prompt tokens for profiling" in caplog.text and "sample_rows" in caplog.text
+
+
+def test_nested_sample_path_without_profile(monkeypatch):
+    monkeypatch.setitem(token_budget.PHASE_TOKEN_BUDGETS, "change_detection", 200)
+    rows = [{"id": i, "empty": "", "text": "z" * 300} for i in range(10)]
+    sections = {"current_data_sample": {"columns": ["id", "empty", "text"], "sample_rows": rows}, "stored_pseudocode": "p"}
+
+    result = plan_prompt("change_detection", "", sections, sample_path=("current_data_sample", "sample_rows"))
+
+    trimmed = result["current_data_sample"]["sample_rows"]
+    assert "empty" not in trimmed[0]
+    assert len(trimmed) == token_budget.MIN_SAMPLE_ROWS
+
+
+def test_count_tokens_falls_back_without_encoding(monkeypatch):
+    monkeypatch.undo()
+    monkeypatch.setattr(token_budget, "_get_encoding", lambda: None)
+    assert token_budget.count_tokens("abcdefgh") == 2
@@ -0,0 +1,130 @@
+"""Unit tests for the pooled ADLS client registry."""
+
+import io
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+import clients.adls as adls
+
+
+@pytest.fixture(autouse=True)
+def _reset_registry(monkeypatch):
+    monkeypatch.setenv("ADLS_ACCOUNT_NAME", "testaccount")
+    adls.reset_adls_clients()
+    yield
+    adls.reset_adls_clients()
+
+
+@patch("clients.adls.DefaultAzureCredential")
+@patch("clients.adls.DataLakeServiceClient")
+def test_client_built_once_across_threads(mock_service, mock_credential):
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        clients = list(pool.map(lambda _: adls.get_adls_client(), range(32)))
+
+    assert mock_service.call_count == 1
+    assert mock_credential.call_count == 1
+    assert all(c is clients[0] for c in clients)
+
+
+@patch("clients.adls.DefaultAzureCredential")
+@patch("clients.adls.DataLakeServiceClient")
+def test_file_system_client_cached_per_container(mock_service, mock_credential):
+    service = mock_service.return_value
+    service.get_file_system_client.side_effect = lambda name: object()
+
+    data_fs = adls.get_file_system_client("data")
+    assert adls.get_file_system_client("data") is data_fs
+    assert adls.get_file_system_client("output") is not data_fs
+    assert service.get_file_system_client.call_count == 2
+
+
+@patch("clients.adls.DefaultAzureCredential")
+@patch("clients.adls.DataLakeServiceClient")
+def test_reset_rebuilds_clients(mock_service, mock_credential):
+    adls.get_adls_client()
+    adls.reset_adls_clients()
+    adls.get_adls_client()
+    assert mock_service.call_count == 2
+    assert mock_credential.call_count == 2
+
+
+class _FakeFileClient:
+    def __init__(self, fail_at: int | None = None):
+        self.blocks = {}
+        self.flushed = None
+        self.renamed_to = None
+        self.deleted = False
+        self.in_flight = 0
+        self.peak = 0
+        self.fail_at = fail_at
+        self._lock = threading.Lock()
+
+    def create_file(self):
+        self.blocks.clear()
+
+    def append_data(self, data, offset, length):
+        if offset == self.fail_at:
+            raise OSError("connection reset")
+        with self._lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        time.sleep(0.005)
+        self.blocks[offset] = bytes(data)
+        with self._lock:
+            self.in_flight -= 1
+
+    def flush_data(self, offset):
+        self.flushed = offset
+
+    def rename_file(self, new_name):
+        self.renamed_to = new_name
+
+    def delete_file(self):
+        self.deleted = True
+
+
+def _fake_fs(monkeypatch, file_client) -> MagicMock:
+    fs = MagicMock()
+    fs.file_system_name = "data"
+    fs.get_file_client.return_value = file_client
+    monkeypatch.setattr(adls.AzureStorageBackend, "get_file_system_client", lambda self, container: fs)
+    return fs
+
+
+def test_upload_stream_appends_blocks_in_parallel(monkeypatch):
+    file_client = _FakeFileClient()
+    fs = _fake_fs(monkeypatch, file_client)
+    payload = bytes(range(256)) * 400  # 102,400 bytes
+    progress = []
+
+    uploaded = adls.upload_stream(
+        "data", "big.csv", io.BytesIO(payload), total_size=len(payload),
+        block_size=4_096, max_concurrency=3, progress=lambda done, total: progress.append(done),
+    )
+
+    assert uploaded == len(payload)
+    assert file_client.flushed == len(payload)
+    assert b"".join(file_client.blocks[o] for o in sorted(file_client.blocks)) == payload
+    assert 1 < file_client.peak <= 3
+    assert progress[-1] == len(payload) and len(progress) == 25
+    # Written under a temporary name, then renamed over the target
+    temp_path = fs.get_file_client.call_args.args[0]
+    assert temp_path.startswith(".big.csv.") and temp_path.endswith(".uploading")
+    assert file_client.renamed_to == "data/big.csv"
+
+
+def test_failed_upload_leaves_target_untouched(monkeypatch):
+    file_client = _FakeFileClient(fail_at=8_192)
+    fs = _fake_fs(monkeypatch, file_client)
+
+    with pytest.raises(OSError, match="connection reset"):
+        adls.upload_stream("data", "in/big.csv", io.BytesIO(b"x" * 20_000), block_size=4_096)
+
+    assert fs.get_file_client.call_args.args[0].startswith("in/.big.csv.")
+    assert file_client.renamed_to is None
+    assert file_client.flushed is None
+    assert file_client.deleted is True
@@ -0,0 +1,52 @@
+"""Unit tests for the async ADLS layer and its sync bridge."""
+
+import asyncio
+
+import clients.adls_async as adls_async
+
+
+def test_download_many_respects_concurrency_limit(monkeypatch):
+    in_flight = 0
+    peak = 0
+
+    async def fake_download(container, path):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return path.encode()
+
+    monkeypatch.setattr(adls_async, "download_file", fake_download)
+    paths = [f"part-{i}.parquet" for i in range(20)]
+
+    result = adls_async.run_sync(adls_async.download_many("output", paths, max_concurrency=4))
+
+    assert result == {p: p.encode() for p in paths}
+    assert peak == 4
+
+
+def test_run_sync_reuses_one_loop():
+    async def current_loop():
+        return asyncio.get_running_loop()
+
+    assert adls_async.run_sync(current_loop()) is adls_async.run_sync(current_loop())
+
+
+def test_clients_use_the_backend_credential(monkeypatch):
+    from clients import adls
+
+    class SyncCredential:
+        def get_token(self, *scopes, **kwargs):
+            return ("token", scopes)
+
+    monkeypatch.setenv("ADLS_ACCOUNT_NAME", "acct")
+    adls.set_storage_backend(adls.AzureStorageBackend(credential=SyncCredential()))
+    try:
+        async def token():
+            fs = await adls_async.get_file_system_client("data")
+            return await fs.credential.get_token("scope")
+
+        assert adls_async.run_sync(token()) == ("token", ("scope",))
+    finally:
+        adls.set_storage_backend(None)
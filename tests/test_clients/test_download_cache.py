@@ -0,0 +1,39 @@
+"""Unit tests for the ETag-keyed download cache."""
+
+import os
+import time
+
+from clients.download_cache import DownloadCache
+
+
+def test_hit_only_when_etag_matches(tmp_path):
+    cache = DownloadCache(tmp_path, max_bytes=1_000)
+    cache.put("acct/data/a.csv", '"etag-1"', b"abc")
+
+    assert cache.get("acct/data/a.csv", '"etag-1"') == b"abc"
+    assert cache.get("acct/data/a.csv", '"etag-2"') is None
+    assert cache.get("acct/data/missing.csv", '"etag-1"') is None
+    assert cache.stats() == {"hits": 1, "misses": 2, "hit_rate": 0.333, "bytes_saved": 3}
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = DownloadCache(tmp_path, max_bytes=250)
+    cache.put("a", "e", b"a" * 100)
+    cache.put("b", "e", b"b" * 100)
+    # Make "a" older than "b", then touch it via a hit so "b" becomes the LRU entry
+    for i, key in enumerate(("a", "b")):
+        data_path, _ = cache._paths(key)
+        os.utime(data_path, (time.time() - 100 + i, time.time() - 100 + i))
+    assert cache.get("a", "e") is not None
+
+    cache.put("c", "e", b"c" * 100)
+
+    assert cache.get("b", "e") is None
+    assert cache.get("a", "e") == b"a" * 100
+    assert cache.get("c", "e") == b"c" * 100
+
+
+def test_skips_blobs_larger_than_cache(tmp_path):
+    cache = DownloadCache(tmp_path, max_bytes=10)
+    cache.put("big", "e", b"x" * 11)
+    assert cache.get("big", "e") is None
@@ -0,0 +1,50 @@
+"""Unit tests for the persistent JSON cache."""
+
+import os
+import time
+
+from clients.json_cache import CosmosJsonCache, LocalJsonCache
+
+
+def test_round_trip_and_stats(tmp_path):
+    cache = LocalJsonCache(tmp_path, "profiles", ttl_seconds=60, max_bytes=10_000)
+    cache.put('["a.csv", "etag-1"]', {"row_count": 3, "columns": {"id": {"null_count": 0}}})
+
+    assert cache.get('["a.csv", "etag-1"]') == {"row_count": 3, "columns": {"id": {"null_count": 0}}}
+    assert cache.get('["a.csv", "etag-2"]') is None
+    assert cache.stats() == {"hits": 1, "misses": 1, "hit_rate": 0.5}
+
+
+def test_expired_entries_are_misses(tmp_path):
+    cache = LocalJsonCache(tmp_path, "profiles", ttl_seconds=-1, max_bytes=10_000)
+    cache.put("k", {"v": 1})
+    assert cache.get("k") is None
+    assert not list((tmp_path / "profiles").glob("*.json"))
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = LocalJsonCache(tmp_path, "profiles", ttl_seconds=60, max_bytes=250)
+    cache.put("a", "x" * 60)
+    cache.put("b", "x" * 60)
+    for i, key in enumerate(("a", "b")):
+        os.utime(cache._path(key), (time.time() - 100 + i, time.time() - 100 + i))
+    assert cache.get("a") is not None
+
+    cache.put("c", "x" * 60)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+
+
+def test_backend_errors_are_misses():
+    class Broken:
+        def read_item(self, **kwargs):
+            raise ConnectionError("cosmos unavailable")
+
+        def upsert_item(self, item):
+            raise ConnectionError("cosmos unavailable")
+
+    cache = CosmosJsonCache(Broken(), "profiles", ttl_seconds=60)
+    cache.put("k", {"v": 1})
+    assert cache.get("k") is None
+    assert cache.stats()["misses"] == 1
@@ -0,0 +1,279 @@
+"""Unit tests for ADLS reading tools (storage calls replaced with in-memory blobs)."""
+
+import io
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+import clients.adls as adls_client
+import clients.adls_async as adls_async
+import tools.adls as adls_tools
+
+
+@pytest.fixture
+def blobs(monkeypatch):
+    """In-memory blob store; records every ranged read as (offset, length)."""
+    store: dict[tuple[str, str], bytes] = {}
+    reads: list[tuple[int, int]] = []
+
+    def download_range(container, path, offset, length):
+        reads.append((offset, length))
+        return store[(container, path)][offset:offset + length]
+
+    def get_file_metadata(container, path):
+        return {"size": len(store[(container, path)])}
+
+    async def download_ranges(container, ranges, max_concurrency=16):
+        return [download_range(container, path, offset, length) for path, offset, length in ranges]
+
+    monkeypatch.setattr(adls_async, "download_ranges", download_ranges)
+    for module in (adls_tools, adls_client):
+        monkeypatch.setattr(module, "download_range", download_range)
+        monkeypatch.setattr(module, "get_file_metadata", get_file_metadata)
+    monkeypatch.setattr(adls_tools, "download_file", lambda c, p: store[(c, p)])
+    monkeypatch.setattr(adls_tools, "list_file_properties", lambda c, prefix="": [
+        {"name": name, "size": len(data)}
+        for (cont, name), data in sorted(store.items())
+        if cont == c and name.startswith(prefix)
+    ])
+    monkeypatch.setattr(adls_tools, "open_stream", lambda c, p: io.BytesIO(store[(c, p)]))
+    monkeypatch.setattr(adls_tools, "CSV_SAMPLE_INITIAL_BYTES", 1024)
+    return store, reads
+
+
+def _csv(n: int) -> bytes:
+    lines = ["id,fund,note"] + [f"{i:06d},F{i % 7},\"line {i:06d}, quoted\"" for i in range(n)]
+    return ("\n".join(lines) + "\n").encode()
+
+
+def test_csv_sample_reads_only_a_prefix(blobs):
+    store, reads = blobs
+    store[("data", "big.csv")] = _csv(50_000)
+
+    result = adls_tools.sample_source_data("big.csv", n_rows=100)
+
+    assert len(result["sample_rows"]) == 100
+    assert result["sample_rows"][0] == {"id": 0, "fund": "F0", "note": "line 000000, quoted"}
+    assert result["row_count_exact"] is False
+    assert 45_000 < result["row_count"] < 55_000
+    assert sum(length for _, length in reads) < len(store[("data", "big.csv")]) // 50
+
+
+def test_csv_sample_small_file_is_exact(blobs):
+    store, _ = blobs
+    store[("data", "small.csv")] = _csv(10)
+
+    result = adls_tools.sample_source_data("small.csv", n_rows=100)
+
+    assert result["row_count"] == 10
+    assert result["row_count_exact"] is True
+    assert len(result["sample_rows"]) == 10
+
+
+def test_csv_sample_empty_and_header_only_files(blobs):
+    store, _ = blobs
+    store[("data", "empty.csv")] = b""
+    store[("data", "header.csv")] = b"id,fund,note\n"
+
+    empty = adls_tools.sample_source_data("empty.csv", n_rows=100)
+    header = adls_tools.sample_source_data("header.csv", n_rows=100)
+
+    assert (empty["columns"], empty["row_count"], empty["sample_rows"]) == ([], 0, [])
+    assert (header["columns"], header["row_count"], header["sample_rows"]) == (["id", "fund", "note"], 0, [])
+    assert header["row_count_exact"] is True
+
+
+def test_csv_exact_row_count_streams_file(blobs):
+    store, _ = blobs
+    store[("data", "big.csv")] = _csv(5_000)
+
+    result = adls_tools.sample_source_data("big.csv", n_rows=5, exact_row_count=True)
+
+    assert result["row_count"] == 5_000
+    assert result["row_count_exact"] is True
+    assert len(result["sample_rows"]) == 5
+
+
+def test_iter_source_chunks_survives_type_change_mid_file(blobs, monkeypatch):
+    store, _ = blobs
+    rows = [f"{i},{i * 2}" for i in range(3_000)] + ["n/a,7"]
+    store[("data", "drift.csv")] = ("a,b\n" + "\n".join(rows) + "\n").encode()
+    monkeypatch.setattr("tools.arrow_io.CSV_BLOCK_SIZE", 4_096)
+
+    chunks = list(adls_tools.iter_source_chunks("drift.csv", chunk_rows=1_000))
+
+    assert sum(len(c) for c in chunks) == 3_001
+    assert pd.concat(chunks)["b"].tolist() == [i * 2 for i in range(3_000)] + [7]
+
+
+def test_csv_stratified_sample_streams_whole_file(blobs):
+    store, _ = blobs
+    store[("data", "big.csv")] = _csv(5_000)
+
+    result = adls_tools.sample_source_data("big.csv", n_rows=14, strategy="stratified", stratify_by="fund")
+
+    assert result["sample_strategy"] == "stratified"
+    assert result["stratify_by"] == "fund"
+    assert result["row_count"] == 5_000
+    assert result["row_count_exact"] is True
+    assert sorted(row["fund"] for row in result["sample_rows"]) == sorted([f"F{i}" for i in range(7)] * 2)
+
+
+def _parquet(n: int, row_group_size: int) -> bytes:
+    df = pd.DataFrame({
+        "id": range(n),
+        "amount": [float(i) for i in range(n)],
+        "fund": [f"F{i % 3}" if i % 10 else None for i in range(n)],
+    })
+    buf = io.BytesIO()
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), buf, row_group_size=row_group_size)
+    return buf.getvalue()
+
+
+def test_parquet_sample_uses_footer_and_first_row_group(blobs):
+    store, reads = blobs
+    store[("data", "t.parquet")] = _parquet(100_000, row_group_size=10_000)
+
+    result = adls_tools.sample_source_data("t.parquet", n_rows=20, columns=["id", "fund"])
+
+    assert result["row_count"] == 100_000
+    assert result["columns"] == ["id", "fund"]
+    assert len(result["sample_rows"]) == 20
+    assert result["column_stats"]["id"] == {"null_count": 0, "min": 0, "max": 99_999}
+    assert result["column_stats"]["fund"]["null_count"] == 10_000
+    assert sum(length for _, length in reads) < len(store[("data", "t.parquet")]) // 5
+
+
+def test_iter_source_chunks_covers_every_row(blobs):
+    store, _ = blobs
+    store[("data", "big.csv")] = _csv(2_500)
+    store[("data", "t.parquet")] = _parquet(2_500, row_group_size=1_000)
+
+    csv_chunks = list(adls_tools.iter_source_chunks("big.csv", chunk_rows=1_000))
+    parquet_chunks = list(adls_tools.iter_source_chunks("t.parquet", chunk_rows=1_000, columns=["fund"]))
+
+    assert [len(c) for c in csv_chunks] == [1_000, 1_000, 500]
+    assert sum(len(c) for c in parquet_chunks) == 2_500
+    assert list(parquet_chunks[0].columns) == ["fund"]
+
+
+def test_csv_and_parquet_stay_arrow_until_the_payload(blobs):
+    store, _ = blobs
+    store[("data", "big.csv")] = _csv(2_500)
+    store[("data", "t.parquet")] = _parquet(2_500, row_group_size=1_000)
+
+    for path in ("big.csv", "t.parquet"):
+        tables = list(adls_tools.iter_source_tables(path, chunk_rows=1_000))
+        assert all(isinstance(t, pa.Table) for t in tables)
+        assert sum(t.num_rows for t in tables) == 2_500
+
+        result = adls_tools.sample_source_data(path, n_rows=5, include_frame=True, strategy="head")
+        assert isinstance(result["frame"], pa.Table)
+        assert result["frame"].num_rows == len(result["sample_rows"]) == 5
+
+
+def test_spark_output_reads_all_part_footers(blobs):
+    store, reads = blobs
+    for i in range(5):
+        store[("output", f"run/part-{i:05d}.parquet")] = _parquet(1_000 * (i + 1), row_group_size=500)
+    store[("output", "run/_SUCCESS")] = b""
+
+    result = adls_tools.read_spark_output("run", n_rows=50, include_table=True)
+
+    assert result["table"].num_rows == 50
+    assert result["row_count"] == 15_000
+    assert result["part_file_count"] == 5
+    assert [p["row_count"] for p in result["parts"]] == [1_000, 2_000, 3_000, 4_000, 5_000]
+    assert result["schema_consistent"] is True
+    assert len(result["sample_rows"]) == 50
+    assert result["column_stats"]["id"]["max"] == 4_999
+    # Small parts fit in the prefetched tail, so each is fetched exactly once
+    assert len(reads) == 5
+
+
+def _workbook() -> bytes:
+    import openpyxl
+
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "Mapping"
+    ws.append(["Source", "Target", None, "Target"])
+    for i in range(25):
+        ws.append([f"src_{i}", f"TGT_{i}", i, "x"])
+    ws.append([])
+    ws.append(["last", "LAST", 99, None])
+    lookup = wb.create_sheet("A_TYPE")
+    lookup.append(["Client", "DNAV"])
+    lookup.append(["COMMON STOCK", "EQT"])
+    wb.create_sheet("Empty")
+    buf = io.BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
+
+
+def test_mapping_spreadsheet_matches_pandas(blobs):
+    store, _ = blobs
+    data = store[("mappings", "m.xlsx")] = _workbook()
+
+    result = adls_tools.read_mapping_spreadsheet("m.xlsx")
+
+    assert list(result) == ["Mapping", "A_TYPE", "Empty"]
+    for sheet in ("Mapping", "A_TYPE"):
+        df = pd.read_excel(io.BytesIO(data), sheet_name=sheet)
+        assert result[sheet]["columns"] == list(df.columns)
+        assert result[sheet]["row_count"] == len(df)
+        assert len(result[sheet]["sample_rows"]) == min(10, len(df))
+    assert result["Mapping"]["sample_rows"][0] == {
+        "Source": "src_0", "Target": "TGT_0", "Unnamed: 2": 0, "Target.1": "x",
+    }
+    assert result["Empty"] == {"columns": [], "row_count": 0, "sample_rows": []}
+
+
+def test_mapping_spreadsheet_named_sheets(blobs):
+    store, _ = blobs
+    store[("mappings", "m.xlsx")] = _workbook()
+
+    result = adls_tools.read_mapping_spreadsheet("m.xlsx", n_rows=1, sheets=["A_TYPE"])
+
+    assert result == {"A_TYPE": {
+        "columns": ["Client", "DNAV"],
+        "row_count": 1,
+        "sample_rows": [{"Client": "COMMON STOCK", "DNAV": "EQT"}],
+    }}
+
+
+def test_mapping_fingerprint_tracks_cells_not_bytes(blobs):
+    import openpyxl
+
+    store, _ = blobs
+    store[("mappings", "m.xlsx")] = _workbook()
+    base = adls_tools.mapping_fingerprint("m.xlsx")
+
+    wb = openpyxl.load_workbook(io.BytesIO(store[("mappings", "m.xlsx")]))
+    buf = io.BytesIO()
+    wb.save(buf)
+    store[("mappings", "m.xlsx")] = buf.getvalue()
+    assert adls_tools.mapping_fingerprint("m.xlsx") == base
+
+    # A change past the rows read_mapping_spreadsheet samples still counts
+    wb["Mapping"]["C27"] = 100
+    buf = io.BytesIO()
+    wb.save(buf)
+    store[("mappings", "m.xlsx")] = buf.getvalue()
+    assert adls_tools.mapping_fingerprint("m.xlsx") != base
+
+
+def test_mapping_and_fingerprint_from_one_download(blobs, monkeypatch):
+    store, _ = blobs
+    store[("mappings", "m.xlsx")] = _workbook()
+    downloads = []
+    download = adls_tools.download_file
+    monkeypatch.setattr(adls_tools, "download_file", lambda *args: downloads.append(args) or download(*args))
+
+    mapping, fingerprint = adls_tools.read_mapping_with_fingerprint("m.xlsx")
+
+    assert len(downloads) == 1
+    assert mapping == adls_tools.read_mapping_spreadsheet("m.xlsx")
+    assert fingerprint == adls_tools.mapping_fingerprint("m.xlsx")
@@ -0,0 +1,50 @@
+"""Unit tests for the Arrow CSV reading layer."""
+
+import io
+
+import pandas as pd
+import pyarrow as pa
+
+from tools.arrow_io import count_csv_rows, iter_csv_tables, read_csv_table, to_pandas
+
+CSV = b"id,fund,code,amount\n" + b"".join(b"%d,F%d,BUY,%d.5\n" % (i, i % 3, i) for i in range(250))
+
+
+def test_read_projects_columns_and_dictionary_encodes_strings():
+    table = read_csv_table(io.BytesIO(CSV), columns=["fund", "amount"])
+
+    assert table.column_names == ["fund", "amount"]
+    assert table.num_rows == 250
+    assert pa.types.is_dictionary(table.schema.field("fund").type)
+
+    df = to_pandas(table)
+    assert df["fund"].dtype != "category"
+    assert df.iloc[1].to_dict() == {"fund": "F1", "amount": 1.5}
+
+
+def test_read_first_n_rows():
+    table = read_csv_table(io.BytesIO(CSV), n_rows=10)
+    assert table.num_rows == 10
+    assert table.column("id").to_pylist() == list(range(10))
+
+
+def test_iter_tables_and_count(monkeypatch):
+    monkeypatch.setattr("tools.arrow_io.CSV_BLOCK_SIZE", 512)
+
+    sizes = [t.num_rows for t in iter_csv_tables(io.BytesIO(CSV), chunk_rows=100)]
+
+    assert sizes == [100, 100, 50]
+    assert count_csv_rows(io.BytesIO(CSV)) == 250
+    assert count_csv_rows(io.BytesIO(b"id,fund\n")) == 0
+
+
+def test_duplicate_headers_are_suffixed_like_pandas():
+    csv = b"id,amount,amount,amount.1,id\n1,2,3,4,5\n"
+    expected = ["id", "amount", "amount.2", "amount.1", "id.1"]
+    assert expected == list(pd.read_csv(io.BytesIO(csv)).columns)
+
+    assert read_csv_table(io.BytesIO(csv)).column_names == expected
+    assert read_csv_table(io.BytesIO(csv), n_rows=1).column_names == expected
+    assert read_csv_table(io.BytesIO(csv), columns=["amount.2"]).column("amount.2").to_pylist() == [3]
+    assert [t.column_names for t in iter_csv_tables(io.BytesIO(csv), chunk_rows=10)] == [expected]
+    assert read_csv_table(io.BytesIO(b"a,a\n")).column_names == ["a", "a.1"]
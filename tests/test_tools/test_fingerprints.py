@@ -0,0 +1,24 @@
+"""Unit tests for content fingerprints."""
+
+from tools.fingerprints import prompt_fingerprint, schema_fingerprint, workbook_fingerprint
+
+
+def test_schema_fingerprint_tracks_names_order_and_dtypes():
+    base = schema_fingerprint(["id", "amount"], {"id": "int64", "amount": "float64"})
+
+    assert base == schema_fingerprint(["id", "amount"], {"amount": "float64", "id": "int64"})
+    assert base != schema_fingerprint(["amount", "id"], {"id": "int64", "amount": "float64"})
+    assert base != schema_fingerprint(["id", "amount"], {"id": "int64", "amount": "str"})
+
+
+def test_workbook_fingerprint_separates_sheets_and_rows():
+    rows = [("a", 1), ("b", 2)]
+
+    assert workbook_fingerprint([("S", rows)]) == workbook_fingerprint([("S", iter(rows))])
+    assert workbook_fingerprint([("S", rows)]) != workbook_fingerprint([("T", rows)])
+    assert workbook_fingerprint([("S", rows)]) != workbook_fingerprint([("S", rows[:1]), ("T", rows[1:])])
+
+
+def test_prompt_fingerprint_changes_with_template():
+    assert prompt_fingerprint("Compare {a}") == prompt_fingerprint("Compare {a}")
+    assert prompt_fingerprint("Compare {a}") != prompt_fingerprint("Compare {a}.")
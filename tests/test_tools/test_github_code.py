@@ -38,3 +38,16 @@ def test_save_and_get_approved_code():
     assert result["pyspark_code"] == pyspark_code
     assert result["metadata"]["client_id"] == client_id
     assert result["metadata"]["approved_by"] == "test@example.com"
+
+
+def test_list_approved_clients_skips_incomplete_entries():
+    from tools.github_code import APPROVED_CODE_DIR, list_approved_clients
+
+    metadata = ApprovedCodeMetadata(client_id="LIST_B", approved_by="test", approved_at=datetime(2026, 1, 1))
+    save_approved_code("LIST_B", "p", "c", metadata)
+    save_approved_code("LIST_A", "p", "c", metadata)
+    (APPROVED_CODE_DIR / "LIST_PARTIAL").mkdir()
+    (APPROVED_CODE_DIR / "LIST_PARTIAL" / "transform.py").write_text("c")
+
+    clients = list_approved_clients()
+    assert [c for c in clients if c.startswith("LIST_")] == ["LIST_A", "LIST_B"]
@@ -1,6 +1,9 @@
 """Unit tests for integrity checks."""
 
 from unittest.mock import patch
+
+import pyarrow as pa
+
 from activities.integrity_checks import run_integrity_checks
 
 
@@ -46,3 +49,38 @@ def test_integrity_fail_missing_columns(mock_read):
     report = run_integrity_checks("output/test.parquet", expected_columns=["id", "name"])
     assert report.overall_pass is False
     assert any("Missing" in c.message for c in report.checks)
+
+
+@patch("activities.integrity_checks.read_spark_output")
+def test_integrity_fail_part_schema_mismatch(mock_read):
+    mock_read.return_value = {
+        "columns": ["id"],
+        "dtypes": {"id": "int64"},
+        "row_count": 10,
+        "sample_rows": [{"id": 1}],
+        "part_file_count": 2,
+        "schema_consistent": False,
+        "schema_mismatches": ["out/part-00001.parquet"],
+    }
+
+    report = run_integrity_checks("output/test")
+    assert report.overall_pass is False
+    assert any(c.name == "part_schema_consistency" and not c.passed for c in report.checks)
+
+
+@patch("activities.integrity_checks.read_spark_output")
+def test_integrity_checks_arrow_sample(mock_read):
+    table = pa.table({"id": [1, 1, 2], "note": pa.array([None, None, None], pa.string())})
+    mock_read.return_value = {
+        "columns": ["id", "note"],
+        "dtypes": {"id": "int64", "note": "str"},
+        "row_count": 3,
+        "sample_rows": table.to_pylist(),
+        "table": table,
+    }
+
+    report = run_integrity_checks("output/test.parquet")
+    checks = {c.name: c for c in report.checks}
+    assert mock_read.call_args.kwargs == {"include_table": True}
+    assert not checks["null_check_note"].passed
+    assert checks["duplicate_check"].details == {"duplicates": 1, "sample_size": 3}
@@ -1,6 +1,10 @@
 """Unit tests for the profiling tool."""
 
-from tools.profiling import profile_data
+import pandas as pd
+import pyarrow as pa
+
+from tools import parallel_profiling
+from tools.profiling import profile_chunks, profile_data
 
 
 def test_profile_basic():
@@ -51,3 +55,55 @@ def test_profile_anomaly_constant_column():
     }
     result = profile_data(data)
     assert any("constant" in a for a in result["anomalies"])
+
+
+def test_profile_frame_and_arrow_match_records():
+    df = pd.DataFrame({
+        "fund": ["F1", "F2", "F1", None, "F3", "F2", "F1"],
+        "qty": [5, 3, 5, 1, 2, 9, 4],
+        "amount": [1.5, None, 2.5, 3.5, None, 4.5, 5.0],
+    })
+    records = {"columns": list(df.columns), "sample_rows": df.to_dict(orient="records")}
+
+    expected = profile_data(records)
+    assert profile_data(df) == expected
+    assert profile_data(pa.Table.from_pandas(df))["columns"]["qty"] == expected["columns"]["qty"]
+    assert expected["columns"]["fund"]["top_values"] == {"F1": 3, "F2": 2, "F3": 1}
+    assert expected["columns"]["amount"]["mean"] == 3.4
+
+
+def test_profile_top_values_ties_keep_first_occurrence():
+    df = pd.DataFrame({"code": ["B", "A", "C", "A", "B", "D", "E", "F"]})
+    top = profile_data(df)["columns"]["code"]["top_values"]
+    assert list(top) == list(df["code"].value_counts().head(5).index)
+
+
+def test_parallel_profile_matches_serial(monkeypatch):
+    monkeypatch.setattr(parallel_profiling, "PARALLEL_MIN_CELLS", 0)
+    df = pd.DataFrame({
+        f"c{i}": ([1.5, None, 3.0, 3.0] if i % 2 else ["A", "B", None, "A"]) * 25 for i in range(12)
+    })
+    try:
+        assert parallel_profiling.profile_data_parallel(df, workers=2) == profile_data(df)
+    finally:
+        parallel_profiling.shutdown_pools()
+
+    mixed = pd.DataFrame({"a": [1, "x", None] * 10})
+    assert parallel_profiling.profile_data_parallel(mixed, workers=2) == profile_data(mixed)
+
+
+def test_parallel_chunk_profile_matches_serial(monkeypatch):
+    monkeypatch.setattr(parallel_profiling, "PARALLEL_MIN_CELLS", 0)
+    df = pd.DataFrame({
+        f"c{i}": ([1.5, None, 3.0, 3.0] if i % 2 else ["A", "B", None, "A"]) * 25 for i in range(12)
+    })
+    mixed = pd.DataFrame({"c0": [1, "x", None, "A"] * 5})  # not Arrow-representable: sketched in-process
+
+    def chunks():
+        arrow = pa.Table.from_pandas(df.iloc[40:], preserve_index=False).replace_schema_metadata(None)
+        return [df.iloc[:40], arrow, mixed]
+
+    try:
+        assert parallel_profiling.profile_chunks_parallel(chunks(), workers=2) == profile_chunks(chunks())
+    finally:
+        parallel_profiling.shutdown_pools()
@@ -0,0 +1,83 @@
+"""Unit tests for the streaming samplers."""
+
+import pandas as pd
+import pytest
+
+from tools.sampling import StratifiedSampler, stream_sample
+
+
+def _sorted_transactions(n: int = 6_000) -> pd.DataFrame:
+    """Extract sorted by transaction code, so the head holds only one code."""
+    codes = ["BUY"] * (n - 300) + ["SELL"] * 200 + ["DIV"] * 90 + ["INT"] * 10
+    return pd.DataFrame({
+        "id": range(n),
+        "Transaction Code": codes,
+        "Fund": [f"F{i % 12}" for i in range(n)],
+        "amount": [float(i % 97) for i in range(n)],
+    })
+
+
+def _chunks(df: pd.DataFrame, size: int = 1_000):
+    return (df.iloc[i:i + size] for i in range(0, len(df), size))
+
+
+def test_reservoir_is_uniform_ordered_and_repeatable():
+    df = _sorted_transactions()
+    sample, row_count = stream_sample(_chunks(df), "reservoir", 50)
+    again, _ = stream_sample(_chunks(df, 700), "reservoir", 50)
+
+    assert row_count == 6_000
+    assert len(sample) == 50
+    assert sample["id"].is_monotonic_increasing
+    assert sample["id"].max() > 3_000
+    assert list(sample.columns) == list(df.columns)
+    assert len(again) == 50
+
+
+def test_stratified_gives_each_stratum_a_share():
+    sample, _ = stream_sample(_chunks(_sorted_transactions()), "stratified", 40, stratify_by="Transaction Code")
+
+    counts = sample["Transaction Code"].value_counts().to_dict()
+    assert counts == {"BUY": 10, "SELL": 10, "DIV": 10, "INT": 10}
+
+
+def test_stratified_small_strata_are_taken_whole():
+    sample, _ = stream_sample(_chunks(_sorted_transactions()), "stratified", 100, stratify_by="Transaction Code")
+
+    counts = sample["Transaction Code"].value_counts().to_dict()
+    assert counts["INT"] == 10
+    assert sum(counts.values()) == 100
+
+
+def test_stratified_keeps_only_strata_that_can_be_sampled():
+    df = pd.DataFrame({"id": range(5_000), "account": [f"A{i % 2_000}" for i in range(5_000)]})
+    streamed = StratifiedSampler(10, "account")
+    for chunk in _chunks(df, 500):
+        streamed.update(chunk)
+        assert len(streamed.rows) <= 10 * 10
+    whole = StratifiedSampler(10, "account")
+    whole.update(df)
+
+    assert streamed.result().equals(whole.result())
+    assert streamed.result()["account"].nunique() == 10
+
+
+def test_stratified_requires_key_column():
+    with pytest.raises(ValueError):
+        stream_sample(_chunks(_sorted_transactions()), "stratified", 10)
+    with pytest.raises(ValueError):
+        stream_sample(_chunks(_sorted_transactions()), "stratified", 10, stratify_by="Missing")
+
+
+def test_diversity_covers_every_categorical_value():
+    sample, _ = stream_sample(_chunks(_sorted_transactions()), "diversity", 20)
+
+    assert len(sample) == 20
+    assert set(sample["Transaction Code"]) == {"BUY", "SELL", "DIV", "INT"}
+    assert sample["Fund"].nunique() == 12
+    assert sample["id"].is_monotonic_increasing
+
+
+def test_unknown_strategy():
+    with pytest.raises(ValueError):
+        stream_sample(_chunks(_sorted_transactions()), "tail", 10)
@@ -0,0 +1,73 @@
+"""Unit tests for the profile differ."""
+
+import pandas as pd
+
+from tools.profiling import profile_data
+from tools.schema_diff import describe_diff, diff_profiles
+from tools.semantic_types import annotate_profile
+
+
+def _profile(df: pd.DataFrame) -> dict:
+    return annotate_profile(profile_data(df), df)
+
+
+BASE = pd.DataFrame({
+    "Fund ID": ["F1", "F2", "F3", "F4"] * 25,
+    "Trade Date": ["01/02/2024", "01/03/2024", "01/04/2024", "01/05/2024"] * 25,
+    "Amount": [1.0, 2.0, 3.0, 4.0] * 25,
+    "Status": ["open", "closed", None, "open"] * 25,
+})
+
+
+def test_identical_profiles_have_no_changes():
+    diff = diff_profiles(_profile(BASE), _profile(BASE.copy()))
+
+    assert not diff["changed"] and not diff["structural"]
+    assert describe_diff(diff) == "no schema or distribution changes"
+
+
+def test_added_removed_and_renamed_columns_are_structural():
+    current = BASE.rename(columns={"Fund ID": "Fund Id"}).drop(columns=["Status"]).assign(Region="EU")
+    diff = diff_profiles(_profile(BASE), _profile(current))
+
+    assert diff["renamed"] == [{"from": "Fund ID", "to": "Fund Id"}]
+    assert diff["removed"] == ["Status"]
+    assert diff["added"] == ["Region"]
+    assert diff["structural"]
+
+
+def test_rename_is_matched_by_values_when_names_differ():
+    diff = diff_profiles(_profile(BASE), _profile(BASE.rename(columns={"Status": "State"})))
+
+    assert diff["renamed"] == [{"from": "Status", "to": "State"}]
+
+
+def test_type_changes_are_structural():
+    diff = diff_profiles(_profile(BASE), _profile(BASE.assign(Amount=["n/a"] * 100)))
+
+    assert diff["dtype_changes"] == [{"column": "Amount", "from": "float64", "to": "str"}]
+    assert diff["structural"]
+
+
+def test_date_format_changes_are_shifts_not_structural():
+    current = BASE.assign(**{"Trade Date": ["2024-01-02", "2024-01-03", "2024-01-04", "2024-01-05"] * 25})
+    diff = diff_profiles(_profile(BASE), _profile(current))
+
+    assert diff["semantic_type_changes"][0]["to"] == "date/%Y-%m-%d"
+    assert diff["changed"] and not diff["structural"]
+
+
+def test_nulls_in_an_integer_column_are_not_a_type_change():
+    before = pd.DataFrame({"qty": [1, 2, 3, 4]})
+    after = pd.DataFrame({"qty": [1.0, None, 3.0, 4.0]})
+
+    assert diff_profiles(_profile(before), _profile(after))["dtype_changes"] == []
+
+
+def test_null_rate_and_cardinality_shifts_are_not_structural():
+    current = BASE.assign(**{"Status": [None] * 100, "Fund ID": [f"F{i}" for i in range(100)]})
+    diff = diff_profiles(_profile(BASE), _profile(current))
+
+    assert [s["column"] for s in diff["null_rate_shifts"]] == ["Status"]
+    assert [s["column"] for s in diff["cardinality_shifts"]] == ["Fund ID"]
+    assert diff["changed"] and not diff["structural"]
@@ -0,0 +1,65 @@
+"""Unit tests for semantic type inference."""
+
+import pandas as pd
+
+from tools.profiling import profile_data
+from tools.semantic_types import annotate_profile, infer_semantic_type, infer_semantic_types
+
+
+def test_dates_report_strptime_and_spark_formats():
+    us = infer_semantic_type(pd.Series(["01/31/2024", "02/01/2024", None, "12/15/2023"]))
+    assert us == {"semantic_type": "date", "format": "%m/%d/%Y", "spark_format": "MM/dd/yyyy", "match_rate": 1.0}
+
+    iso = infer_semantic_type(pd.Series(["2024-01-31 09:30:00", "2024-02-01 16:00:00"]))
+    assert iso["semantic_type"] == "datetime"
+    assert iso["spark_format"] == "yyyy-MM-dd HH:mm:ss"
+
+
+def test_identifiers_report_check_digit_validity():
+    cusips = pd.Series(["037833100", "594918104", "38259P508", "037833100"])
+    isins = pd.Series(["US0378331005", "US5949181045", "GB0002634946"])
+    sedols = pd.Series(["0263494", "B0YBKJ7", "2046251"])
+
+    assert infer_semantic_type(cusips) == {"semantic_type": "cusip", "match_rate": 1.0, "check_digit_valid_rate": 1.0}
+    assert infer_semantic_type(isins)["semantic_type"] == "isin"
+    assert infer_semantic_type(sedols)["semantic_type"] == "sedol"
+
+    one_bad = infer_semantic_type(pd.Series(["US0378331005"] * 9 + ["US0378331006"]))
+    assert one_bad["check_digit_valid_rate"] == 0.9
+
+
+def test_plain_numbers_are_not_identifiers():
+    result = infer_semantic_type(pd.Series([f"{n:09d}" for n in range(100_000_000, 100_000_100)]))
+    assert result["semantic_type"] == "numeric_string"
+
+
+def test_currency_codes_and_numeric_strings():
+    assert infer_semantic_type(pd.Series(["USD", "EUR", "gbp"]))["semantic_type"] == "currency_code"
+
+    amounts = infer_semantic_type(pd.Series(["1,234.50", "$99", "(12.00)"]))
+    assert amounts["semantic_type"] == "numeric_string"
+    assert amounts["thousands_separator"] and amounts["currency_symbol"] and amounts["parenthesized_negatives"]
+    assert amounts["integer"] is False
+
+
+def test_free_text_and_numeric_columns_have_no_semantic_type():
+    df = pd.DataFrame({"note": ["hello", "world"], "amount": [1.5, 2.5]})
+    assert infer_semantic_types(df) == {}
+
+
+def test_annotate_profile_attaches_semantic_type():
+    df = pd.DataFrame({"Trade Date": ["01/02/2024", "01/31/2024"], "Fund": ["F1", "F2"]})
+    profile = annotate_profile(profile_data(df), df)
+
+    assert profile["columns"]["Trade Date"]["semantic_type"]["spark_format"] == "MM/dd/yyyy"
+    assert "semantic_type" not in profile["columns"]["Fund"]
+
+
+def test_day_month_ambiguity_is_reported_not_guessed():
+    ambiguous = infer_semantic_type(pd.Series(["01/02/2024", "03/04/2024"]))
+    assert ambiguous["semantic_type"] == "date"
+    assert ambiguous["spark_format"] is None and ambiguous["format"] is None
+    assert ambiguous["candidate_formats"] == ["MM/dd/yyyy", "dd/MM/yyyy"]
+
+    day_first = infer_semantic_type(pd.Series(["01/02/2024", "13/04/2024"]))
+    assert day_first["spark_format"] == "dd/MM/yyyy"
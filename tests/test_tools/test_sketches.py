@@ -0,0 +1,88 @@
+"""Unit tests for the mergeable profiling sketches and the streaming profiler."""
+
+import numpy as np
+import pandas as pd
+
+from tools.profiling import profile_chunks, profile_data, sketch_chunks
+from tools.sketches import HyperLogLog, MisraGries, TDigest
+
+
+def _chunks(df: pd.DataFrame, size: int) -> list[pd.DataFrame]:
+    return [df.iloc[i:i + size] for i in range(0, len(df), size)]
+
+
+def test_hyperloglog_estimate_and_merge():
+    values = pd.Series([f"id-{i}" for i in range(50_000)])
+    left, right = HyperLogLog(), HyperLogLog()
+    left.add(values[:30_000])
+    right.add(values[20_000:])
+    left.merge(right)
+    assert abs(left.estimate() - 50_000) < 50_000 * 0.03
+
+    small = HyperLogLog()
+    small.add(pd.Series(["A", "A", None, "B"]))
+    assert small.estimate() == 2
+
+
+def test_tdigest_quantiles_after_merge():
+    rng = np.random.default_rng(0)
+    values = rng.normal(100, 15, 200_000)
+    parts = [TDigest() for _ in range(4)]
+    for part, chunk in zip(parts, np.array_split(values, 4)):
+        part.add(chunk)
+    for part in parts[1:]:
+        parts[0].merge(part)
+
+    for q in (0.01, 0.5, 0.99):
+        assert abs(parts[0].quantile(q) - np.quantile(values, q)) < 0.5
+    assert parts[0].quantile(0) == values.min()
+
+
+def test_misra_gries_keeps_heavy_hitters():
+    rng = np.random.default_rng(1)
+    noise = [f"n{i}" for i in rng.integers(0, 10_000, 20_000)]
+    series = pd.Series(["BUY"] * 5_000 + ["SELL"] * 3_000 + noise).sample(frac=1, random_state=0)
+    mg = MisraGries(capacity=16)
+    for chunk in _chunks(series.to_frame("v"), 1_000):
+        mg.add(chunk["v"])
+    assert len(mg.counters) <= 16
+    assert list(mg.top(2)) == ["BUY", "SELL"]
+
+
+def test_profile_chunks_matches_exact_profile():
+    df = pd.DataFrame({
+        "fund": ["F1", "F2", None, "F1"] * 250,
+        "amount": np.arange(1_000, dtype=float),
+        "status": ["OK"] * 1_000,
+        "mostly_null": [None] * 900 + [1.0] * 100,
+    })
+    streamed = profile_chunks(_chunks(df, 128))
+    exact = profile_data(df)
+
+    assert streamed["row_count"] == 1_000
+    assert streamed["anomalies"] == exact["anomalies"]
+    for col in ("fund", "status"):
+        assert streamed["columns"][col] == exact["columns"][col]
+    amount = streamed["columns"]["amount"]
+    assert {k: amount[k] for k in ("null_count", "min", "max", "mean")} == {
+        k: exact["columns"]["amount"][k] for k in ("null_count", "min", "max", "mean")
+    }
+    assert abs(amount["quantiles"]["p50"] - 499.5) < 5
+
+
+def test_table_sketches_merge_like_one_pass():
+    df = pd.DataFrame({"a": range(600), "b": ["x", "y", "z"] * 200})
+    first, second = sketch_chunks(_chunks(df[:400], 100)), sketch_chunks(_chunks(df[400:], 100))
+    first.merge(second)
+    one_pass = sketch_chunks(_chunks(df, 100))
+
+    assert first.row_count == one_pass.row_count == 600
+    assert first.columns["b"].heavy.top(3) == one_pass.columns["b"].heavy.top(3)
+    assert first.columns["a"].distinct.estimate() == one_pass.columns["a"].distinct.estimate()
+
+
+def test_column_missing_from_some_chunks_counts_as_null():
+    chunks = [pd.DataFrame({"a": [1, 2]}), pd.DataFrame({"a": [3, 4], "b": ["x", "y"]})]
+    profile = profile_chunks(chunks)
+    assert profile["columns"]["b"]["null_count"] == 2
+    assert profile["columns"]["b"]["null_rate"] == 0.5